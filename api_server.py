@@ -0,0 +1,532 @@
+"""
+Vehicle Total Cost of Ownership Calculator
+Local HTTP/JSON API Server
+
+Serves the TCO engine to other systems (e.g. quoting) without the Streamlit app.
+An asyncio front end handles HTTP; calculations run on a process pool whose
+workers load the vehicle catalog and build the services once at startup.
+
+Endpoints:
+    GET  /health
+    POST /v1/tco                  {"vehicle": {...}} or {"vehicles": [{...}, ...]}
+    POST /v1/compare              {"vehicles": [{...}, ...]}
+    GET  /v1/catalog/makes
+    GET  /v1/catalog/models?make=Toyota
+    GET  /v1/catalog/trims?make=Toyota&model=Camry&year=2024
+    GET  /v1/catalog/characteristics?make=Toyota&model=Camry&year=2024&trim=LE
+
+Every vehicle needs make, model and year; purchases (the default transaction_type)
+also need annual_mileage and state, and comparisons need each vehicle's trim.
+
+Add ?debug=1 to /v1/tco or /v1/compare to get that request's engine debug logs
+back in a "debug_log" field.
+
+Usage:
+    python api_server.py --port 8765 --workers 4 --max-concurrent 16 --timeout 30
+"""
+
+from typing import Dict, Any, List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import threading
+
+# Add project root to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.log_config import debug_request
+
+HTTP_STATUS_TEXT = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    408: 'Request Timeout', 413: 'Payload Too Large', 500: 'Internal Server Error',
+    503: 'Service Unavailable', 504: 'Gateway Timeout'
+}
+
+# Fields every vehicle needs, and those the engine reads without a default for
+# purchases and for comparisons (transaction_type defaults to 'purchase')
+VEHICLE_FIELDS = ['make', 'model', 'year']
+PURCHASE_FIELDS = ['annual_mileage', 'state']
+COMPARE_FIELDS = ['trim']
+
+# Per-worker services, built by _init_worker
+_worker_services: Dict[str, Any] = {}
+
+class ApiError(Exception):
+    """Error returned to the client with an HTTP status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def _init_worker():
+    """Load the catalog and build the services once per worker process"""
+
+    from services.tco_cache import CachedPredictionService, TCOResultCache
+    from services.comparison_service import ComparisonService
+    from data.vehicle_database import get_vehicle_selection_index
+
+    prediction_service = CachedPredictionService(TCOResultCache(max_entries=1024))
+    _worker_services['prediction'] = prediction_service
+    _worker_services['comparison'] = ComparisonService(prediction_service=prediction_service)
+    _worker_services['catalog'] = get_vehicle_selection_index()
+
+def _run_debug_task(task: str, payload: Dict[str, Any]) -> Tuple[Any, List[Dict[str, Any]]]:
+    """Run a backend task with its engine debug logs captured"""
+
+    with debug_request() as records:
+        result = _run_task(task, payload)
+    return result, records
+
+def _run_task(task: str, payload: Dict[str, Any]) -> Any:
+    """Run one backend task in a worker process"""
+
+    if not _worker_services:
+        _init_worker()
+
+    if task == 'tco':
+        return _worker_services['prediction'].calculate_batch_tco(payload['vehicles'])
+    if task == 'compare':
+        return _worker_services['comparison'].compare_vehicles(payload['vehicles'])
+    if task == 'characteristics':
+        from data.vehicle_database import get_vehicle_characteristics
+        return get_vehicle_characteristics(payload['make'], payload['model'], payload['year'], payload.get('trim'))
+
+    catalog = _worker_services['catalog']
+    if task == 'makes':
+        return list(catalog.keys())
+    if task == 'models':
+        return list(catalog.get(payload['make'], {}).keys())
+    if task == 'trims':
+        model_index = catalog.get(payload['make'], {}).get(payload['model'])
+        if model_index is None:
+            return None
+        trims = model_index['trims_by_year'].get(payload['year'])
+        if trims is None:
+            return {'years': model_index['years'], 'trims': []}
+        return {'years': model_index['years'],
+                'trims': [{'trim': trim, 'msrp': msrp} for trim, msrp in trims.items()]}
+
+    raise ValueError(f"Unknown task: {task}")
+
+def _json_default(value: Any) -> Any:
+    """JSON encoder fallback for NumPy scalars, tuples and other engine values"""
+
+    if hasattr(value, 'item') and callable(value.item):
+        return value.item()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+class TCOApiServer:
+    """Asyncio HTTP front end dispatching calculations to a worker process pool"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, workers: int = None,
+                 max_concurrent: int = 16, max_queued: int = 64, request_timeout: float = 30.0,
+                 max_batch_size: int = 500, chunk_size: int = 50, max_body_bytes: int = 5_000_000):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.request_timeout = request_timeout
+        self.max_batch_size = max_batch_size
+        self.chunk_size = chunk_size
+        self.max_body_bytes = max_body_bytes
+
+        self.executor = None
+        self.server = None
+        self._semaphore = None
+        self._pending = 0
+
+        self.stats = {'requests': 0, 'rejected': 0, 'timeouts': 0, 'errors': 0}
+
+        # (method, path) -> handler
+        self.routes = {
+            ('GET', '/health'): self._handle_health,
+            ('POST', '/v1/tco'): self._handle_tco,
+            ('POST', '/v1/compare'): self._handle_compare,
+            ('GET', '/v1/catalog/makes'): self._handle_makes,
+            ('GET', '/v1/catalog/models'): self._handle_models,
+            ('GET', '/v1/catalog/trims'): self._handle_trims,
+            ('GET', '/v1/catalog/characteristics'): self._handle_characteristics
+        }
+
+    async def start(self):
+        """Start the worker pool (preloading every worker) and begin listening"""
+
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        # Warm every worker so the first real requests do not pay for catalog loading
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.executor, _run_task, 'makes', {})
+                               for _ in range(self.workers)])
+
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop listening and shut down the worker pool"""
+
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def serve_forever(self):
+        """Start the server and run until cancelled"""
+
+        await self.start()
+        print(f"TCO API listening on http://{self.host}:{self.port} ({self.workers} workers)", file=sys.stderr)
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection (HTTP/1.1 keep-alive)"""
+
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), timeout=self.request_timeout)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.TimeoutError:
+                    break
+                except ApiError as e:
+                    await self._write_response(writer, e.status, {'error': e.message}, keep_alive=False)
+                    break
+
+                if request is None:
+                    break
+
+                method, path, query, body, keep_alive = request
+                status, response = await self._dispatch(method, path, query, body)
+                await self._write_response(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes, bool]]:
+        """Read one HTTP request; returns None when the client closed the connection"""
+
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise
+        except asyncio.LimitOverrunError:
+            raise ApiError(413, "Request headers too large")
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ', 2)
+        except ValueError:
+            raise ApiError(400, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            content_length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            raise ApiError(400, "Invalid Content-Length header")
+        if content_length > self.max_body_bytes:
+            raise ApiError(413, f"Request body over {self.max_body_bytes} bytes")
+        body = await reader.readexactly(content_length) if content_length else b''
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        return method.upper(), url.path, query, body, keep_alive
+
+    async def _write_response(self, writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool):
+        """Write a JSON response"""
+
+        body = json.dumps(payload, default=_json_default).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {HTTP_STATUS_TEXT.get(status, 'OK')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def _dispatch(self, method: str, path: str, query: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        """Route a request, applying the concurrency limit and request timeout"""
+
+        self.stats['requests'] += 1
+
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                return 405, {'error': f"{method} not allowed on {path}"}
+            return 404, {'error': f"Unknown endpoint: {path}"}
+
+        if self._pending >= self.max_concurrent + self.max_queued:
+            self.stats['rejected'] += 1
+            return 503, {'error': "Server busy, retry later"}
+
+        self._pending += 1
+        try:
+            payload = json.loads(body) if body else {}
+            # The timeout covers queueing and calculation; a timed-out calculation
+            # still finishes in its worker, but the client gets its answer now
+            return await asyncio.wait_for(self._run_limited(handler, query, payload), timeout=self.request_timeout)
+        except json.JSONDecodeError as e:
+            return 400, {'error': f"Invalid JSON: {e}"}
+        except ApiError as e:
+            return e.status, {'error': e.message}
+        except KeyError as e:
+            # The engine reads some inputs without defaults; a missing one is a client error
+            return 400, {'error': f"Missing input: {e.args[0]}"}
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            return 504, {'error': f"Request exceeded {self.request_timeout:g}s timeout"}
+        except Exception as e:
+            self.stats['errors'] += 1
+            return 500, {'error': str(e)}
+        finally:
+            self._pending -= 1
+
+    async def _run_limited(self, handler, query: Dict[str, str], payload: Any) -> Tuple[int, Any]:
+        """Run a handler once a concurrency slot is free"""
+
+        async with self._semaphore:
+            return await handler(query, payload)
+
+    async def _run_task(self, task: str, payload: Dict[str, Any], debug_log: List[Dict[str, Any]] = None) -> Any:
+        """Run one task on the worker pool, collecting its debug logs into debug_log if given"""
+
+        loop = asyncio.get_running_loop()
+        if debug_log is None:
+            return await loop.run_in_executor(self.executor, _run_task, task, payload)
+
+        result, records = await loop.run_in_executor(self.executor, _run_debug_task, task, payload)
+        debug_log.extend(records)
+        return result
+
+    def _get_debug_log(self, query: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+        """A list to collect debug logs into when the request asked for them (?debug=1)"""
+        return [] if query.get('debug', '').lower() in ('1', 'true', 'yes') else None
+
+    def _get_vehicle_list(self, payload: Any, required_fields: List[str] = None) -> List[Dict[str, Any]]:
+        """Validate a {"vehicle": {...}} or {"vehicles": [...]} body, filling in the transaction type"""
+
+        if not isinstance(payload, dict):
+            raise ApiError(400, "Body must be a JSON object")
+        vehicles = payload.get('vehicles', [payload['vehicle']] if 'vehicle' in payload else None)
+        if not isinstance(vehicles, list) or not vehicles:
+            raise ApiError(400, "Body needs 'vehicle' (object) or 'vehicles' (non-empty list)")
+        if len(vehicles) > self.max_batch_size:
+            raise ApiError(413, f"At most {self.max_batch_size} vehicles per request")
+
+        validated = []
+        for index, vehicle in enumerate(vehicles):
+            if not isinstance(vehicle, dict):
+                raise ApiError(400, f"vehicles[{index}] must be an object")
+            transaction_type = vehicle.get('transaction_type', 'purchase')
+            if not isinstance(transaction_type, str) or transaction_type.lower() not in ('purchase', 'lease'):
+                raise ApiError(400, f"vehicles[{index}].transaction_type must be 'purchase' or 'lease'")
+
+            fields = VEHICLE_FIELDS + (required_fields or [])
+            if transaction_type.lower() == 'purchase':
+                fields = fields + PURCHASE_FIELDS
+            missing = [field for field in fields if vehicle.get(field) is None]
+            if missing:
+                raise ApiError(400, f"vehicles[{index}] is missing {', '.join(missing)}")
+            validated.append(dict(vehicle, transaction_type=transaction_type))
+        return validated
+
+    def _get_query_fields(self, query: Dict[str, str], fields: List[str]) -> Dict[str, Any]:
+        """Read required query parameters (year as an integer)"""
+
+        missing = [field for field in fields if not query.get(field)]
+        if missing:
+            raise ApiError(400, f"Missing query parameters: {', '.join(missing)}")
+        values = {field: query[field] for field in fields}
+        if 'year' in values:
+            try:
+                values['year'] = int(values['year'])
+            except ValueError:
+                raise ApiError(400, "year must be an integer")
+        return values
+
+    async def _handle_health(self, query: Dict[str, str], payload: Any) -> Tuple[int, Any]:
+        """Liveness and load information"""
+        return 200, {'status': 'ok', 'workers': self.workers, 'pending': self._pending, 'stats': self.stats}
+
+    async def _handle_tco(self, query: Dict[str, str], payload: Any) -> Tuple[int, Any]:
+        """TCO for one vehicle or a batch, split into chunks across the workers"""
+
+        vehicles = self._get_vehicle_list(payload)
+        debug_log = self._get_debug_log(query)
+        chunks = [vehicles[i:i + self.chunk_size] for i in range(0, len(vehicles), self.chunk_size)]
+        chunk_results = await asyncio.gather(*[self._run_task('tco', {'vehicles': chunk}, debug_log) for chunk in chunks])
+        results = [results for chunk in chunk_results for results in chunk]
+
+        if 'vehicle' in payload and 'vehicles' not in payload:
+            response = dict(results[0])
+            status = 400 if 'error' in response else 200
+        else:
+            response = {'results': results}
+            status = 200
+
+        if debug_log is not None:
+            response['debug_log'] = debug_log
+        return status, response
+
+    async def _handle_compare(self, query: Dict[str, str], payload: Any) -> Tuple[int, Any]:
+        """Multi-vehicle comparison"""
+
+        vehicles = self._get_vehicle_list(payload, COMPARE_FIELDS)
+        if len(vehicles) < 2:
+            raise ApiError(400, "Comparison needs at least 2 vehicles")
+
+        debug_log = self._get_debug_log(query)
+        comparison = await self._run_task('compare', {'vehicles': vehicles}, debug_log)
+        if debug_log is not None:
+            comparison = dict(comparison, debug_log=debug_log)
+        return 200, comparison
+
+    async def _handle_makes(self, query: Dict[str, str], payload: Any) -> Tuple[int, Any]:
+        """All catalog makes"""
+        return 200, {'makes': await self._run_task('makes', {})}
+
+    async def _handle_models(self, query: Dict[str, str], payload: Any) -> Tuple[int, Any]:
+        """Models for a make"""
+
+        fields = self._get_query_fields(query, ['make'])
+        models = await self._run_task('models', fields)
+        if not models:
+            raise ApiError(404, f"Unknown make: {fields['make']}")
+        return 200, {'make': fields['make'], 'models': models}
+
+    async def _handle_trims(self, query: Dict[str, str], payload: Any) -> Tuple[int, Any]:
+        """Trims and MSRPs for a make/model/year"""
+
+        fields = self._get_query_fields(query, ['make', 'model', 'year'])
+        trims = await self._run_task('trims', fields)
+        if trims is None:
+            raise ApiError(404, f"Unknown vehicle: {fields['make']} {fields['model']}")
+        return 200, {**fields, **trims}
+
+    async def _handle_characteristics(self, query: Dict[str, str], payload: Any) -> Tuple[int, Any]:
+        """Vehicle characteristics used by the engine"""
+
+        fields = self._get_query_fields(query, ['make', 'model', 'year'])
+        fields['trim'] = query.get('trim')
+        return 200, await self._run_task('characteristics', fields)
+
+def run_server_in_thread(**server_options) -> Tuple[TCOApiServer, asyncio.AbstractEventLoop, threading.Thread]:
+    """Start a server on a background thread (for local testing); returns once it is listening"""
+
+    server = TCOApiServer(**server_options)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+        loop.run_until_complete(server.stop())
+        loop.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait()
+    return server, loop, thread
+
+def stop_server_thread(loop: asyncio.AbstractEventLoop, thread: threading.Thread):
+    """Stop a server started with run_server_in_thread"""
+
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+# Test function
+def test_api_server():
+    """Exercise the API on localhost"""
+    import urllib.request
+
+    server, loop, thread = run_server_in_thread(port=0, workers=2)
+    base_url = f"http://127.0.0.1:{server.port}"
+
+    def call(path: str, body: Any = None) -> Tuple[int, Any]:
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(base_url + path, data=data, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    vehicle = {
+        'make': 'Toyota', 'model': 'Camry', 'year': 2024, 'trim': 'LE', 'price': 28000,
+        'transaction_type': 'purchase', 'annual_mileage': 12000, 'analysis_years': 5,
+        'state': 'CA', 'zip_code': '90210', 'gross_income': 80000
+    }
+
+    try:
+        print("=== TCO API SERVER TEST ===")
+        print(f"Health: {call('/health')[1]['status']}")
+        print(f"Makes: {len(call('/v1/catalog/makes')[1]['makes'])}")
+        status, results = call('/v1/tco', {'vehicle': vehicle})
+        print(f"Single TCO ({status}): ${results['summary']['total_ownership_cost']:,.0f}")
+        status, batch = call('/v1/tco', {'vehicles': [dict(vehicle, annual_mileage=m) for m in range(8000, 20000, 1000)]})
+        print(f"Batch TCO ({status}): {len(batch['results'])} results")
+        status, comparison = call('/v1/compare', {'vehicles': [vehicle, dict(vehicle, model='Corolla', trim='LE', price=23000)]})
+        print(f"Compare ({status}): best = {comparison['best_overall']['vehicle_name']}")
+        status, results = call('/v1/tco?debug=1', {'vehicle': dict(vehicle, annual_mileage=13500)})
+        print(f"Debug log ({status}): {len(results['debug_log'])} records")
+        print(f"Bad request: {call('/v1/tco', {'vehicles': [{'make': 'Toyota'}]})}")
+    finally:
+        stop_server_thread(loop, thread)
+
+def main(argv: List[str] = None) -> int:
+    """Command-line entry point"""
+
+    parser = argparse.ArgumentParser(description="Serve the TCO engine as a local HTTP/JSON API")
+    parser.add_argument('--host', default='127.0.0.1', help="Bind address (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="Port (default: 8765, 0 picks a free port)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--max-concurrent', type=int, default=16, help="Requests calculated at once (default: 16)")
+    parser.add_argument('--max-queued', type=int, default=64, help="Requests waiting before 503s (default: 64)")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Per-request timeout in seconds (default: 30)")
+    parser.add_argument('--max-batch-size', type=int, default=500, help="Vehicles per request (default: 500)")
+    args = parser.parse_args(argv)
+
+    server = TCOApiServer(
+        host=args.host, port=args.port, workers=args.workers, max_concurrent=args.max_concurrent,
+        max_queued=args.max_queued, request_timeout=args.timeout, max_batch_size=args.max_batch_size
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
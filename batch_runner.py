@@ -0,0 +1,362 @@
+"""
+Vehicle Total Cost of Ownership Calculator
+Headless Batch Runner
+
+Command-line entry point for repricing jobs. Reads vehicle, driver and location
+rows from CSV or JSONL, runs them through PredictionService in batches across a
+process pool, and streams results out as CSV, JSONL or Parquet. Never imports
+Streamlit.
+
+Usage:
+    python batch_runner.py vehicles.csv results.csv
+    python batch_runner.py vehicles.jsonl results.parquet --workers 8 --batch-size 500
+    cat vehicles.jsonl | python batch_runner.py - - --output-format jsonl
+"""
+
+from typing import Dict, Any, List, Iterator, Iterable, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+
+# Add project root to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.log_config import configure_logging, ROOT_LOGGER_NAME
+
+# Optional Parquet support
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Input columns converted from CSV text to the types the engine expects
+INTEGER_FIELDS = [
+    'year', 'analysis_years', 'annual_mileage', 'annual_mileage_limit', 'current_mileage',
+    'driver_age', 'user_age', 'loan_term', 'lease_term', 'num_household_vehicles'
+]
+FLOAT_FIELDS = [
+    'price', 'trim_msrp', 'purchase_price', 'fuel_price', 'electricity_rate', 'gross_income',
+    'interest_rate', 'loan_amount', 'down_payment', 'monthly_payment'
+]
+BOOLEAN_FIELDS = ['is_electric', 'financing_enabled']
+REQUIRED_FIELDS = ['make', 'model', 'year']
+
+# Output columns, fixed so CSV and Parquet output can be streamed chunk by chunk
+OUTPUT_COLUMNS = [
+    ('row_id', 'int'), ('make', 'str'), ('model', 'str'), ('year', 'int'), ('trim', 'str'),
+    ('transaction_type', 'str'), ('zip_code', 'str'), ('status', 'str'), ('error', 'str'),
+    ('total_cost', 'float'), ('total_tco', 'float'), ('average_annual_cost', 'float'),
+    ('average_monthly_cost', 'float'), ('cost_per_mile', 'float'), ('final_vehicle_value', 'float'),
+    ('depreciation', 'float'), ('maintenance', 'float'), ('insurance', 'float'),
+    ('fuel_energy', 'float'), ('financing', 'float'), ('lease_payments', 'float'),
+    ('fees_penalties', 'float'), ('monthly_cost', 'float'), ('percentage_of_income', 'float'),
+    ('affordability_rating', 'str'), ('is_affordable', 'bool')
+]
+OUTPUT_COLUMN_NAMES = {name for name, _ in OUTPUT_COLUMNS}
+
+# (row_id, engine input, parse error or None, pass-through column values)
+ParsedRow = Tuple[int, Dict[str, Any], str, Dict[str, Any]]
+
+# Per-process PredictionService, built once by each worker
+_worker_service = None
+_worker_verbose = False
+_worker_log_handler = None
+
+def _init_worker(verbose: bool):
+    """Build the worker's PredictionService (and load the catalog) once"""
+
+    global _worker_service, _worker_verbose, _worker_log_handler
+    _worker_verbose = verbose
+
+    # Engine logs: everything when verbose, otherwise only errors
+    if _worker_log_handler is not None:
+        logging.getLogger(ROOT_LOGGER_NAME).removeHandler(_worker_log_handler)
+    _worker_log_handler = configure_logging('DEBUG' if verbose else 'ERROR')
+
+    from services.prediction_service import PredictionService
+    _worker_service = PredictionService()
+
+def _calculate_chunk(chunk: List[ParsedRow]) -> List[Dict[str, Any]]:
+    """Calculate one chunk of parsed rows and flatten the results"""
+
+    if _worker_service is None:
+        _init_worker(_worker_verbose)
+
+    valid = [(row_id, input_data) for row_id, input_data, error, _ in chunk if error is None]
+    batch_results = _worker_service.calculate_batch_tco([input_data for _, input_data in valid])
+    results_by_row = {row_id: results for (row_id, _), results in zip(valid, batch_results)}
+
+    output_rows = []
+    for row_id, input_data, error, kept_values in chunk:
+        row = flatten_results(row_id, input_data, results_by_row.get(row_id, {'error': error}))
+        row.update(kept_values)
+        output_rows.append(row)
+    return output_rows
+
+def parse_input_row(raw_row: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """Convert a raw CSV/JSONL row into engine input; returns (input_data, error)"""
+
+    input_data = {}
+    for field, value in raw_row.items():
+        if field is None or value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if value == '':
+                # Blank cells fall back to the engine defaults
+                continue
+        input_data[field] = value
+
+    try:
+        for field in INTEGER_FIELDS:
+            if field in input_data:
+                input_data[field] = int(float(input_data[field]))
+        for field in FLOAT_FIELDS:
+            if field in input_data:
+                input_data[field] = float(input_data[field])
+        for field in BOOLEAN_FIELDS:
+            if field in input_data and isinstance(input_data[field], str):
+                input_data[field] = input_data[field].lower() in ('1', 'true', 'yes', 'y')
+    except ValueError as e:
+        return input_data, f"Invalid value: {e}"
+
+    missing = [field for field in REQUIRED_FIELDS if field not in input_data]
+    if missing:
+        return input_data, f"Missing required fields: {', '.join(missing)}"
+
+    if 'zip_code' in input_data:
+        input_data['zip_code'] = str(input_data['zip_code']).zfill(5)
+    input_data.setdefault('transaction_type', 'purchase')
+
+    return input_data, None
+
+def flatten_results(row_id: int, input_data: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten TCO results into one output row"""
+
+    year = input_data.get('year')
+    row = {
+        'row_id': row_id,
+        'make': input_data.get('make'),
+        'model': input_data.get('model'),
+        'year': year if isinstance(year, int) else None,
+        'trim': input_data.get('trim'),
+        'transaction_type': input_data.get('transaction_type'),
+        'zip_code': input_data.get('zip_code')
+    }
+
+    if 'error' in results:
+        row.update({'status': 'error', 'error': results['error']})
+        return row
+
+    summary = results.get('summary', {})
+    affordability = results.get('affordability', {})
+    is_lease = str(input_data.get('transaction_type', '')).lower() == 'lease'
+
+    row.update({
+        'status': 'ok',
+        'total_cost': summary.get('total_lease_cost' if is_lease else 'total_ownership_cost'),
+        'total_tco': summary.get('total_tco', summary.get('total_lease_cost')),
+        'average_annual_cost': summary.get('average_annual_cost'),
+        'average_monthly_cost': summary.get('average_monthly_cost'),
+        'cost_per_mile': summary.get('cost_per_mile'),
+        'final_vehicle_value': summary.get('final_vehicle_value'),
+        'monthly_cost': affordability.get('monthly_cost'),
+        'percentage_of_income': affordability.get('percentage_of_income'),
+        'affordability_rating': affordability.get('affordability_rating'),
+        'is_affordable': affordability.get('is_affordable')
+    })
+    for category, total in results.get('category_totals', {}).items():
+        if category in OUTPUT_COLUMN_NAMES:
+            row[category] = total
+
+    return row
+
+def read_rows(path: str, input_format: str) -> Iterator[Dict[str, Any]]:
+    """Stream raw rows from a CSV or JSONL file ('-' reads stdin)"""
+
+    handle = sys.stdin if path == '-' else open(path, 'r', newline='', encoding='utf-8')
+    try:
+        if input_format == 'csv':
+            for raw_row in csv.DictReader(handle):
+                yield raw_row
+        else:
+            for line_number, line in enumerate(handle, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    raw_row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield {'_parse_error': f"Line {line_number}: {e}"}
+                    continue
+                if not isinstance(raw_row, dict):
+                    yield {'_parse_error': f"Line {line_number}: expected a JSON object, got {type(raw_row).__name__}"}
+                    continue
+                yield raw_row
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+def iter_chunks(raw_rows: Iterable[Dict[str, Any]], batch_size: int,
+                keep_columns: List[str] = None) -> Iterator[List[ParsedRow]]:
+    """Parse rows and group them into (row_id, input_data, error, kept_values) chunks"""
+
+    chunk = []
+    for row_id, raw_row in enumerate(raw_rows):
+        if '_parse_error' in raw_row:
+            input_data, error = {}, raw_row['_parse_error']
+        else:
+            input_data, error = parse_input_row(raw_row)
+        kept_values = {name: None if raw_row.get(name) is None else str(raw_row[name])
+                       for name in keep_columns or []}
+        chunk.append((row_id, input_data, error, kept_values))
+        if len(chunk) >= batch_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_chunks(chunks: Iterable[List[ParsedRow]], workers: int,
+               verbose: bool = False) -> Iterator[List[Dict[str, Any]]]:
+    """Calculate chunks in order, in-process or on a pool with a bounded number in flight"""
+
+    if workers <= 1:
+        _init_worker(verbose)
+        for chunk in chunks:
+            yield _calculate_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(verbose,)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_calculate_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+class ResultWriter:
+    """Streams output rows as CSV, JSONL or Parquet ('-' writes stdout for CSV/JSONL)"""
+
+    def __init__(self, path: str, output_format: str, keep_columns: List[str] = None):
+        self.path = path
+        self.output_format = output_format
+        self.columns = [name for name, _ in OUTPUT_COLUMNS] + list(keep_columns or [])
+        self._handle = None
+        self._csv_writer = None
+        self._parquet_writer = None
+
+        if output_format == 'parquet':
+            if not PARQUET_AVAILABLE:
+                raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+            if path == '-':
+                raise ValueError("Parquet output needs a file path")
+            types = {'int': pa.int64(), 'float': pa.float64(), 'str': pa.string(), 'bool': pa.bool_()}
+            fields = [pa.field(name, types[kind]) for name, kind in OUTPUT_COLUMNS]
+            fields += [pa.field(name, pa.string()) for name in keep_columns or []]
+            self._schema = pa.schema(fields)
+            self._parquet_writer = pq.ParquetWriter(path, self._schema)
+        else:
+            self._handle = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+            if output_format == 'csv':
+                self._csv_writer = csv.DictWriter(self._handle, fieldnames=self.columns, extrasaction='ignore')
+                self._csv_writer.writeheader()
+
+    def write_rows(self, rows: List[Dict[str, Any]]):
+        """Write one chunk of output rows"""
+
+        if self._parquet_writer is not None:
+            self._parquet_writer.write_table(pa.Table.from_pylist(rows, schema=self._schema))
+        elif self._csv_writer is not None:
+            self._csv_writer.writerows(rows)
+        else:
+            for row in rows:
+                self._handle.write(json.dumps({name: row.get(name) for name in self.columns}, default=str))
+                self._handle.write('\n')
+        if self._handle is not None:
+            self._handle.flush()
+
+    def close(self):
+        """Finish the output file"""
+
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        elif self._handle is not None and self._handle is not sys.stdout:
+            self._handle.close()
+
+def infer_format(path: str, explicit: str, choices: List[str], default: str) -> str:
+    """Pick a file format from an explicit option or the file extension"""
+
+    if explicit:
+        return explicit
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension == 'ndjson':
+        extension = 'jsonl'
+    return extension if extension in choices else default
+
+def run_batch(input_path: str, output_path: str, input_format: str = None, output_format: str = None,
+              batch_size: int = 250, workers: int = None, keep_columns: List[str] = None,
+              verbose: bool = False) -> Dict[str, Any]:
+    """Run a whole input file through the engine and return run statistics"""
+
+    input_format = infer_format(input_path, input_format, ['csv', 'jsonl'], 'jsonl')
+    output_format = infer_format(output_path, output_format, ['csv', 'jsonl', 'parquet'], 'jsonl')
+    keep_columns = [name for name in keep_columns or [] if name not in OUTPUT_COLUMN_NAMES]
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    stats = {'rows': 0, 'errors': 0, 'elapsed_seconds': 0.0}
+    start = time.perf_counter()
+
+    writer = ResultWriter(output_path, output_format, keep_columns)
+    try:
+        chunks = iter_chunks(read_rows(input_path, input_format), batch_size, keep_columns)
+        for output_rows in run_chunks(chunks, workers, verbose):
+            writer.write_rows(output_rows)
+            stats['rows'] += len(output_rows)
+            stats['errors'] += sum(1 for row in output_rows if row['status'] == 'error')
+    finally:
+        writer.close()
+
+    stats['elapsed_seconds'] = time.perf_counter() - start
+    stats['rows_per_second'] = stats['rows'] / stats['elapsed_seconds'] if stats['elapsed_seconds'] else 0.0
+    return stats
+
+def main(argv: List[str] = None) -> int:
+    """Command-line entry point"""
+
+    parser = argparse.ArgumentParser(description="Run TCO calculations for a file of vehicles without the web UI")
+    parser.add_argument('input', help="Input CSV or JSONL file ('-' for stdin)")
+    parser.add_argument('output', help="Output CSV, JSONL or Parquet file ('-' for stdout)")
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'], help="Input format (default: from extension)")
+    parser.add_argument('--output-format', choices=['csv', 'jsonl', 'parquet'], help="Output format (default: from extension)")
+    parser.add_argument('--batch-size', type=int, default=250, help="Rows per engine batch (default: 250)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes; 1 runs in-process (default: CPU count)")
+    parser.add_argument('--keep-columns', default='', help="Comma-separated input columns copied to the output (e.g. id,quote_ref)")
+    parser.add_argument('--verbose', action='store_true', help="Show engine debug logs on stderr")
+    args = parser.parse_args(argv)
+
+    keep_columns = [name.strip() for name in args.keep_columns.split(',') if name.strip()]
+
+    try:
+        stats = run_batch(args.input, args.output, args.input_format, args.output_format,
+                          batch_size=max(1, args.batch_size), workers=args.workers,
+                          keep_columns=keep_columns, verbose=args.verbose)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Batch run failed: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Processed {stats['rows']:,} rows ({stats['errors']:,} errors) in {stats['elapsed_seconds']:.1f}s "
+          f"({stats['rows_per_second']:,.0f} rows/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
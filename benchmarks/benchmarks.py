@@ -0,0 +1,234 @@
+"""
+TCO Benchmark Suite
+asv-style benchmarks for the calculation core: suite classes with setup() and
+time_* methods (optionally parameterized via params/param_names), plus timeraw_*
+functions that return code timed in a fresh interpreter. Run with
+tools/run_benchmarks.py (offline, stdlib only) or with asv.
+"""
+
+import os
+import sys
+
+# Add project root to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.prediction_service import PredictionService
+from services.comparison_service import ComparisonService
+from models.depreciation.enhanced_depreciation import EnhancedDepreciationModel
+from models.maintenance.maintenance_utils import MaintenanceCalculator
+from models.insurance.advanced_insurance import AdvancedInsuranceCalculator
+from data.vehicle_database import get_catalog_trims_for_year
+from utils.zip_code_utils import validate_and_lookup_location, lookup_zip_code_data
+
+BASE_INPUT = {
+    'make': 'Toyota', 'model': 'Camry', 'year': 2024, 'trim': 'LE', 'price': 28000,
+    'transaction_type': 'purchase', 'annual_mileage': 12000, 'analysis_years': 5,
+    'current_mileage': 0, 'state': 'CA', 'zip_code': '90210', 'gross_income': 80000,
+    'driver_age': 35, 'driving_style': 'normal', 'terrain': 'flat', 'fuel_price': 4.50
+}
+
+# One input per TCO case
+TCO_CASES = {
+    'purchase': dict(BASE_INPUT, loan_amount=22000, interest_rate=6.5, loan_term=5),
+    'lease': dict(BASE_INPUT, transaction_type='lease', lease_term=3, monthly_payment=389,
+                  annual_mileage_limit=12000, trim_msrp=28000),
+    'ev': dict(BASE_INPUT, make='Tesla', model='Model 3', trim='Model 3 Long Range', price=47240,
+               is_electric=True, electricity_rate=0.28, charging_preference='mixed'),
+    'used': dict(BASE_INPUT, year=2019, price=18500, current_mileage=62000, analysis_years=7)
+}
+
+ZIP_CODES = ['90210', '10001', '60601', '73301', '98101', '33101', '02101', '80202']
+
+def build_comparison_vehicles(count: int):
+    """Deterministic comparison inputs drawn from the 2024 catalog"""
+
+    trims = sorted(get_catalog_trims_for_year(2024), key=lambda trim: (trim['make'], trim['model'], trim['trim']))
+    vehicles = []
+    for index in range(count):
+        trim = trims[index % len(trims)]
+        vehicles.append(dict(
+            BASE_INPUT, make=trim['make'], model=trim['model'], trim=trim['trim'], price=trim['price'],
+            annual_mileage=10000 + (index // len(trims)) * 2000
+        ))
+    return vehicles
+
+class TCOSuite:
+    """PredictionService.calculate_total_cost_of_ownership per case"""
+
+    params = [list(TCO_CASES)]
+    param_names = ['case']
+
+    def setup(self, case):
+        self.service = PredictionService()
+        self.input_data = TCO_CASES[case]
+        # Warm per-process lookups so the timing covers the steady state
+        self.service.calculate_total_cost_of_ownership(self.input_data)
+
+    def time_calculate_tco(self, case):
+        self.service.calculate_total_cost_of_ownership(self.input_data)
+
+class ModelSuite:
+    """Individual cost models"""
+
+    def setup(self):
+        self.depreciation_model = EnhancedDepreciationModel()
+        self.maintenance_calculator = MaintenanceCalculator()
+        self.insurance_calculator = AdvancedInsuranceCalculator()
+
+    def time_depreciation_schedule(self):
+        self.depreciation_model.calculate_depreciation_schedule(28000, 'Toyota', 'Camry', 2024, 12000, 10)
+
+    def time_maintenance_schedule(self):
+        self.maintenance_calculator.get_maintenance_schedule(
+            annual_mileage=12000, years=10, starting_mileage=0,
+            vehicle_make='Toyota', driving_style='normal', vehicle_model='Camry'
+        )
+
+    def time_insurance_premium(self):
+        self.insurance_calculator.calculate_annual_premium(
+            vehicle_value=28000, vehicle_make='Toyota', vehicle_year=2024, driver_age=35,
+            state='CA', coverage_type='comprehensive', annual_mileage=12000,
+            num_vehicles=2, regional_multiplier=1.1, vehicle_model='Camry'
+        )
+
+class ZipLookupSuite:
+    """ZIP code lookups"""
+
+    def time_lookup_zip_code_data(self):
+        for zip_code in ZIP_CODES:
+            lookup_zip_code_data(zip_code)
+
+    def time_validate_and_lookup_location(self):
+        for zip_code in ZIP_CODES:
+            validate_and_lookup_location(zip_code)
+
+class ComparisonSuite:
+    """ComparisonService.compare_vehicles at increasing fleet sizes"""
+
+    params = [[5, 100, 1000]]
+    param_names = ['vehicles']
+
+    def setup(self, vehicles):
+        self.service = ComparisonService()
+        self.vehicles = build_comparison_vehicles(vehicles)
+
+    def time_compare_vehicles(self, vehicles):
+        self.service.compare_vehicles(self.vehicles)
+
+class SimulationSuite:
+    """Monte Carlo TCO at increasing draw counts"""
+
+    params = [[1000, 10000]]
+    param_names = ['draws']
+
+    def setup(self, draws):
+        self.service = PredictionService()
+        self.service.simulate_tco(TCO_CASES['purchase'], draws=10)
+
+    def time_simulate_tco(self, draws):
+        self.service.simulate_tco(TCO_CASES['purchase'], draws=draws, seed=0)
+
+class SensitivitySuite:
+    """Tornado-chart sensitivity over the default drivers"""
+
+    def setup(self):
+        self.service = PredictionService()
+        self.service.analyze_sensitivity(TCO_CASES['purchase'])
+
+    def time_analyze_sensitivity(self):
+        self.service.analyze_sensitivity(TCO_CASES['purchase'])
+
+class ScenarioGridSuite:
+    """What-if grid of 10 horizons x 11 mileages x 4 loan terms x 4 down payments"""
+
+    def setup(self):
+        self.service = PredictionService()
+        self.service.evaluate_scenario_grid(TCO_CASES['purchase'])
+
+    def time_evaluate_scenario_grid(self):
+        self.service.evaluate_scenario_grid(TCO_CASES['purchase'], loan_terms=[3, 4, 5, 6],
+                                            down_payments=[0, 3000, 6000, 10000])
+
+class HoldingPeriodSuite:
+    """Replacement-cycle solver over 20 years for a fleet"""
+
+    params = [[100, 2000]]
+    param_names = ['units']
+
+    def setup(self, units):
+        from services.holding_period import HoldingPeriodSolver
+        self.solver = HoldingPeriodSolver()
+        self.units = [dict(vehicle, analysis_years=20) for vehicle in build_comparison_vehicles(units)]
+
+    def time_solve_fleet(self, units):
+        self.solver.solve_fleet(self.units)
+
+class HorizonSuite:
+    """Analysis-horizon slider moves on a resumable purchase TCO (5 -> 10 -> 3 -> 15 -> 5 years)"""
+
+    def setup(self):
+        self.service = PredictionService()
+        self.state = self.service.create_purchase_horizon(TCO_CASES['purchase'])
+
+    def time_set_horizon(self):
+        for years in (10, 3, 15, 5):
+            self.state.set_horizon(years).get_results()
+
+class LeaseOffersSuite:
+    """Lease offers over 4 terms x 5 mileage caps x 5 down payments, priced from a money factor"""
+
+    def setup(self):
+        self.service = PredictionService()
+        self.service.evaluate_lease_offers(TCO_CASES['lease'])
+
+    def time_evaluate_lease_offers(self):
+        self.service.evaluate_lease_offers(TCO_CASES['lease'], lease_terms=[2, 3, 4, 5],
+                                           mileage_caps=[7500, 10000, 12000, 15000, 18000],
+                                           down_payments=[0, 1000, 2000, 3000, 4000],
+                                           money_factor=0.0025, residual_value_percent=[64, 58, 53, 48])
+
+class CrossoverSuite:
+    """Lease-vs-buy crossover for 12 lease x 16 loan offers over 120 months"""
+
+    def setup(self):
+        self.service = PredictionService()
+        self.lease_offers = [
+            {'lease_term': term, 'money_factor': money_factor, 'residual_value_percent': residual, 'down_payment': 2000}
+            for term, residual in ((2, 64), (3, 58), (4, 52)) for money_factor in (0.0015, 0.0020, 0.0025, 0.0030)
+        ]
+        self.loan_offers = [
+            {'loan_term': term, 'interest_rate': rate, 'down_payment': 4000}
+            for term in (3, 4, 5, 6) for rate in (0.9, 3.9, 5.9, 7.9)
+        ]
+        self.service.analyze_lease_buy_crossover(TCO_CASES['purchase'], self.lease_offers, self.loan_offers)
+
+    def time_analyze_lease_buy_crossover(self):
+        self.service.analyze_lease_buy_crossover(TCO_CASES['purchase'], self.lease_offers, self.loan_offers)
+
+class UsedValuationSuite:
+    """Batch used-vehicle valuation of an inventory feed drawn from the 2020 catalog"""
+
+    params = [[1000, 20000]]
+    param_names = ['rows']
+
+    def setup(self, rows):
+        import pandas as pd
+        from utils.used_vehicle_estimator import UsedVehicleEstimator
+        self.estimator = UsedVehicleEstimator()
+        trims = sorted(get_catalog_trims_for_year(2020), key=lambda trim: (trim['make'], trim['model'], trim['trim']))
+        self.feed = pd.DataFrame([
+            {'make': trims[index % len(trims)]['make'], 'model': trims[index % len(trims)]['model'], 'year': 2020,
+             'trim': trims[index % len(trims)]['trim'], 'mileage': 20000 + (index * 37) % 80000}
+            for index in range(rows)
+        ])
+
+    def time_estimate_values_batch(self, rows):
+        self.estimator.estimate_values_batch(self.feed)
+
+def timeraw_catalog_import():
+    """Cold import of the vehicle catalog (all manufacturer modules)"""
+    return "import data.vehicle_database"
+
+def timeraw_prediction_service_import():
+    """Cold import of the prediction service and its models"""
+    return "import services.prediction_service"
@@ -1,6 +1,12 @@
 # vehicle_database.py - Complete Master Vehicle Database Module
 # Comprehensive vehicle database with all available makes and models from project files
 
+from functools import lru_cache
+
+from utils.log_config import get_logger
+
+logger = get_logger(__name__)
+
 def safe_import_manufacturers():
     """Safely import manufacturer modules, handling missing files gracefully"""
     manufacturers = {}
@@ -36,23 +42,23 @@ def safe_import_manufacturers():
             data = getattr(module, f'MANUFACTURERS_{letter}', {})
             manufacturers.update(data)
             imported_count += 1
-            print(f"✅ Loaded {module_name}: {list(data.keys())}")
+            logger.debug("Loaded %s: %s", module_name, list(data))
         except ImportError as e:
             missing_files.append(f"{module_name}.py")
-            print(f"⚠️ Could not import {module_name}: {e}")
+            logger.warning("Could not import %s: %s", module_name, e)
         except Exception as e:
-            print(f"❌ Error loading {module_name}: {e}")
+            logger.error("Error loading %s: %s", module_name, e)
     
     return manufacturers, imported_count, missing_files
 
 # Load the vehicle database
 try:
     vehicle_database, loaded_count, missing = safe_import_manufacturers()
-    print(f"📊 Database Status: {loaded_count} modules loaded, {len(missing)} missing")
+    logger.info("Database status: %d modules loaded, %d missing", loaded_count, len(missing))
     if missing:
-        print(f"📝 Missing files: {missing}")
+        logger.warning("Missing database files: %s", missing)
 except Exception as e:
-    print(f"❌ Critical error loading database: {e}")
+    logger.critical("Critical error loading database: %s", e)
     vehicle_database = {}
 
 # Fallback data for basic functionality
@@ -156,7 +162,7 @@ FALLBACK_DATABASE = {
 
 # Use loaded database or fallback
 if not vehicle_database:
-    print("⚠️ Using fallback database with limited vehicle data")
+    logger.warning("Using fallback database with limited vehicle data")
     vehicle_database = FALLBACK_DATABASE
 
 # Core database access functions
@@ -189,8 +195,9 @@ def get_trims_for_vehicle(make, model, year):
     if not available_years:
         return {"Base": 25000, "Premium": 35000}  # Fallback
     
-    # Find closest year within production range
-    production_start, production_end = model_data.get('production_years', (2000, 2025))
+    # Find closest year within production range (models with a gap list several start/end pairs)
+    production_years = model_data.get('production_years', (2000, 2025))
+    production_start, production_end = production_years[0], production_years[-1]
     if year < production_start:
         closest_year = min(available_years)
     elif year > production_end:
@@ -240,9 +247,9 @@ def get_vehicle_characteristics(make, model, year, trim=None):
         actual_mpg = mpg_data.get('combined', 25)
         is_electric = mpg_data.get('is_electric', False)
         mpge_value = mpg_data.get('mpge_combined', 0) if is_electric else 0
-        print(f"✅ MPG Database: {make} {model} = {actual_mpg} MPG (source: {mpg_data.get('source', 'unknown')})")
+        logger.debug("MPG database: %s %s = %s MPG (source: %s)", make, model, actual_mpg, mpg_data.get('source', 'unknown'))
     except Exception as e:
-        print(f"⚠️ MPG Database unavailable, using fallback: {e}")
+        logger.warning("MPG database unavailable, using fallback: %s", e)
         # Fallback to old logic if MPG database not available
         actual_mpg = 25
         is_electric = False
@@ -398,6 +405,60 @@ def get_vehicles_by_segment(segment, year=2024):
     
     return sorted(results, key=lambda x: x['base_price'])
 
+def get_catalog_trims_for_year(year):
+    """Get every trim in production for a model year, with its MSRP"""
+    results = []
+
+    for make, models in vehicle_database.items():
+        for model, model_data in models.items():
+            # Production years are (start, end) pairs; models with a gap list several pairs
+            production_years = model_data.get('production_years', (2000, 2025))
+            production_runs = zip(production_years[0::2], production_years[1::2])
+            if not any(start_year <= year <= end_year for start_year, end_year in production_runs):
+                continue
+
+            trims = get_trims_for_vehicle(make, model, year)
+            for trim, price in trims.items():
+                results.append({
+                    'make': make,
+                    'model': model,
+                    'trim': trim,
+                    'year': year,
+                    'price': price
+                })
+
+    return results
+
+@lru_cache(maxsize=1)
+def get_vehicle_selection_index():
+    """
+    Get the cascading selection index: make -> model -> years and trims
+    Makes and models are sorted, years run newest first, and each year's trims
+    are ordered by price. Built once per process; treat as read-only.
+    """
+    index = {}
+
+    for make in get_all_manufacturers():
+        index[make] = {}
+        for model in get_models_for_manufacturer(make):
+            production_years = vehicle_database[make][model].get('production_years', (2000, 2025))
+            years = sorted({
+                year
+                for start_year, end_year in zip(production_years[0::2], production_years[1::2])
+                for year in range(start_year, end_year + 1)
+            }, reverse=True)
+
+            index[make][model] = {
+                'years': years,
+                'trims_by_year': {
+                    year: dict(sorted(get_trims_for_vehicle(make, model, year).items(),
+                                      key=lambda trim_price: (trim_price[1], trim_price[0])))
+                    for year in years
+                }
+            }
+
+    return index
+
 # Maintenance and legacy support functions
 def get_all_makes():
     """Legacy function - get all manufacturers"""
@@ -134,6 +134,31 @@ class EnhancedDepreciationModel:
             }
         }
         
+        # Maximum cumulative depreciation by segment
+        self.max_depreciation = {
+            'luxury': 0.90, 'electric': 0.92, 'hybrid': 0.82, 'economy': 0.88,
+            'sedan': 0.85, 'compact': 0.85, 'suv': 0.82,
+            'truck': 0.80, 'sports': 0.88
+        }
+        
+        # One-year depreciation by segment that current-year vehicles converge to with mileage
+        self.one_year_baseline = {
+            'luxury': 0.15,
+            'truck': 0.10,
+            'suv': 0.13,
+            'sports': 0.16,
+            'compact': 0.14,
+            'economy': 0.17,
+            'sedan': 0.15,
+            'electric': 0.18,
+            'hybrid': 0.14
+        }
+        
+        # Mileage impact on depreciation: knots (annual miles, multiplier) of a continuous
+        # piecewise-linear curve, flat below the first and above the last knot
+        self.mileage_impact_miles = [100, 8000, 12000, 15000, 20000, 40000]
+        self.mileage_impact_multipliers = [0.70, 0.90, 1.00, 1.10, 1.25, 1.40]
+        
         # Model-specific adjustments
         self.high_retention_models = {
             'Toyota': ['4Runner', 'Tacoma', 'Tundra', 'Land Cruiser', 'Sequoia'],
@@ -362,30 +387,22 @@ class EnhancedDepreciationModel:
             return min(0.96, curve[15] + ((year - 15) * 0.005))
 
     def _calculate_mileage_impact(self, annual_mileage: int) -> float:
-        """Calculate mileage impact on depreciation"""
-        standard_mileage = 12000
-        
-        if annual_mileage <= 100:
-            return 0.70  # Very low mileage bonus
-        elif annual_mileage < 8000:
-            # Low mileage: 70% to 90%
-            ratio = (annual_mileage - 100) / 7900
-            return 0.70 + (ratio * 0.20)
-        elif annual_mileage <= standard_mileage:
-            # Below average to standard: 90% to 100%
-            ratio = (annual_mileage - 8000) / 4000
-            return 0.90 + (ratio * 0.10)
-        elif annual_mileage <= 15000:
-            # Slightly above average: 100% to 110%
-            ratio = (annual_mileage - standard_mileage) / 3000
-            return 1.00 + (ratio * 0.10)
-        elif annual_mileage <= 20000:
-            # High mileage: 110% to 125%
-            ratio = (annual_mileage - 15000) / 5000
-            return 1.10 + (ratio * 0.15)
-        else:
-            # Very high mileage: capped at 140%
-            return min(1.40, 1.25 + ((annual_mileage - 20000) / 20000 * 0.15))
+        """
+        Calculate mileage impact on depreciation
+        Interpolates the mileage_impact knots: 70% for very low mileage, 100% at the
+        12,000 mi/yr standard, capped at 140% for very high mileage (same arithmetic
+        as numpy.interp, so vectorized callers get identical values)
+        """
+        miles = self.mileage_impact_miles
+        multipliers = self.mileage_impact_multipliers
+        
+        if annual_mileage <= miles[0]:
+            return multipliers[0]
+        for index in range(len(miles) - 1):
+            if annual_mileage < miles[index + 1]:
+                slope = (multipliers[index + 1] - multipliers[index]) / (miles[index + 1] - miles[index])
+                return slope * (annual_mileage - miles[index]) + multipliers[index]
+        return multipliers[-1]
 
     def _apply_model_specific_adjustments(self, make: str, model: str, base_multiplier: float) -> float:
         """Apply model-specific adjustments"""
@@ -403,10 +420,11 @@ class EnhancedDepreciationModel:
 
     def calculate_depreciation_schedule(self, initial_value: float, vehicle_make: str, 
                                     vehicle_model: str, model_year: int, 
-                                    annual_mileage: int, years: int) -> List[Dict[str, Any]]:
+                                    annual_mileage: int, years: int, first_year: int = 1) -> List[Dict[str, Any]]:
         """
         Calculate depreciation schedule with refined rates
         FIXED: Now handles current year vehicles with existing mileage properly
+        first_year > 1 continues an existing schedule from that ownership year
         """
         from datetime import datetime
         current_year = datetime.now().year
@@ -442,7 +460,7 @@ class EnhancedDepreciationModel:
             starting_value = initial_value
         
         # Calculate year-by-year depreciation
-        for year in range(1, years + 1):
+        for year in range(first_year, first_year + years):
             # Determine the vehicle's age at this point in ownership
             vehicle_age_at_this_year = vehicle_age_at_start + year
             
@@ -453,12 +471,7 @@ class EnhancedDepreciationModel:
             adjusted_rate = base_cumulative_rate * adjusted_brand_multiplier * mileage_multiplier
             
             # Apply caps
-            max_depreciation = {
-                'luxury': 0.90, 'electric': 0.92, 'hybrid': 0.82, 'economy': 0.88,
-                'sedan': 0.85, 'compact': 0.85, 'suv': 0.82,
-                'truck': 0.80, 'sports': 0.88
-            }
-            cap = max_depreciation.get(segment, 0.85)
+            cap = self.max_depreciation.get(segment, 0.85)
             adjusted_rate = min(adjusted_rate, cap)
             
             # CRITICAL FIX: For current year vehicles, we need to handle year 1 specially
@@ -481,8 +494,6 @@ class EnhancedDepreciationModel:
                     annual_depreciation = starting_value - new_value
                 else:
                     # Subsequent years - calculate incremental depreciation
-                    previous_value = schedule[-1]['vehicle_value']
-                    
                     # Get previous year's cumulative rate
                     prev_vehicle_age = vehicle_age_at_start + (year - 1)
                     prev_cumulative_rate = self._get_cumulative_depreciation_rate(
@@ -491,6 +502,9 @@ class EnhancedDepreciationModel:
                     prev_adjusted_rate = prev_cumulative_rate * adjusted_brand_multiplier * mileage_multiplier
                     prev_adjusted_rate = min(prev_adjusted_rate, cap)
                     
+                    # A continued schedule starts without the previous entry; its value follows from the rate
+                    previous_value = schedule[-1]['vehicle_value'] if schedule else starting_value * (1 - prev_adjusted_rate)
+                    
                     # Calculate new value and annual depreciation
                     # We're moving from one cumulative rate to the next
                     new_value = starting_value * (1 - adjusted_rate)
@@ -534,18 +548,7 @@ class EnhancedDepreciationModel:
                 return initial_value * 0.98
             
             # Get the 1-year baseline depreciation rate for this segment
-            one_year_baseline = {
-                'luxury': 0.15,
-                'truck': 0.10,
-                'suv': 0.13,
-                'sports': 0.16,
-                'compact': 0.14,
-                'economy': 0.17,
-                'sedan': 0.15,
-                'electric': 0.18,
-                'hybrid': 0.14
-            }
-            baseline_rate = one_year_baseline.get(segment, 0.15)
+            baseline_rate = self.one_year_baseline.get(segment, 0.15)
             
             # Calculate depreciation based on mileage progression to 1-year baseline
             # Uses a smooth curve that approaches but doesn't exceed the 1-year rate
@@ -601,12 +604,7 @@ class EnhancedDepreciationModel:
         final_rate = base_rate * adjusted_brand_multiplier * mileage_multiplier
         
         # Apply caps
-        max_depreciation = {
-            'luxury': 0.90, 'electric': 0.92, 'hybrid': 0.82, 'economy': 0.88,
-            'sedan': 0.85, 'compact': 0.85, 'suv': 0.82,
-            'truck': 0.80, 'sports': 0.88
-        }
-        cap = max_depreciation.get(segment, 0.85)
+        cap = self.max_depreciation.get(segment, 0.85)
         final_rate = min(final_rate, cap)
         
         current_value = initial_value * (1 - final_rate)
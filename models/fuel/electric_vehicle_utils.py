@@ -36,6 +36,19 @@ class EVCostCalculator:
             'performance': 45 # e.g., Tesla Model S Plaid
         }
         
+        # Driving style efficiency adjustments (kWh per 100 miles is divided by these)
+        self.driving_style_multipliers = {
+            'gentle': 1.15,     # 15% better efficiency
+            'normal': 1.0,      # Baseline
+            'aggressive': 0.85  # 15% worse efficiency
+        }
+        
+        # Terrain efficiency adjustments
+        self.terrain_multipliers = {
+            'flat': 1.05,       # 5% better efficiency
+            'hilly': 0.95       # 5% worse efficiency
+        }
+        
         # Charging pattern assumptions
         self.default_charging_patterns = {
             'home_primary': {
@@ -463,6 +463,15 @@ class MaintenanceCalculator:
         self.shop_multipliers = {
             'dealership': 1.3, 'independent': 1.0, 'chain': 1.1, 'specialty': 1.2
         }
+        
+        # Minimum total mileage before a wear component is replaced
+        self.wear_thresholds = {
+            'brake_pads': 30000,           # Minimum mileage before brake pads typically need replacement
+            'brake_rotors': 60000,         # Minimum mileage for rotor replacement
+            'tire_replacement_set': 40000, # Minimum tire life
+            'battery_replacement': 48000,  # 4 years minimum (4 * 12k miles)
+            'shock_strut_replacement': 80000, # 80k miles minimum
+        }
 
     def is_electric_vehicle(self, make: str, model: str = '') -> bool:
         """Determine if vehicle is electric"""
@@ -538,16 +547,8 @@ class MaintenanceCalculator:
 
     def is_wear_component_needed(self, service_type: str, total_mileage: int, vehicle_age: int) -> bool:
         """Determine if wear component replacement is actually needed"""
-        wear_thresholds = {
-            'brake_pads': 30000,           # Minimum mileage before brake pads typically need replacement
-            'brake_rotors': 60000,         # Minimum mileage for rotor replacement
-            'tire_replacement_set': 40000, # Minimum tire life
-            'battery_replacement': 48000,  # 4 years minimum (4 * 12k miles)
-            'shock_strut_replacement': 80000, # 80k miles minimum
-        }
-        
-        if service_type in wear_thresholds:
-            min_mileage = wear_thresholds[service_type]
+        if service_type in self.wear_thresholds:
+            min_mileage = self.wear_thresholds[service_type]
             
             # For battery, also consider age
             if service_type == 'battery_replacement':
@@ -618,16 +619,20 @@ class MaintenanceCalculator:
 
     def get_maintenance_schedule(self, annual_mileage: int, years: int, 
                                starting_mileage: int = 0, vehicle_make: str = 'Toyota',
-                               driving_style: str = 'normal', vehicle_model: str = '') -> List[Dict[str, Any]]:
-        """Generate maintenance schedule with proper filtering"""
+                               driving_style: str = 'normal', vehicle_model: str = '',
+                               first_year: int = 1) -> List[Dict[str, Any]]:
+        """
+        Generate maintenance schedule with proper filtering
+        first_year > 1 continues an existing schedule (starting_mileage stays the odometer at year 1)
+        """
         
         schedule = []
-        total_mileage = starting_mileage
+        total_mileage = starting_mileage + annual_mileage * (first_year - 1)
         
         # Get applicable services for this vehicle
         applicable_services = self.get_applicable_services(vehicle_make, vehicle_model)
         
-        for year in range(1, years + 1):
+        for year in range(first_year, first_year + years):
             total_mileage += annual_mileage
             year_services = []
             vehicle_age = year
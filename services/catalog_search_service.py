@@ -0,0 +1,207 @@
+"""
+Catalog Search Service
+Ranks the whole vehicle catalog by total cost of ownership for a driver profile
+Uses the batch TCO engine and a bounded heap so only the top-k results are kept
+"""
+
+from typing import Dict, Any, List
+import heapq
+
+from services.prediction_service import PredictionService
+from data.vehicle_database import get_catalog_trims_for_year, get_vehicle_characteristics
+
+class CatalogSearchService:
+    """Service for finding the lowest-TCO vehicles across the catalog"""
+
+    def __init__(self, prediction_service: PredictionService = None):
+        self.prediction_service = prediction_service or PredictionService()
+
+        # Ranking metrics (lower is better) and where they live in the TCO summary
+        self.ranking_metrics = {
+            'total_tco': 'total_tco',
+            'total_ownership_cost': 'total_ownership_cost',
+            'average_annual_cost': 'average_annual_cost',
+            'cost_per_mile': 'cost_per_mile'
+        }
+
+        self.powertrain_types = ['electric', 'hybrid', 'gas']
+
+    def find_lowest_tco_vehicles(self, profile: Dict[str, Any], year: int = 2024, top_k: int = 10,
+                                 segment: str = None, min_price: float = None, max_price: float = None,
+                                 powertrain: str = None, metric: str = 'total_tco',
+                                 batch_size: int = 250) -> Dict[str, Any]:
+        """
+        Find the k cheapest vehicles to own for a driver profile and location
+        profile holds the usual calculator inputs (annual_mileage, state, zip_code,
+        driver_age, gross_income, analysis_years, fuel_price, financing fields...).
+        Every catalog trim is evaluated as a purchase at its MSRP.
+        """
+
+        if metric not in self.ranking_metrics:
+            raise ValueError(f"Unsupported ranking metric '{metric}'. Use one of: {', '.join(self.ranking_metrics)}")
+        if powertrain and powertrain not in self.powertrain_types:
+            raise ValueError(f"Unsupported powertrain '{powertrain}'. Use one of: {', '.join(self.powertrain_types)}")
+
+        top_k = max(1, int(top_k))
+        candidates = self._get_candidates(year, segment, min_price, max_price, powertrain)
+
+        # Bounded max-heap of (-metric, -sequence, entry): the root is always the worst kept vehicle
+        heap = []
+        evaluated = 0
+        failed = 0
+
+        for batch_start in range(0, len(candidates), batch_size):
+            batch = candidates[batch_start:batch_start + batch_size]
+            batch_inputs = [self._build_input(profile, candidate) for candidate in batch]
+            batch_results = self.prediction_service.calculate_batch_tco(batch_inputs)
+
+            for offset, (candidate, tco_results) in enumerate(zip(batch, batch_results)):
+                if 'error' in tco_results:
+                    failed += 1
+                    continue
+
+                evaluated += 1
+                metric_value = tco_results['summary'].get(self.ranking_metrics[metric], 0)
+                sequence = batch_start + offset
+                heap_item = (-metric_value, -sequence, candidate, tco_results)
+
+                if len(heap) < top_k:
+                    heapq.heappush(heap, heap_item)
+                elif metric_value < -heap[0][0]:
+                    heapq.heapreplace(heap, heap_item)
+
+        ranked = sorted(heap, key=lambda item: (-item[0], -item[1]))
+        vehicles = [
+            self._create_ranked_entry(rank, candidate, tco_results, metric)
+            for rank, (_, _, candidate, tco_results) in enumerate(ranked, 1)
+        ]
+
+        return {
+            'vehicles': vehicles,
+            'metric': metric,
+            'year': year,
+            'candidates_considered': len(candidates),
+            'candidates_evaluated': evaluated,
+            'candidates_failed': failed,
+            'filters': {
+                'segment': segment,
+                'min_price': min_price,
+                'max_price': max_price,
+                'powertrain': powertrain
+            }
+        }
+
+    def _get_candidates(self, year: int, segment: str = None, min_price: float = None,
+                        max_price: float = None, powertrain: str = None) -> List[Dict[str, Any]]:
+        """Enumerate catalog trims for the year and apply the cheap filters"""
+
+        candidates = []
+        segment_cache = {}
+
+        for entry in get_catalog_trims_for_year(year):
+            price = entry['price']
+            if min_price is not None and price < min_price:
+                continue
+            if max_price is not None and price > max_price:
+                continue
+
+            model_key = (entry['make'], entry['model'])
+            if model_key not in segment_cache:
+                segment_cache[model_key] = self.prediction_service.depreciation_model._classify_vehicle_segment(
+                    entry['make'], entry['model']
+                )
+            vehicle_segment = segment_cache[model_key]
+            if segment and vehicle_segment != segment:
+                continue
+
+            candidate = dict(entry, segment=vehicle_segment)
+            if powertrain:
+                candidate['powertrain'] = self._classify_powertrain(candidate)
+                if candidate['powertrain'] != powertrain:
+                    continue
+
+            candidates.append(candidate)
+
+        return candidates
+
+    def _classify_powertrain(self, candidate: Dict[str, Any]) -> str:
+        """Classify a catalog trim as electric, hybrid or gas"""
+
+        characteristics = get_vehicle_characteristics(
+            candidate['make'], candidate['model'], candidate['year'], candidate['trim']
+        )
+        if characteristics.get('is_electric', False):
+            return 'electric'
+
+        name = f"{candidate['model']} {candidate['trim']}".lower()
+        if candidate['segment'] == 'hybrid' or 'hybrid' in name:
+            return 'hybrid'
+
+        return 'gas'
+
+    def _build_input(self, profile: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine the driver profile with a catalog trim into calculator input"""
+
+        input_data = dict(profile)
+        input_data.update({
+            'make': candidate['make'],
+            'model': candidate['model'],
+            'year': candidate['year'],
+            'trim': candidate['trim'],
+            'price': candidate['price'],
+            'trim_msrp': candidate['price'],
+            'transaction_type': 'purchase'
+        })
+        return input_data
+
+    def _create_ranked_entry(self, rank: int, candidate: Dict[str, Any],
+                             tco_results: Dict[str, Any], metric: str) -> Dict[str, Any]:
+        """Create the result row for a ranked vehicle"""
+
+        summary = tco_results.get('summary', {})
+        characteristics = tco_results.get('vehicle_characteristics', {})
+
+        return {
+            'rank': rank,
+            'vehicle_name': f"{candidate['year']} {candidate['make']} {candidate['model']} {candidate['trim']}",
+            'make': candidate['make'],
+            'model': candidate['model'],
+            'year': candidate['year'],
+            'trim': candidate['trim'],
+            'price': candidate['price'],
+            'segment': candidate['segment'],
+            'powertrain': candidate.get('powertrain') or self._classify_powertrain(candidate),
+            'is_electric': characteristics.get('is_electric', False),
+            'ranking_value': summary.get(self.ranking_metrics[metric], 0),
+            'total_tco': summary.get('total_tco', 0),
+            'total_ownership_cost': summary.get('total_ownership_cost', 0),
+            'average_annual_cost': summary.get('average_annual_cost', 0),
+            'cost_per_mile': summary.get('cost_per_mile', 0),
+            'final_value': summary.get('final_vehicle_value', 0),
+            'tco_results': tco_results
+        }
+
+# Test function
+def test_catalog_search_service():
+    """Test the catalog-wide TCO search"""
+    service = CatalogSearchService()
+
+    profile = {
+        'annual_mileage': 12000,
+        'state': 'CA',
+        'zip_code': '90210',
+        'driver_age': 35,
+        'gross_income': 80000,
+        'analysis_years': 5
+    }
+
+    search = service.find_lowest_tco_vehicles(profile, year=2024, top_k=5, segment='suv', max_price=45000)
+
+    print(f"\n=== TOP {len(search['vehicles'])} LOWEST-TCO SUVs UNDER $45K ===")
+    print(f"Evaluated {search['candidates_evaluated']} of {search['candidates_considered']} candidates")
+    for vehicle in search['vehicles']:
+        print(f"{vehicle['rank']}. {vehicle['vehicle_name']} (${vehicle['price']:,.0f}): "
+              f"TCO ${vehicle['total_tco']:,.0f}, {vehicle['powertrain']}")
+
+if __name__ == "__main__":
+    test_catalog_search_service()
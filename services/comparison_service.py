@@ -6,22 +6,30 @@ Handles multiple vehicle comparisons, rankings, and analysis
 from typing import Dict, Any, List
 import pandas as pd
 from services.prediction_service import PredictionService
+from services.recommendation_engine import RecommendationEngine
+from utils.log_config import get_logger
+
+logger = get_logger(__name__)
 
 class ComparisonService:
     """Service for comparing multiple vehicles"""
     
-    def __init__(self):
-        self.prediction_service = PredictionService()
+    def __init__(self, prediction_service: PredictionService = None):
+        self.prediction_service = prediction_service or PredictionService()
+        self.recommendation_engine = RecommendationEngine()
     
     def compare_vehicles(self, vehicles: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Compare multiple vehicles and generate comprehensive analysis"""
         
         vehicle_results = []
         
-        for vehicle in vehicles:
+        # Calculate TCO for all vehicles in one batch so repeated lookups are shared
+        batch_results = self.prediction_service.calculate_batch_tco(vehicles)
+        
+        for vehicle, tco_results in zip(vehicles, batch_results):
             try:
-                # Calculate TCO using prediction service
-                tco_results = self.prediction_service.calculate_total_cost_of_ownership(vehicle)
+                if 'error' in tco_results:
+                    raise ValueError(tco_results['error'])
                 
                 # Extract key metrics for comparison
                 vehicle_result = self._extract_comparison_metrics(vehicle, tco_results)
@@ -74,7 +82,7 @@ class ComparisonService:
         if analysis_years > 1 and annual_cost > total_cost * 0.8:
             # This suggests annual_cost field contains total cost, fix it
             annual_cost = total_cost / analysis_years
-            print(f"Fixed annual cost calculation for {vehicle['make']} {vehicle['model']}: ${annual_cost:,.0f}")
+            logger.debug("Fixed annual cost calculation for %s %s: $%.0f", vehicle['make'], vehicle['model'], annual_cost)
         
         # Calculate value score (lower cost per mile + affordability)
         cost_per_mile = summary.get('cost_per_mile', 0)
@@ -106,7 +114,7 @@ class ComparisonService:
             'annual_mileage': vehicle.get('annual_mileage', 0),
             'purchase_price': vehicle.get('purchase_price', vehicle.get('trim_msrp', 0)),
             'calculation_successful': True,
-            'raw_results': tco_results
+            'affordability': affordability
         }
     
     def _create_error_result(self, vehicle: Dict[str, Any], error_message: str) -> Dict[str, Any]:
@@ -194,8 +202,18 @@ class ComparisonService:
         rankings['most_affordable'] = rankings['by_affordability'][0] if rankings['by_affordability'] else None
         rankings['best_efficiency'] = rankings['by_cost_per_mile'][0] if rankings['by_cost_per_mile'] else None
         
+        # Non-dominated set across cost, cost per mile, affordability and reliability
+        rankings['pareto_front'] = self.get_pareto_front(successful_results)
+        
         return rankings
     
+    def get_pareto_front(self, vehicle_results: List[Dict[str, Any]], 
+                         objectives: List[str] = None) -> List[Dict[str, Any]]:
+        """Get the Pareto-optimal vehicles from comparison metrics"""
+        
+        successful_results = [v for v in vehicle_results if v.get('calculation_successful', False)]
+        return self.recommendation_engine.compute_pareto_front(successful_results, objectives)
+    
     def _generate_comparison_insights(self, vehicle_results: List[Dict[str, Any]], 
                                     analysis: Dict[str, Any]) -> List[str]:
         """Generate insights from comparison analysis"""
@@ -0,0 +1,220 @@
+"""
+Holding Period Solver
+Finds the ownership duration that minimizes average annual TCO or cost per mile
+by accumulating the depreciation, maintenance, insurance, fuel and financing
+curves year by year out to 20 years, for one vehicle or a whole fleet
+"""
+
+from typing import Dict, Any, List, Union
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from services.prediction_service import PredictionService
+from services.vehicle_cost_profile import VehicleCostProfile, PURCHASE_CATEGORIES, OUT_OF_POCKET_CATEGORIES, get_base_inputs
+
+DEFAULT_MAX_YEARS = 20
+
+# cost_per_mile here is total TCO (including depreciation) per mile driven
+HOLDING_OBJECTIVES = ['average_annual_tco', 'cost_per_mile']
+
+# Inputs that fix a vehicle cost profile; fleet units sharing them are solved in one array pass
+PROFILE_FIELDS = ['make', 'model', 'year', 'trim', 'state', 'zip_code', 'driving_style', 'terrain',
+                  'driver_age', 'coverage_type', 'num_household_vehicles', 'charging_preference']
+
+# Per-unit inputs evaluated as arrays within a profile
+UNIT_FIELDS = ['purchase_price', 'annual_mileage', 'current_mileage', 'fuel_price', 'electricity_rate',
+               'interest_rate', 'loan_amount', 'loan_term']
+
+class HoldingPeriodSolver:
+    """Optimal ownership duration (replacement cycle) for purchases"""
+
+    def __init__(self, prediction_service: PredictionService = None):
+        self.prediction_service = prediction_service or PredictionService()
+
+    def solve(self, input_data: Dict[str, Any], max_years: int = DEFAULT_MAX_YEARS,
+              objective: str = 'average_annual_tco', min_years: int = 1) -> Dict[str, Any]:
+        """Best holding period for one vehicle, with the year-by-year curve it was chosen from"""
+
+        self._validate(input_data, max_years, objective, min_years)
+        profile = VehicleCostProfile(input_data, self.prediction_service)
+        annual_costs = profile.evaluate(years=max_years)
+        curves = get_holding_curves(annual_costs, profile.base_inputs['annual_mileage'])
+
+        best_index = get_best_holding_index(curves[objective], min_years)
+        best_years = int(best_index + 1)
+        current_mileage = profile.base_inputs['current_mileage']
+        annual_mileage = profile.base_inputs['annual_mileage']
+
+        curve = []
+        for index in range(max_years):
+            curve.append({
+                'years': index + 1,
+                'annual_cost': float(curves['annual_total'][index]),
+                'total_tco': float(curves['total_tco'][index]),
+                'average_annual_tco': float(curves['average_annual_tco'][index]),
+                'cost_per_mile': float(curves['cost_per_mile'][index]),
+                'average_annual_out_of_pocket': float(curves['average_annual_out_of_pocket'][index]),
+                'vehicle_value': float(annual_costs['vehicle_value'][index]),
+                'cumulative_mileage': current_mileage + annual_mileage * (index + 1)
+            })
+
+        return {
+            'objective': objective,
+            'optimal_years': best_years,
+            'optimal_value': float(curves[objective][best_index]),
+            'trade_in_year': datetime.now().year + best_years,
+            'trade_in_value': float(annual_costs['vehicle_value'][best_index]),
+            'trade_in_mileage': current_mileage + annual_mileage * best_years,
+            'curve': curve
+        }
+
+    def solve_fleet(self, units: Union[List[Dict[str, Any]], pd.DataFrame], max_years: int = DEFAULT_MAX_YEARS,
+                    objective: str = 'average_annual_tco', min_years: int = 1) -> pd.DataFrame:
+        """
+        Best holding period for every unit, one row per unit in input order
+        Units with the same vehicle and driver profile are evaluated together;
+        a unit that cannot be evaluated gets its reason in the 'error' column.
+        """
+        if isinstance(units, pd.DataFrame):
+            # Blank cells take the engine defaults, as a missing key does in a list of dicts
+            units = [{field: value for field, value in record.items() if pd.notna(value)}
+                     for record in units.to_dict('records')]
+        self._validate({}, max_years, objective, min_years)
+
+        rows = [None] * len(units)
+        groups = {}
+        for index, unit in enumerate(units):
+            try:
+                base_inputs = get_base_inputs(unit)
+                if unit.get('transaction_type', 'purchase').lower() == 'lease':
+                    raise ValueError("Holding periods are solved for purchases")
+                key = tuple(unit.get(field) for field in PROFILE_FIELDS) + (bool(unit.get('is_electric')),)
+            except Exception as e:
+                rows[index] = self._error_row(unit, e)
+                continue
+            groups.setdefault(key, []).append((index, unit, base_inputs))
+
+        for members in groups.values():
+            try:
+                self._solve_group(members, rows, max_years, objective, min_years)
+            except Exception as e:
+                for index, unit, _ in members:
+                    rows[index] = self._error_row(unit, e)
+
+        return pd.DataFrame(rows)
+
+    def _solve_group(self, members: List[tuple], rows: List[Dict[str, Any]], max_years: int,
+                     objective: str, min_years: int):
+        """Solve all units sharing one vehicle cost profile in one array pass"""
+
+        profile = VehicleCostProfile(members[0][1], self.prediction_service)
+        unit_inputs = {field: np.array([base_inputs[field] for _, _, base_inputs in members], dtype=float)
+                       for field in UNIT_FIELDS}
+
+        annual_costs = profile.evaluate(years=max_years, **unit_inputs)
+        curves = get_holding_curves(annual_costs, unit_inputs['annual_mileage'])
+        best_index = get_best_holding_index(curves[objective], min_years)
+        trade_in_year = datetime.now().year + best_index + 1
+
+        for position, (index, unit, base_inputs) in enumerate(members):
+            best = best_index[position]
+            rows[index] = {
+                'make': unit.get('make'),
+                'model': unit.get('model'),
+                'year': unit.get('year'),
+                'optimal_years': int(best + 1),
+                'optimal_value': float(curves[objective][position, best]),
+                'average_annual_tco': float(curves['average_annual_tco'][position, best]),
+                'cost_per_mile': float(curves['cost_per_mile'][position, best]),
+                'trade_in_year': int(trade_in_year[position]),
+                'trade_in_value': float(annual_costs['vehicle_value'][position, best]),
+                'trade_in_mileage': base_inputs['current_mileage'] + base_inputs['annual_mileage'] * (best + 1),
+                'error': None
+            }
+
+    def _error_row(self, unit: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Result row for a unit that could not be solved"""
+
+        message = f"Missing input: {error.args[0]}" if isinstance(error, KeyError) else str(error) or type(error).__name__
+        return {'make': unit.get('make'), 'model': unit.get('model'), 'year': unit.get('year'), 'error': message}
+
+    def _validate(self, input_data: Dict[str, Any], max_years: int, objective: str, min_years: int):
+        """Reject unsupported arguments before any work"""
+
+        if objective not in HOLDING_OBJECTIVES:
+            raise ValueError(f"Unknown objective '{objective}' (expected one of: {', '.join(HOLDING_OBJECTIVES)})")
+        if not 1 <= min_years <= max_years:
+            raise ValueError("Need 1 <= min_years <= max_years")
+        if input_data.get('transaction_type', 'purchase').lower() == 'lease':
+            raise ValueError("Holding periods are solved for purchases")
+
+def get_holding_curves(annual_costs: Dict[str, np.ndarray], annual_mileage: Any) -> Dict[str, np.ndarray]:
+    """Cumulative cost curves by holding period (last axis: 1..years)"""
+
+    annual_total = sum(annual_costs[category] for category in PURCHASE_CATEGORIES)
+    annual_out_of_pocket = sum(annual_costs[category] for category in OUT_OF_POCKET_CATEGORIES)
+    years = np.arange(1, annual_total.shape[-1] + 1)
+    total_tco = np.cumsum(annual_total, axis=-1)
+    total_miles = np.asarray(annual_mileage, dtype=float)[..., None] * years
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cost_per_mile = np.where(total_miles > 0, total_tco / total_miles, np.inf)
+
+    return {
+        'annual_total': annual_total,
+        'total_tco': total_tco,
+        'average_annual_tco': total_tco / years,
+        'average_annual_out_of_pocket': np.cumsum(annual_out_of_pocket, axis=-1) / years,
+        'cost_per_mile': cost_per_mile
+    }
+
+def get_best_holding_index(objective_curve: np.ndarray, min_years: int = 1) -> np.ndarray:
+    """Index of the cheapest holding period of at least min_years (shortest on ties)"""
+
+    candidates = np.array(objective_curve, dtype=float)
+    candidates[..., :min_years - 1] = np.inf
+    return np.argmin(candidates, axis=-1)
+
+# Test function
+def test_holding_period():
+    """Test holding period optimization"""
+    import time
+
+    solver = HoldingPeriodSolver()
+    input_data = {
+        'make': 'Toyota', 'model': 'Camry', 'year': 2024, 'trim': 'LE', 'price': 28000,
+        'transaction_type': 'purchase', 'annual_mileage': 12000,
+        'state': 'CA', 'zip_code': '90210', 'fuel_price': 4.50
+    }
+
+    results = solver.solve(input_data)
+    print("=== HOLDING PERIOD TEST ===")
+    print(f"Optimal holding period: {results['optimal_years']} years "
+          f"(${results['optimal_value']:,.0f}/year, trade in {results['trade_in_year']} "
+          f"at ${results['trade_in_value']:,.0f})")
+
+    fleet = [dict(input_data, annual_mileage=8000 + (unit % 20) * 1000, price=26000 + (unit % 7) * 500)
+             for unit in range(2000)]
+    started = time.perf_counter()
+    fleet_results = solver.solve_fleet(fleet)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"Fleet of {len(fleet)} units in {elapsed_ms:.0f} ms; optimal years: "
+          f"{fleet_results['optimal_years'].value_counts().sort_index().to_dict()}")
+
+    # A DataFrame with blank cells must price units as the equivalent list does
+    mixed_fleet = [
+        dict(input_data, driver_age=22),
+        dict(input_data, loan_amount=22000, interest_rate=6.5, loan_term=5),
+        dict(input_data, make='Honda', model='Civic', trim='LX', price=25000),
+        dict(input_data, make='Honda', model='Civic', trim='LX', price=25000, current_mileage=15000)
+    ]
+    from_list = solver.solve_fleet(mixed_fleet)
+    from_frame = solver.solve_fleet(pd.DataFrame(mixed_fleet))
+    # Blank cells make their DataFrame columns float, so compare values rather than dtypes
+    pd.testing.assert_frame_equal(from_list, from_frame, check_dtype=False)
+    print(f"DataFrame fleet matches list fleet: "
+          f"{', '.join(f'${value:,.0f}' for value in from_frame['average_annual_tco'])} average annual TCO")
+
+if __name__ == "__main__":
+    test_holding_period()
@@ -0,0 +1,338 @@
+"""
+Incremental Comparison State
+Keeps comparison statistics, rankings and best-by-criteria up to date as vehicles
+are added, removed or edited, instead of rebuilding the whole comparison each time
+"""
+
+from typing import Dict, Any, List, Tuple
+import bisect
+import numpy as np
+
+from services.comparison_service import ComparisonService
+
+class IncrementalComparisonState:
+    """Comparison results maintained one vehicle change at a time"""
+
+    def __init__(self, comparison_service: ComparisonService = None):
+        self.comparison_service = comparison_service or ComparisonService()
+
+        # Ranking name -> (metric, descending, only include positive values)
+        self.ranking_definitions = {
+            'by_annual_cost': ('annual_cost', False, False),
+            'by_total_cost': ('total_cost', False, False),
+            'by_value_score': ('value_score', True, False),
+            'by_affordability': ('affordability_score', False, True),
+            'by_cost_per_mile': ('cost_per_mile', False, True)
+        }
+
+        self.best_by_ranking = {
+            'best_annual_cost': 'by_annual_cost',
+            'best_total_cost': 'by_total_cost',
+            'best_value': 'by_value_score',
+            'most_affordable': 'by_affordability',
+            'best_efficiency': 'by_cost_per_mile'
+        }
+
+        # Pareto objectives, as ComparisonService.get_pareto_front uses them
+        self.pareto_objectives = list(self.comparison_service.recommendation_engine.pareto_objectives.keys())
+
+        self.clear()
+
+    def clear(self):
+        """Reset to an empty comparison"""
+        self.vehicles = {}      # vehicle_id -> comparison metrics (insertion order kept)
+        self.sequence = {}      # vehicle_id -> first-insertion sequence number (ties keep insertion order)
+        self.source_results = {}  # vehicle_id -> TCO results the metrics were built from
+        self.next_sequence = 0
+        self.sorted_rankings = {name: [] for name in self.ranking_definitions}
+        self.pareto_points = {}   # vehicle_id -> objective point (lower is better), successful vehicles only
+        self.pareto_front = {}    # vehicle_id -> objective point, non-dominated vehicles only
+        self.totals = {
+            'successful': 0,
+            'annual_cost': 0.0,
+            'total_cost': 0.0,
+            'affordability_score': 0.0,
+            'affordable': 0,
+            'lease': 0,
+            'purchase': 0
+        }
+        self._cached_results = None
+
+    def __len__(self) -> int:
+        return len(self.vehicles)
+
+    def __contains__(self, vehicle_id: Any) -> bool:
+        return vehicle_id in self.vehicles
+
+    def add_vehicle(self, vehicle_id: Any, vehicle_data: Dict[str, Any], tco_results: Dict[str, Any]):
+        """Add a vehicle, or replace it if the id is already in the comparison"""
+
+        if vehicle_id in self.vehicles:
+            self._unindex_vehicle(vehicle_id)
+        else:
+            self.sequence[vehicle_id] = self.next_sequence
+            self.next_sequence += 1
+
+        try:
+            metrics = self.comparison_service._extract_comparison_metrics(vehicle_data, tco_results)
+        except Exception as e:
+            metrics = self.comparison_service._create_error_result(vehicle_data, str(e))
+
+        self.vehicles[vehicle_id] = metrics
+        self.source_results[vehicle_id] = tco_results
+        self._index_vehicle(vehicle_id)
+        self._cached_results = None
+
+    def update_vehicle(self, vehicle_id: Any, vehicle_data: Dict[str, Any], tco_results: Dict[str, Any]):
+        """Replace a vehicle's data and results, keeping its position"""
+        self.add_vehicle(vehicle_id, vehicle_data, tco_results)
+
+    def remove_vehicle(self, vehicle_id: Any) -> bool:
+        """Remove a vehicle; returns False if it was not in the comparison"""
+
+        if vehicle_id not in self.vehicles:
+            return False
+
+        self._unindex_vehicle(vehicle_id)
+        del self.vehicles[vehicle_id]
+        del self.sequence[vehicle_id]
+        del self.source_results[vehicle_id]
+        self._cached_results = None
+        return True
+
+    def sync(self, entries: List[Tuple[Any, Dict[str, Any], Dict[str, Any]]]):
+        """
+        Bring the state in line with a list of (vehicle_id, vehicle_data, tco_results)
+        Only vehicles that were added, removed or given new results are touched.
+        """
+
+        current_ids = set()
+        for vehicle_id, vehicle_data, tco_results in entries:
+            current_ids.add(vehicle_id)
+            if self.source_results.get(vehicle_id) is not tco_results:
+                self.add_vehicle(vehicle_id, vehicle_data, tco_results)
+
+        for vehicle_id in [v for v in self.vehicles if v not in current_ids]:
+            self.remove_vehicle(vehicle_id)
+
+    def get_best(self, criterion: str) -> Dict[str, Any]:
+        """Get the current leader for a best-by-criteria key (e.g. 'best_value')"""
+
+        ranking = self.sorted_rankings[self.best_by_ranking[criterion]]
+        return self.vehicles[ranking[0][-1]] if ranking else None
+
+    def get_ranking(self, ranking_name: str) -> List[Dict[str, Any]]:
+        """Get a ranking as a list of vehicle metrics, best first"""
+        return [self.vehicles[key[-1]] for key in self.sorted_rankings[ranking_name]]
+
+    def get_pareto_front(self) -> List[Dict[str, Any]]:
+        """Non-dominated vehicles in order of the first objective, as ComparisonService.get_pareto_front"""
+
+        front_ids = sorted(self.pareto_front, key=lambda v: (self.pareto_front[v], self.sequence[v]))
+        return [self.vehicles[vehicle_id] for vehicle_id in front_ids]
+
+    def get_comparison_results(self) -> Dict[str, Any]:
+        """Get results in the same shape as ComparisonService.compare_vehicles"""
+
+        if self._cached_results is not None:
+            return self._cached_results
+
+        vehicle_results = list(self.vehicles.values())
+        analysis = self._get_analysis()
+
+        rankings = {}
+        if self.totals['successful']:
+            for ranking_name in self.ranking_definitions:
+                rankings[ranking_name] = self.get_ranking(ranking_name)
+            for criterion, ranking_name in self.best_by_ranking.items():
+                rankings[criterion] = rankings[ranking_name][0] if rankings[ranking_name] else None
+            rankings['pareto_front'] = self.get_pareto_front()
+
+        insights = self.comparison_service._generate_comparison_insights(vehicle_results, analysis)
+
+        if self.totals['successful']:
+            summary = {
+                'total_vehicles': len(vehicle_results),
+                'successful_calculations': self.totals['successful'],
+                'failed_calculations': len(vehicle_results) - self.totals['successful'],
+                'best_overall': rankings.get('best_annual_cost'),
+                'most_affordable': rankings.get('most_affordable'),
+                'best_value': rankings.get('best_value'),
+                'cost_leader': rankings.get('best_annual_cost'),
+                'recommendation': self.comparison_service._generate_overall_recommendation(rankings)
+            }
+        else:
+            summary = {'error': 'No successful calculations to summarize'}
+
+        self._cached_results = {
+            'vehicles': vehicle_results,
+            'analysis': analysis,
+            'rankings': rankings,
+            'insights': insights,
+            'summary': summary,
+            'best_overall': rankings.get('best_annual_cost'),
+            'cost_range': analysis.get('cost_statistics', {}).get('cost_range', 0),
+            'average_annual_cost': analysis.get('cost_statistics', {}).get('avg_annual_cost', 0)
+        }
+        return self._cached_results
+
+    def _get_analysis(self) -> Dict[str, Any]:
+        """Build the comparison analysis from running totals and ranking ends"""
+
+        count = self.totals['successful']
+        if not count:
+            return {'error': 'No successful calculations to analyze'}
+
+        by_annual = self.sorted_rankings['by_annual_cost']
+        by_total = self.sorted_rankings['by_total_cost']
+        min_annual, max_annual = by_annual[0][0], by_annual[-1][0]
+        min_total, max_total = by_total[0][0], by_total[-1][0]
+
+        return {
+            'vehicle_count': count,
+            'cost_statistics': {
+                'min_annual_cost': min_annual,
+                'max_annual_cost': max_annual,
+                'avg_annual_cost': self.totals['annual_cost'] / count,
+                'cost_range': max_annual - min_annual,
+                'min_total_cost': min_total,
+                'max_total_cost': max_total,
+                'avg_total_cost': self.totals['total_cost'] / count
+            },
+            'affordability_analysis': {
+                'affordable_count': self.totals['affordable'],
+                'affordable_percentage': self.totals['affordable'] / count * 100,
+                'avg_affordability_score': self.totals['affordability_score'] / count
+            },
+            'transaction_type_breakdown': {
+                'lease_count': self.totals['lease'],
+                'purchase_count': self.totals['purchase']
+            }
+        }
+
+    def _get_ranking_key(self, vehicle_id: Any, ranking_name: str) -> Tuple:
+        """Sort key for a vehicle in a ranking, or None if it is excluded"""
+
+        metric, descending, positive_only = self.ranking_definitions[ranking_name]
+        value = self.vehicles[vehicle_id][metric]
+        if positive_only and not value > 0:
+            return None
+        return (-value if descending else value, self.sequence[vehicle_id], vehicle_id)
+
+    def _index_vehicle(self, vehicle_id: Any):
+        """Insert a vehicle into the running totals and sorted rankings"""
+        self._apply_to_indexes(vehicle_id, 1)
+
+    def _unindex_vehicle(self, vehicle_id: Any):
+        """Take a vehicle out of the running totals and sorted rankings"""
+        self._apply_to_indexes(vehicle_id, -1)
+
+    def _apply_to_indexes(self, vehicle_id: Any, direction: int):
+        """Add (direction=1) or remove (direction=-1) a vehicle's contribution"""
+
+        metrics = self.vehicles[vehicle_id]
+        if not metrics.get('calculation_successful', False):
+            return
+
+        self.totals['successful'] += direction
+        self.totals['annual_cost'] += direction * metrics['annual_cost']
+        self.totals['total_cost'] += direction * metrics['total_cost']
+        self.totals['affordability_score'] += direction * metrics['affordability_score']
+        self.totals['affordable'] += direction * (1 if metrics['is_affordable'] else 0)
+        transaction_type = metrics['transaction_type'].lower()
+        if transaction_type in ('lease', 'purchase'):
+            self.totals[transaction_type] += direction
+
+        # Binary search finds the slot in O(log n) comparisons; the list insert or
+        # delete itself shifts the tail, O(n) but a single memmove of references
+        for ranking_name, ranking in self.sorted_rankings.items():
+            key = self._get_ranking_key(vehicle_id, ranking_name)
+            if key is None:
+                continue
+            if direction > 0:
+                bisect.insort(ranking, key)
+            else:
+                del ranking[bisect.bisect_left(ranking, key)]
+
+        if direction > 0:
+            self._add_to_pareto_front(vehicle_id)
+        else:
+            self._remove_from_pareto_front(vehicle_id)
+
+    def _add_to_pareto_front(self, vehicle_id: Any):
+        """Test a new point against the front only, dropping the members it dominates"""
+
+        engine = self.comparison_service.recommendation_engine
+        point = tuple(engine._get_objective_matrix([self.vehicles[vehicle_id]], self.pareto_objectives)[0])
+        self.pareto_points[vehicle_id] = point
+
+        # Anything dominating the point is dominated by, or is, a front member
+        if self.pareto_front:
+            front_ids = list(self.pareto_front)
+            front = np.array([self.pareto_front[v] for v in front_ids])
+            if _dominates(front, np.array(point)).any():
+                return
+            for index in np.flatnonzero(_dominates(np.array(point), front)):
+                del self.pareto_front[front_ids[index]]
+        self.pareto_front[vehicle_id] = point
+
+    def _remove_from_pareto_front(self, vehicle_id: Any):
+        """Drop a point; if it was on the front, re-check only the points it dominated"""
+
+        point = self.pareto_points.pop(vehicle_id)
+        if self.pareto_front.pop(vehicle_id, None) is None:
+            return
+
+        # Points it did not dominate are still dominated by another front member
+        candidates = [v for v in self.pareto_points if v not in self.pareto_front]
+        if not candidates:
+            return
+        candidate_points = np.array([self.pareto_points[v] for v in candidates])
+        freed = np.flatnonzero(_dominates(np.array(point), candidate_points))
+
+        # Freed points still dominated by a remaining front member stay off the front;
+        # the rest are filtered among themselves with the sort-filter skyline
+        if self.pareto_front:
+            front = np.array(list(self.pareto_front.values()))
+            freed = freed[~_dominates(front[None, :, :], candidate_points[freed][:, None, :]).any(axis=1)]
+        order = sorted(range(len(freed)), key=lambda i: (self.pareto_points[candidates[freed[i]]], self.sequence[candidates[freed[i]]]))
+        engine = self.comparison_service.recommendation_engine
+        for i in engine._pareto_skyline(candidate_points[freed], order):
+            candidate = candidates[freed[i]]
+            self.pareto_front[candidate] = self.pareto_points[candidate]
+
+def _dominates(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Whether a dominates b (lower is better): no worse on every objective, better on one"""
+    return np.all(a <= b, axis=-1) & np.any(a < b, axis=-1)
+
+# Test function
+def test_incremental_comparison():
+    """Test incremental comparison updates against a full rebuild"""
+    state = IncrementalComparisonState()
+    service = state.comparison_service
+
+    base = {
+        'year': 2024, 'transaction_type': 'purchase', 'annual_mileage': 12000,
+        'analysis_years': 5, 'state': 'CA', 'zip_code': '90210', 'gross_income': 80000
+    }
+    vehicles = [
+        dict(base, make='Toyota', model='Camry', trim='LE', price=28000),
+        dict(base, make='Honda', model='Civic', trim='LX', price=24000),
+        dict(base, make='BMW', model='3 Series', trim='330i', price=45000)
+    ]
+
+    for vehicle in vehicles:
+        vehicle_id = (vehicle['make'], vehicle['model'], vehicle['trim'])
+        state.add_vehicle(vehicle_id, vehicle, service.prediction_service.calculate_total_cost_of_ownership(vehicle))
+
+    state.remove_vehicle(('Honda', 'Civic', 'LX'))
+    results = state.get_comparison_results()
+
+    print("=== INCREMENTAL COMPARISON ===")
+    print(f"Vehicles: {len(state)}")
+    print(f"Cheapest: {results['best_overall']['vehicle_name']}")
+    print(f"Average annual cost: ${results['average_annual_cost']:,.0f}")
+    print(f"Recommendation: {results['summary']['recommendation']}")
+
+if __name__ == "__main__":
+    test_incremental_comparison()
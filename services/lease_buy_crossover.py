@@ -0,0 +1,238 @@
+"""
+Lease vs Buy Crossover
+Month-by-month cumulative cost of many lease offers and many loan offers on the
+same vehicle, net of the buyer's equity, with the month at which buying becomes
+cheaper than leasing for every lease/loan pair
+"""
+
+from typing import Dict, Any, List, Union
+import math
+import numpy as np
+import pandas as pd
+
+from services.prediction_service import PredictionService, LEASE_OVERAGE_FEE_PER_MILE
+
+DEFAULT_HORIZON_MONTHS = 120
+
+class LeaseBuyCrossover:
+    """Crossover months between lease and loan offers for one vehicle"""
+
+    def __init__(self, prediction_service: PredictionService = None):
+        self.prediction_service = prediction_service or PredictionService()
+
+    def analyze(self, input_data: Dict[str, Any], lease_offers: Union[List[Dict[str, Any]], pd.DataFrame],
+                loan_offers: Union[List[Dict[str, Any]], pd.DataFrame],
+                horizon_months: int = DEFAULT_HORIZON_MONTHS) -> Dict[str, Any]:
+        """
+        Net cost curves for every offer and the crossover month for every lease/loan pair
+        Lease offers: lease_term (years), monthly_payment or money_factor and
+        residual_value_percent, down_payment, annual_mileage_limit. Loan offers:
+        interest_rate (APR %), loan_term (years), down_payment. Either may carry a 'name'.
+        A lease is renewed on the same terms when it ends, with mileage overage charged
+        at each turn-in; operating costs common to both (fuel, insurance, service) are left out.
+        """
+        if horizon_months < 1:
+            raise ValueError("horizon_months must be at least 1")
+
+        lease_offers = self._as_records(lease_offers)
+        loan_offers = self._as_records(loan_offers)
+        if not lease_offers or not loan_offers:
+            raise ValueError("Need at least one lease offer and one loan offer")
+        self._check_offers(lease_offers, ['lease_term'], "Lease")
+        self._check_offers(loan_offers, ['loan_term', 'interest_rate'], "Loan")
+
+        purchase_price = input_data.get('price', input_data.get('trim_msrp', 30000))
+        months = np.arange(horizon_months + 1)
+
+        vehicle_value = self.get_vehicle_values(input_data, purchase_price, horizon_months)
+        lease_net_cost, lease_payments = self.get_lease_net_costs(input_data, purchase_price, lease_offers, months)
+        buy_net_cost, loan_payments = self.get_buy_net_costs(purchase_price, loan_offers, months, vehicle_value)
+
+        # Lease minus buy for every pair: (lease offers, loan offers, months)
+        difference = lease_net_cost[:, None, :] - buy_net_cost[None, :, :]
+        crossover_month = get_crossover_months(difference)
+
+        lease_names = [offer.get('name', f"Lease {index + 1}") for index, offer in enumerate(lease_offers)]
+        loan_names = [offer.get('name', f"Loan {index + 1}") for index, offer in enumerate(loan_offers)]
+        lease_index, loan_index = np.meshgrid(np.arange(len(lease_offers)), np.arange(len(loan_offers)), indexing='ij')
+        lease_index, loan_index = lease_index.ravel(), loan_index.ravel()
+
+        crossovers = pd.DataFrame({
+            'lease_offer': np.array(lease_names, dtype=object)[lease_index],
+            'loan_offer': np.array(loan_names, dtype=object)[loan_index],
+            'lease_monthly_payment': lease_payments[lease_index],
+            'loan_monthly_payment': loan_payments[loan_index],
+            'crossover_month': crossover_month.ravel(),
+            'lease_net_cost': lease_net_cost[lease_index, -1],
+            'buy_net_cost': buy_net_cost[loan_index, -1],
+            'cheaper_at_horizon': np.where(difference[..., -1].ravel() < 0, 'lease', 'buy')
+        })
+        crossovers['crossover_years'] = crossovers['crossover_month'] / 12
+
+        return {
+            'horizon_months': horizon_months,
+            'months': months,
+            'vehicle_value': vehicle_value,
+            'lease_offers': lease_names,
+            'loan_offers': loan_names,
+            'lease_net_cost': lease_net_cost,
+            'buy_net_cost': buy_net_cost,
+            'crossovers': crossovers
+        }
+
+    def get_vehicle_values(self, input_data: Dict[str, Any], purchase_price: float, horizon_months: int) -> np.ndarray:
+        """Vehicle value at each month, interpolated between the depreciation schedule's year ends"""
+
+        years = math.ceil(horizon_months / 12)
+        schedule = self.prediction_service.depreciation_model.calculate_depreciation_schedule(
+            purchase_price,
+            input_data['make'],
+            input_data['model'],
+            input_data['year'],
+            input_data['annual_mileage'],
+            years
+        )
+        year_end_values = [purchase_price] + [entry['vehicle_value'] for entry in schedule]
+        return np.interp(np.arange(horizon_months + 1), np.arange(years + 1) * 12, year_end_values)
+
+    def get_lease_net_costs(self, input_data: Dict[str, Any], purchase_price: float,
+                            lease_offers: List[Dict[str, Any]], months: np.ndarray) -> tuple:
+        """Cumulative lease cash outlay by month (leases hold no equity), and each offer's payment"""
+
+        vehicle_msrp = input_data.get('trim_msrp') or purchase_price
+        annual_mileage = input_data['annual_mileage']
+
+        lease_term = np.array([float(offer['lease_term']) for offer in lease_offers])
+        down_payment = np.array([float(offer.get('down_payment', 0)) for offer in lease_offers])
+        mileage_limit = np.array([float(offer.get('annual_mileage_limit', 12000)) for offer in lease_offers])
+        monthly_payment = np.array([self._get_lease_payment(offer, vehicle_msrp) for offer in lease_offers])
+
+        term_months = np.maximum(np.round(lease_term * 12), 1).astype(int)
+        overage_charge = np.maximum(0, annual_mileage - mileage_limit) * lease_term * LEASE_OVERAGE_FEE_PER_MILE
+
+        # Monthly cash flows: payments in months 1..n, a down payment when each lease starts
+        # (month 0 and every turn-in before the horizon) and the overage at each turn-in
+        turn_in = (months[None, 1:] % term_months[:, None]) == 0
+        cash_flow = np.zeros((len(lease_offers), len(months)))
+        cash_flow[:, 0] = down_payment
+        cash_flow[:, 1:] = monthly_payment[:, None] + turn_in * overage_charge[:, None]
+        cash_flow[:, 1:-1] += turn_in[:, :-1] * down_payment[:, None]
+
+        return np.cumsum(cash_flow, axis=1), monthly_payment
+
+    def get_buy_net_costs(self, purchase_price: float, loan_offers: List[Dict[str, Any]],
+                          months: np.ndarray, vehicle_value: np.ndarray) -> tuple:
+        """Cumulative purchase cash outlay minus equity (value less loan balance) by month, and each offer's payment"""
+
+        down_payment = np.array([float(offer.get('down_payment', 0)) for offer in loan_offers])
+        interest_rate = np.array([float(offer['interest_rate']) for offer in loan_offers])
+        term_months = np.maximum(np.round(np.array([float(offer['loan_term']) for offer in loan_offers]) * 12), 1)
+        loan_amount = np.maximum(purchase_price - down_payment, 0)
+
+        # Payment and remaining balance as FinancialAnalysisService.calculate_loan_payments
+        monthly_rate = interest_rate / 100 / 12
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = (1 + monthly_rate) ** term_months
+            monthly_payment = np.where(monthly_rate > 0, loan_amount * (monthly_rate * growth) / (growth - 1),
+                                       loan_amount / term_months)
+            elapsed = np.minimum(months[None, :], term_months[:, None])
+            elapsed_growth = (1 + monthly_rate[:, None]) ** elapsed
+            loan_balance = np.where(
+                monthly_rate[:, None] > 0,
+                loan_amount[:, None] * elapsed_growth - monthly_payment[:, None] * (elapsed_growth - 1) / monthly_rate[:, None],
+                loan_amount[:, None] - monthly_payment[:, None] * elapsed
+            )
+        loan_balance = np.maximum(loan_balance, 0)
+
+        cash_flow = np.zeros((len(loan_offers), len(months)))
+        cash_flow[:, 0] = np.minimum(down_payment, purchase_price)
+        cash_flow[:, 1:] = monthly_payment[:, None] * (months[None, 1:] <= term_months[:, None])
+
+        equity = vehicle_value[None, :] - loan_balance
+        return np.cumsum(cash_flow, axis=1) - equity, monthly_payment
+
+    def _get_lease_payment(self, offer: Dict[str, Any], vehicle_msrp: float) -> float:
+        """Quoted payment, or the payment for the offer's money factor and residual"""
+
+        if offer.get('money_factor') is not None and offer.get('residual_value_percent') is not None:
+            return self.prediction_service.financial_service.calculate_lease_payment(
+                vehicle_msrp=vehicle_msrp,
+                residual_value_percent=offer['residual_value_percent'],
+                money_factor=offer['money_factor'],
+                lease_term_years=offer['lease_term'],
+                down_payment=offer.get('down_payment', 0)
+            )['monthly_payment']
+        return float(offer['monthly_payment'])
+
+    def _as_records(self, offers: Union[List[Dict[str, Any]], pd.DataFrame]) -> List[Dict[str, Any]]:
+        """Offers as a list of dicts; blank DataFrame cells are left out, as missing keys"""
+
+        if isinstance(offers, pd.DataFrame):
+            return [{field: value for field, value in record.items() if pd.notna(value)}
+                    for record in offers.to_dict('records')]
+        return list(offers)
+
+    def _check_offers(self, offers: List[Dict[str, Any]], required: List[str], kind: str):
+        """Reject offers missing a term, rate or payment input rather than pricing them as NaN"""
+
+        for index, offer in enumerate(offers):
+            missing = [field for field in required if offer.get(field) is None]
+            if kind == "Lease" and offer.get('monthly_payment') is None and (
+                    offer.get('money_factor') is None or offer.get('residual_value_percent') is None):
+                missing.append('monthly_payment or money_factor and residual_value_percent')
+            if missing:
+                raise ValueError(f"{kind} offer {offer.get('name', f'{kind} {index + 1}')!r} needs {', '.join(missing)}")
+
+def get_crossover_months(difference: np.ndarray) -> np.ndarray:
+    """
+    Month (fractional, linearly interpolated) at which lease-minus-buy cost first
+    rises back through zero, i.e. from which buying is cheaper; 0 where leasing is
+    never cheaper and NaN where buying has not caught up by the horizon
+    """
+    before, after = difference[..., :-1], difference[..., 1:]
+    crossing = (before < 0) & (after >= 0)
+    first = np.argmax(crossing, axis=-1)
+
+    d0 = np.take_along_axis(before, first[..., None], axis=-1)[..., 0]
+    d1 = np.take_along_axis(after, first[..., None], axis=-1)[..., 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossover = first + (-d0) / (d1 - d0)
+
+    lease_ever_cheaper = (difference[..., 1:] < 0).any(axis=-1)
+    return np.where(crossing.any(axis=-1), crossover, np.where(lease_ever_cheaper, np.nan, 0.0))
+
+# Test function
+def test_lease_buy_crossover():
+    """Test lease vs buy crossover"""
+    import time
+
+    input_data = {
+        'make': 'Toyota', 'model': 'Camry', 'year': 2024, 'trim': 'LE', 'price': 28000, 'trim_msrp': 29000,
+        'annual_mileage': 12000, 'state': 'CA', 'zip_code': '90210'
+    }
+    lease_offers = [
+        {'name': f"Lease {term}y/{money_factor:.4f}", 'lease_term': term, 'money_factor': money_factor,
+         'residual_value_percent': residual, 'down_payment': 2000, 'annual_mileage_limit': 12000}
+        for term, residual in ((2, 64), (3, 58), (4, 52))
+        for money_factor in (0.0015, 0.0020, 0.0025, 0.0030)
+    ]
+    loan_offers = [
+        {'name': f"Loan {term}y@{rate}%", 'loan_term': term, 'interest_rate': rate, 'down_payment': 4000}
+        for term in (3, 4, 5, 6)
+        for rate in (0.9, 3.9, 5.9, 7.9)
+    ]
+
+    started = time.perf_counter()
+    results = LeaseBuyCrossover().analyze(input_data, lease_offers, loan_offers)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    crossovers = results['crossovers']
+    print("=== LEASE VS BUY CROSSOVER TEST ===")
+    print(f"{len(lease_offers)} lease x {len(loan_offers)} loan offers over {results['horizon_months']} months "
+          f"in {elapsed_ms:.1f} ms")
+    print(crossovers.sort_values('crossover_month').head(5)[
+        ['lease_offer', 'loan_offer', 'crossover_month', 'lease_net_cost', 'buy_net_cost']
+    ].round(1).to_string(index=False))
+
+if __name__ == "__main__":
+    test_lease_buy_crossover()
@@ -0,0 +1,231 @@
+"""
+Lease Engine
+Vectorized lease TCO: precomputes the service plan, rating factors and efficiency
+for one vehicle and lessee, then prices whole batches of lease offers (terms x
+mileage caps x down payments) as arrays, reproducing PredictionService._calculate_lease_tco
+"""
+
+from typing import Dict, Any, Iterable
+import numpy as np
+import pandas as pd
+
+from services.prediction_service import PredictionService, LEASE_OVERAGE_FEE_PER_MILE
+from services.vehicle_cost_profile import VehicleCostProfile
+from utils.zip_code_utils import get_regional_cost_multiplier
+
+# Lease TCO categories, in PredictionService order
+LEASE_CATEGORIES = ['lease_payments', 'maintenance', 'insurance', 'fuel_energy', 'fees_penalties']
+
+# Offer dimensions, in DataFrame column and array axis order
+OFFER_DIMENSIONS = ['lease_term', 'annual_mileage_limit', 'down_payment']
+
+class LeaseEngine:
+    """Invariant lease inputs for one vehicle and lessee, priced over arrays of lease offers"""
+
+    def __init__(self, input_data: Dict[str, Any], prediction_service: PredictionService = None,
+                 vehicle_characteristics: Dict[str, Any] = None, regional_multiplier: float = None):
+        self.prediction_service = prediction_service or PredictionService()
+        self.input_data = input_data
+        self.base_inputs = get_lease_inputs(input_data)
+
+        if vehicle_characteristics is None:
+            vehicle_characteristics = self.prediction_service._get_cached_characteristics(input_data)
+        if regional_multiplier is None:
+            regional_multiplier = get_regional_cost_multiplier(input_data.get('zip_code', ''), input_data.get('state', ''))
+
+        # Leases rate insurance for the lessee on the MSRP and put fuel and service on the
+        # mileage cap; a cost profile on those inputs carries the shared invariants
+        base = self.base_inputs
+        profile_inputs = dict(
+            input_data, state=base['state'], annual_mileage=base['annual_mileage_limit'], current_mileage=0,
+            driver_age=base['user_age'], coverage_type='comprehensive',
+            num_household_vehicles=base['num_household_vehicles']
+        )
+        self.profile = VehicleCostProfile(profile_inputs, self.prediction_service,
+                                          vehicle_characteristics, regional_multiplier)
+
+    def evaluate(self, lease_terms: Iterable[int] = None, mileage_caps: Iterable[float] = None,
+                 down_payments: Iterable[float] = None, monthly_payment: Any = None,
+                 money_factor: Any = None, residual_value_percent: Any = None) -> Dict[str, np.ndarray]:
+        """
+        Per-year lease costs for every offer in the grid of terms x mileage caps x down payments
+        Returns arrays shaped (terms, caps, down payments, longest term) for each category,
+        zero after each offer's term, plus the offer axes and 'monthly_payment'. With a
+        money factor and residual percent (scalars or one per term) the payment comes from
+        FinancialAnalysisService.calculate_lease_payment on the MSRP; otherwise every offer
+        pays the quoted monthly_payment. Omitted dimensions hold the input's value.
+        """
+        base = self.base_inputs
+        axes = {
+            'lease_term': np.asarray([base['lease_term']] if lease_terms is None else list(lease_terms), dtype=int),
+            'annual_mileage_limit': np.asarray(
+                [base['annual_mileage_limit']] if mileage_caps is None else list(mileage_caps), dtype=float
+            ),
+            'down_payment': np.asarray([base['down_payment']] if down_payments is None else list(down_payments), dtype=float)
+        }
+        if (axes['lease_term'] < 1).any():
+            raise ValueError("lease_term must be at least 1 year")
+
+        lease_term, mileage_cap, down_payment = np.ix_(*axes.values())
+        longest_term = int(axes['lease_term'].max())
+        in_term = np.arange(1, longest_term + 1) <= lease_term[..., None]
+
+        money_factor = base['money_factor'] if money_factor is None else money_factor
+        residual_value_percent = base['residual_value_percent'] if residual_value_percent is None else residual_value_percent
+        if (money_factor is None) != (residual_value_percent is None):
+            raise ValueError("money_factor and residual_value_percent must be given together")
+
+        residual_value = None
+        if money_factor is not None:
+            lease_payment = self.prediction_service.financial_service.calculate_lease_payment(
+                vehicle_msrp=base['vehicle_value'],
+                residual_value_percent=get_term_values(residual_value_percent, axes['lease_term'], 'residual_value_percent'),
+                money_factor=get_term_values(money_factor, axes['lease_term'], 'money_factor'),
+                lease_term_years=lease_term,
+                down_payment=down_payment
+            )
+            offer_payment = lease_payment['monthly_payment']
+            residual_value = lease_payment['residual_value']
+        else:
+            offer_payment = get_term_values(base['monthly_payment'] if monthly_payment is None else monthly_payment,
+                                            axes['lease_term'], 'monthly_payment')
+
+        # Everything but the payment depends only on the mileage cap
+        caps = axes['annual_mileage_limit']
+        maintenance = self.profile.evaluate_maintenance(caps, longest_term, 0)
+        insurance = self.profile.evaluate_insurance(np.array([base['vehicle_value']]), caps)[:, 0]
+        fuel = self.profile.evaluate_fuel(caps, base['fuel_price'], base['electricity_rate'], base['charging_preference'])
+        actual_mileage = caps if base['annual_mileage'] is None else base['annual_mileage']
+        fees = np.maximum(0, actual_mileage - caps) * LEASE_OVERAGE_FEE_PER_MILE
+
+        def per_cap(values):
+            return values[None, :, None, None] if values.ndim == 1 else values[None, :, None, :]
+
+        shape = tuple(len(values) for values in axes.values()) + (longest_term,)
+        annual_costs = {
+            'lease_payments': np.broadcast_to(offer_payment * 12, shape[:-1])[..., None] * in_term,
+            'maintenance': per_cap(maintenance) * in_term,
+            'insurance': per_cap(insurance) * in_term,
+            'fuel_energy': per_cap(fuel) * in_term,
+            'fees_penalties': per_cap(fees) * in_term
+        }
+        annual_costs = {category: np.broadcast_to(values, shape) for category, values in annual_costs.items()}
+        annual_costs.update(
+            axes=axes,
+            monthly_payment=np.broadcast_to(offer_payment, shape[:-1]),
+            residual_value=None if residual_value is None else np.broadcast_to(residual_value, shape[:-1])
+        )
+        return annual_costs
+
+    def summarize(self, annual_costs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Lease summary metrics per offer, shaped (terms, caps, down payments)"""
+
+        lease_term, mileage_cap, down_payment = np.ix_(*annual_costs['axes'].values())
+        category_totals = {category: annual_costs[category].sum(axis=-1) for category in LEASE_CATEGORIES}
+        total_lease_cost = sum(category_totals[category] for category in LEASE_CATEGORIES) + down_payment
+        total_miles = mileage_cap * lease_term
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cost_per_mile = np.where(total_miles > 0, total_lease_cost / total_miles, 0.0)
+
+        return {
+            'total_lease_cost': total_lease_cost,
+            'average_annual_cost': total_lease_cost / lease_term,
+            'average_monthly_cost': total_lease_cost / (lease_term * 12),
+            'cost_per_mile': cost_per_mile,
+            'category_totals': category_totals
+        }
+
+    def evaluate_offers(self, lease_terms: Iterable[int] = None, mileage_caps: Iterable[float] = None,
+                        down_payments: Iterable[float] = None, monthly_payment: Any = None,
+                        money_factor: Any = None, residual_value_percent: Any = None) -> pd.DataFrame:
+        """One row per lease offer with its payment, summary metrics and category totals"""
+
+        annual_costs = self.evaluate(lease_terms, mileage_caps, down_payments, monthly_payment,
+                                     money_factor, residual_value_percent)
+        summary = self.summarize(annual_costs)
+        axes = annual_costs['axes']
+        shape = tuple(len(values) for values in axes.values())
+
+        columns = {name: np.broadcast_to(grid_axis, shape).ravel()
+                   for name, grid_axis in zip(OFFER_DIMENSIONS, np.ix_(*axes.values()))}
+        columns['monthly_payment'] = annual_costs['monthly_payment'].ravel()
+        if annual_costs['residual_value'] is not None:
+            columns['residual_value'] = annual_costs['residual_value'].ravel()
+
+        for metric in ('total_lease_cost', 'average_annual_cost', 'average_monthly_cost', 'cost_per_mile'):
+            columns[metric] = np.broadcast_to(summary[metric], shape).ravel()
+        for category in LEASE_CATEGORIES:
+            columns[category] = np.broadcast_to(summary['category_totals'][category], shape).ravel()
+
+        # Affordability as in PredictionService._calculate_affordability
+        gross_income = self.base_inputs['gross_income']
+        percentage_of_income = columns['average_annual_cost'] / gross_income * 100 if gross_income > 0 else np.zeros(columns['total_lease_cost'].shape)
+        columns['percentage_of_income'] = percentage_of_income
+        columns['affordability_rating'] = np.select(
+            [percentage_of_income <= 10, percentage_of_income <= 15, percentage_of_income <= 20],
+            ['Excellent', 'Good', 'Fair'], 'Stretched'
+        )
+
+        offers = pd.DataFrame(columns)
+        offers['lease_term'] = offers['lease_term'].astype(int)
+        return offers
+
+def get_term_values(value: Any, lease_terms: np.ndarray, name: str) -> np.ndarray:
+    """A scalar, or one value per lease term shaped to the term axis"""
+
+    values = np.asarray(value, dtype=float)
+    if values.ndim == 0:
+        return values
+    if values.shape == lease_terms.shape:
+        return values[:, None, None]
+    raise ValueError(f"{name} must be a single value or one value per lease term")
+
+def get_lease_inputs(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Engine inputs with the defaults _calculate_lease_tco applies"""
+
+    return {
+        'lease_term': input_data.get('lease_term', input_data.get('analysis_years', 3)),
+        'monthly_payment': input_data.get('monthly_payment', 400),
+        'down_payment': input_data.get('down_payment', 0),
+        'annual_mileage_limit': input_data.get('annual_mileage_limit', 12000),
+        'annual_mileage': input_data.get('annual_mileage'),
+        'vehicle_value': input_data.get('trim_msrp', input_data.get('purchase_price', 40000)),
+        'money_factor': input_data.get('money_factor'),
+        'residual_value_percent': input_data.get('residual_value_percent'),
+        'user_age': input_data.get('user_age', 25),
+        'state': input_data.get('state', 'CA'),
+        'num_household_vehicles': input_data.get('num_household_vehicles', 1),
+        'fuel_price': input_data.get('fuel_price', 3.50),
+        'electricity_rate': input_data.get('electricity_rate', 0.12),
+        'charging_preference': input_data.get('charging_preference', 'mixed'),
+        'gross_income': input_data.get('gross_income', 60000)
+    }
+
+# Test function
+def test_lease_engine():
+    """Test lease offer evaluation"""
+    import time
+
+    input_data = {
+        'make': 'Toyota', 'model': 'Camry', 'year': 2024, 'trim': 'LE', 'trim_msrp': 28000,
+        'transaction_type': 'lease', 'lease_term': 3, 'monthly_payment': 389, 'down_payment': 2000,
+        'annual_mileage_limit': 12000, 'annual_mileage': 13000,
+        'state': 'CA', 'zip_code': '90210', 'fuel_price': 4.50
+    }
+
+    started = time.perf_counter()
+    engine = LeaseEngine(input_data)
+    offers = engine.evaluate_offers(lease_terms=[2, 3, 4], mileage_caps=[10000, 12000, 15000],
+                                    down_payments=[0, 2000, 4000], money_factor=0.0025,
+                                    residual_value_percent=[65, 58, 52])
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print("=== LEASE ENGINE TEST ===")
+    print(f"{len(offers)} offers in {elapsed_ms:.1f} ms")
+    print(offers.nsmallest(5, 'total_lease_cost')[
+        ['lease_term', 'annual_mileage_limit', 'down_payment', 'monthly_payment', 'total_lease_cost', 'cost_per_mile']
+    ].round(2).to_string(index=False))
+
+if __name__ == "__main__":
+    test_lease_engine()
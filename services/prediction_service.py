@@ -5,7 +5,8 @@ Orchestrates all TCO calculations and coordinates between different models
 Enhanced with detailed maintenance scheduling and FIXED EV efficiency handling
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import logging
 import math
 
 from models.depreciation.enhanced_depreciation import EnhancedDepreciationModel
@@ -16,11 +17,24 @@ from models.fuel.electric_vehicle_utils import EVCostCalculator
 from services.financial_analysis import FinancialAnalysisService
 from data.vehicle_database import get_vehicle_characteristics
 from utils.zip_code_utils import get_regional_cost_multiplier
+from services.stage_timing import StageTimer, NULL_STAGE_TIMER, MetricsSink
+from utils.log_config import get_logger
+
+logger = get_logger(__name__)
+
+# Lease mileage overage charge
+LEASE_OVERAGE_FEE_PER_MILE = 0.25
 
 class PredictionService:
     """Main service for orchestrating TCO predictions"""
     
-    def __init__(self):
+    def __init__(self, stage_timing: bool = False, metrics_sink: MetricsSink = None):
+        """
+        stage_timing adds per-stage wall time and call counts to results as 'stage_timings';
+        metrics_sink, if given, is called with the timings of every calculation
+        """
+        self.stage_timing = stage_timing
+        self.metrics_sink = metrics_sink
         self.depreciation_model = EnhancedDepreciationModel()
         self.maintenance_calculator = MaintenanceCalculator()
         self.insurance_calculator = AdvancedInsuranceCalculator()
@@ -33,28 +47,192 @@ class PredictionService:
         Calculate comprehensive TCO with proper cost separation
         FIXED: Returns corrected cost structure with out-of-pocket vs TCO separation
         """
+        return self._calculate_tco(input_data)
+    
+    def calculate_batch_tco(self, input_batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Calculate TCO for many scenarios in one pass
+        Vehicle characteristics, regional multipliers and maintenance schedules are
+        looked up once per distinct vehicle/profile and shared across the batch.
+        Results are returned in input order; a failed row yields {'error': message}.
+        Shared schedule entries must be treated as read-only by callers.
+        """
+        
+        batch_cache = {
+            'characteristics': {},
+            'regional_multipliers': {},
+            'maintenance_schedules': {}
+        }
+        
+        batch_results = []
+        for input_data in input_batch:
+            try:
+                batch_results.append(self._calculate_tco(input_data, batch_cache))
+            except Exception as e:
+                batch_results.append({'error': str(e)})
+        
+        return batch_results
+
+    def simulate_tco(self, input_data: Dict[str, Any], draws: int = 10000,
+                     distributions: Dict[str, Any] = None, seed: int = None,
+                     return_samples: bool = False) -> Dict[str, Any]:
+        """
+        Monte Carlo TCO for a purchase: P10/P50/P90 of total and per-category cost
+        over sampled fuel/electricity prices, mileage, interest rates, depreciation
+        and repair shocks (see services.tco_simulation.DEFAULT_DISTRIBUTIONS)
+        """
+        from services.tco_simulation import TCOSimulator
+        return TCOSimulator(self).simulate(input_data, draws, distributions, seed, return_samples)
+
+    def analyze_sensitivity(self, input_data: Dict[str, Any], perturbations: Dict[str, Any] = None,
+                            metric: str = 'total_tco') -> Dict[str, Any]:
+        """
+        Tornado-chart data for a purchase: TCO impact of moving each driver (fuel price,
+        mileage, interest rate, driver age, analysis years, coverage, charging preference)
+        down and up (see services.sensitivity_analysis.DEFAULT_PERTURBATIONS); shop type is
+        left out because the purchase engine does not price it
+        """
+        from services.sensitivity_analysis import SensitivityAnalyzer
+        return SensitivityAnalyzer(self).analyze(input_data, perturbations, metric)
+
+    def evaluate_scenario_grid(self, input_data: Dict[str, Any], analysis_years: List[int] = None,
+                               annual_mileage: List[float] = None, loan_terms: List[int] = None,
+                               down_payments: List[float] = None):
+        """
+        Purchase TCO for every combination of analysis years, annual mileage, loan term
+        and down payment for one vehicle, as a DataFrame with one row per cell
+        (see services.scenario_grid.ScenarioGrid)
+        """
+        from services.scenario_grid import ScenarioGrid
+        return ScenarioGrid(input_data, self).evaluate(analysis_years, annual_mileage, loan_terms, down_payments)
+
+    def optimize_holding_period(self, input_data: Dict[str, Any], max_years: int = 20,
+                                objective: str = 'average_annual_tco', min_years: int = 1) -> Dict[str, Any]:
+        """
+        Ownership duration (and trade-in year) minimizing average annual TCO or TCO per
+        mile, from cost curves accumulated year by year out to max_years; for fleets use
+        services.holding_period.HoldingPeriodSolver.solve_fleet
+        """
+        from services.holding_period import HoldingPeriodSolver
+        return HoldingPeriodSolver(self).solve(input_data, max_years, objective, min_years)
+
+    def evaluate_lease_offers(self, input_data: Dict[str, Any], lease_terms: List[int] = None,
+                              mileage_caps: List[float] = None, down_payments: List[float] = None,
+                              money_factor: Any = None, residual_value_percent: Any = None):
+        """
+        Lease TCO for every combination of lease term, mileage cap and down payment for
+        one vehicle, as a DataFrame with one row per offer; payments come from the money
+        factor and residual when given (see services.lease_engine.LeaseEngine)
+        """
+        from services.lease_engine import LeaseEngine
+        return LeaseEngine(input_data, self).evaluate_offers(lease_terms, mileage_caps, down_payments,
+                                                             money_factor=money_factor,
+                                                             residual_value_percent=residual_value_percent)
+
+    def analyze_lease_buy_crossover(self, input_data: Dict[str, Any], lease_offers: List[Dict[str, Any]],
+                                    loan_offers: List[Dict[str, Any]], horizon_months: int = 120) -> Dict[str, Any]:
+        """
+        Month-by-month net cost of every lease and loan offer on one vehicle and the
+        month from which buying beats leasing for each pair
+        (see services.lease_buy_crossover.LeaseBuyCrossover)
+        """
+        from services.lease_buy_crossover import LeaseBuyCrossover
+        return LeaseBuyCrossover(self).analyze(input_data, lease_offers, loan_offers, horizon_months)
+
+    def create_purchase_horizon(self, input_data: Dict[str, Any]):
+        """
+        Resumable purchase TCO at the input's analysis years; set_horizon(n) extends or
+        truncates it without recomputing earlier years (see services.tco_horizon.PurchaseTCOState)
+        """
+        from services.tco_horizon import PurchaseTCOState
+        return PurchaseTCOState(input_data, self)
+
+    def _calculate_tco(self, input_data: Dict[str, Any],
+                       batch_cache: Dict[str, Dict] = None) -> Dict[str, Any]:
+        """Route a single TCO calculation, reusing batch lookups when available"""
+        
+        timer = StageTimer() if self.stage_timing or self.metrics_sink else NULL_STAGE_TIMER
         
         # Get vehicle characteristics
-        vehicle_characteristics = get_vehicle_characteristics(
-            input_data['make'], 
-            input_data['model'], 
-            input_data['year'],
-            input_data.get('trim', None)  # Add trim parameter
-        )
+        with timer.stage('vehicle_characteristics'):
+            vehicle_characteristics = self._get_cached_characteristics(input_data, batch_cache)
         
         # Get regional cost adjustments
-        regional_multiplier = get_regional_cost_multiplier(
-            input_data.get('zip_code', ''),
-            input_data.get('state', '')
-        )
-        
-        analysis_years = input_data.get('analysis_years', 5)
+        with timer.stage('regional_multiplier'):
+            regional_key = (input_data.get('zip_code', ''), input_data.get('state', ''))
+            if batch_cache is not None and regional_key in batch_cache['regional_multipliers']:
+                regional_multiplier = batch_cache['regional_multipliers'][regional_key]
+            else:
+                regional_multiplier = get_regional_cost_multiplier(*regional_key)
+                if batch_cache is not None:
+                    batch_cache['regional_multipliers'][regional_key] = regional_multiplier
         
         # Route to appropriate calculation method
         if input_data.get('transaction_type', 'purchase').lower() == 'lease':
-            return self._calculate_lease_tco(input_data, vehicle_characteristics, regional_multiplier)
+            results = self._calculate_lease_tco(input_data, vehicle_characteristics, regional_multiplier,
+                                                batch_cache, timer)
         else:
-            return self._calculate_purchase_tco(input_data, vehicle_characteristics, regional_multiplier)
+            results = self._calculate_purchase_tco(input_data, vehicle_characteristics, regional_multiplier,
+                                                   batch_cache, timer)
+        
+        if timer.enabled:
+            self._report_stage_timings(input_data, vehicle_characteristics, results, timer)
+        return results
+    
+    def _report_stage_timings(self, input_data: Dict[str, Any], vehicle_characteristics: Dict[str, Any],
+                              results: Dict[str, Any], timer: StageTimer):
+        """Attach stage timings to the results and/or send them to the metrics sink"""
+        
+        stage_timings = timer.get_timings()
+        if self.stage_timing:
+            results['stage_timings'] = stage_timings
+        
+        if self.metrics_sink is not None:
+            context = {
+                'make': input_data.get('make'),
+                'model': input_data.get('model'),
+                'year': input_data.get('year'),
+                'transaction_type': input_data.get('transaction_type', 'purchase'),
+                'is_electric': bool(input_data.get('is_electric') or vehicle_characteristics.get('is_electric', False))
+            }
+            try:
+                self.metrics_sink(stage_timings, context)
+            except Exception as e:
+                logger.warning("Metrics sink failed: %s", e)
+    
+    def _get_cached_characteristics(self, input_data: Dict[str, Any],
+                                    batch_cache: Dict[str, Dict] = None) -> Dict[str, Any]:
+        """Look up vehicle characteristics, once per vehicle when running a batch"""
+        
+        vehicle_key = (input_data['make'], input_data['model'], input_data['year'], input_data.get('trim', None))
+        if batch_cache is not None and vehicle_key in batch_cache['characteristics']:
+            return batch_cache['characteristics'][vehicle_key]
+        
+        vehicle_characteristics = get_vehicle_characteristics(*vehicle_key)
+        if batch_cache is not None:
+            batch_cache['characteristics'][vehicle_key] = vehicle_characteristics
+        return vehicle_characteristics
+    
+    def _get_cached_maintenance_schedule(self, annual_mileage: int, years: int, starting_mileage: int,
+                                         vehicle_make: str, driving_style: str, vehicle_model: str,
+                                         batch_cache: Dict[str, Dict] = None) -> List[Dict[str, Any]]:
+        """Build a maintenance schedule, once per make/model/mileage profile when running a batch"""
+        
+        schedule_key = (annual_mileage, years, starting_mileage, vehicle_make, driving_style, vehicle_model)
+        if batch_cache is not None and schedule_key in batch_cache['maintenance_schedules']:
+            return batch_cache['maintenance_schedules'][schedule_key]
+        
+        schedule = self.maintenance_calculator.get_maintenance_schedule(
+            annual_mileage=annual_mileage,
+            years=years,
+            starting_mileage=starting_mileage,
+            vehicle_make=vehicle_make,
+            driving_style=driving_style,
+            vehicle_model=vehicle_model
+        )
+        if batch_cache is not None:
+            batch_cache['maintenance_schedules'][schedule_key] = schedule
+        return schedule
     
     def _calculate_realistic_used_vehicle_depreciation(self, input_data: Dict[str, Any], 
                                                     initial_value: float, 
@@ -121,51 +299,63 @@ class PredictionService:
 
     def _calculate_purchase_tco(self, input_data: Dict[str, Any], 
                                 vehicle_characteristics: Dict[str, Any],
-                                regional_multiplier: float) -> Dict[str, Any]:
+                                regional_multiplier: float,
+                                batch_cache: Dict[str, Dict] = None,
+                                timer: StageTimer = NULL_STAGE_TIMER) -> Dict[str, Any]:
         """Calculate TCO for purchase scenario with FIXED EV efficiency"""
-                # DEBUG: Print what we're getting
-        print(f"\n=== DEBUG PURCHASE TCO ===")
-        print(f"Make: {input_data.get('make')}")
-        print(f"Model: {input_data.get('model')}")
-        print(f"is_electric from input_data: {input_data.get('is_electric')}")
-        print(f"is_electric from vehicle_characteristics: {vehicle_characteristics.get('is_electric')}")
-        print(f"electricity_rate: {input_data.get('electricity_rate')}")
-        print(f"charging_preference: {input_data.get('charging_preference')}")
-        print(f"fuel_price: {input_data.get('fuel_price')}")
-        print(f"========================\n")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Purchase TCO inputs for %s %s", input_data.get('make'), input_data.get('model'), extra={
+                'input_is_electric': input_data.get('is_electric'),
+                'characteristics_is_electric': vehicle_characteristics.get('is_electric'),
+                'electricity_rate': input_data.get('electricity_rate'),
+                'charging_preference': input_data.get('charging_preference'),
+                'fuel_price': input_data.get('fuel_price')
+            })
+
         purchase_price = input_data.get('price', input_data.get('trim_msrp', 30000))
         analysis_years = input_data.get('analysis_years', 5)
         current_mileage = input_data.get('current_mileage', 0)
         
-        # Initialize category totals
-        category_totals = {
-            'depreciation': 0,
-            'maintenance': 0,
-            'insurance': 0,
-            'fuel_energy': 0,
-            'financing': 0
-        }
-        
         # Calculate depreciation schedule
-        depreciation_schedule = self.depreciation_model.calculate_depreciation_schedule(
-            purchase_price,                    # initial_value
-            input_data['make'],                # vehicle_make
-            input_data['model'],               # vehicle_model
-            input_data['year'],                # model_year
-            input_data['annual_mileage'],      # annual_mileage
-            analysis_years                     # years
-        )
+        with timer.stage('depreciation'):
+            depreciation_schedule = self.depreciation_model.calculate_depreciation_schedule(
+                purchase_price,                    # initial_value
+                input_data['make'],                # vehicle_make
+                input_data['model'],               # vehicle_model
+                input_data['year'],                # model_year
+                input_data['annual_mileage'],      # annual_mileage
+                analysis_years                     # years
+            )
         
         # Calculate maintenance schedule
-        maintenance_schedule = self.maintenance_calculator.get_maintenance_schedule(
-            annual_mileage=input_data['annual_mileage'],
-            years=analysis_years,
-            starting_mileage=current_mileage,
-            vehicle_make=input_data['make'],
-            driving_style=input_data.get('driving_style', 'normal'),
-            vehicle_model=input_data['model']
-        )
+        with timer.stage('maintenance'):
+            maintenance_schedule = self._get_cached_maintenance_schedule(
+                annual_mileage=input_data['annual_mileage'],
+                years=analysis_years,
+                starting_mileage=current_mileage,
+                vehicle_make=input_data['make'],
+                driving_style=input_data.get('driving_style', 'normal'),
+                vehicle_model=input_data['model'],
+                batch_cache=batch_cache
+            )
         
+        # Calculate financing if applicable
+        financing_schedule = self._get_purchase_financing_schedule(input_data, purchase_price, analysis_years, timer)
+
+        # Year-by-year breakdown
+        annual_breakdown = [
+            self._calculate_purchase_year(input_data, vehicle_characteristics, regional_multiplier, year,
+                                          depreciation_schedule, maintenance_schedule, financing_schedule, timer)
+            for year in range(1, analysis_years + 1)
+        ]
+
+        return self._build_purchase_results(input_data, vehicle_characteristics, annual_breakdown,
+                                            depreciation_schedule, maintenance_schedule, financing_schedule, timer)
+
+    def _get_purchase_financing_schedule(self, input_data: Dict[str, Any], purchase_price: float,
+                                         analysis_years: int,
+                                         timer: StageTimer = NULL_STAGE_TIMER) -> Optional[List[Dict[str, Any]]]:
+        """Loan payment rows for a financed purchase, None for a cash purchase"""
         # Calculate financing if applicable - FIXED to check multiple conditions
         financing_schedule = None
         # Check if financing is needed
@@ -180,33 +370,44 @@ class PredictionService:
         if is_financed:
             loan_amount = input_data.get('loan_amount', purchase_price * 0.8)
             if loan_amount > 0:
-                financing_schedule = self.financial_service.calculate_loan_payments(
-                    loan_amount=loan_amount,
-                    interest_rate=input_data.get('interest_rate', 5.0),
-                    loan_term_years=input_data.get('loan_term', 5),
-                    analysis_years=analysis_years
-                )
+                with timer.stage('financing'):
+                    financing_schedule = self.financial_service.calculate_loan_payments(
+                        loan_amount=loan_amount,
+                        interest_rate=input_data.get('interest_rate', 5.0),
+                        loan_term_years=input_data.get('loan_term', 5),
+                        analysis_years=analysis_years
+                    )
         
-        # Year-by-year breakdown
-        annual_breakdown = []
+        return financing_schedule
+
+    def _calculate_purchase_year(self, input_data: Dict[str, Any],
+                                 vehicle_characteristics: Dict[str, Any],
+                                 regional_multiplier: float, year: int,
+                                 depreciation_schedule: List[Dict[str, Any]],
+                                 maintenance_schedule: List[Dict[str, Any]],
+                                 financing_schedule: Optional[List[Dict[str, Any]]],
+                                 timer: StageTimer = NULL_STAGE_TIMER) -> Dict[str, Any]:
+        """Annual breakdown row for one ownership year of a purchase"""
+        purchase_price = input_data.get('price', input_data.get('trim_msrp', 30000))
+        current_mileage = input_data.get('current_mileage', 0)
+
+        ownership_year = 2025 + (year - 1)
         
-        for year in range(1, analysis_years + 1):
-            ownership_year = 2025 + (year - 1)
-            
-            # Depreciation
-            if year == 1:
-                annual_depreciation = purchase_price - depreciation_schedule[year-1]['vehicle_value']
-            else:
-                annual_depreciation = depreciation_schedule[year-2]['vehicle_value'] - depreciation_schedule[year-1]['vehicle_value']
-            
-            # Maintenance
-            annual_maintenance = 0
-            maintenance_activities = []
-            if year <= len(maintenance_schedule):
-                annual_maintenance = maintenance_schedule[year-1]['total_year_cost']
-                maintenance_activities = maintenance_schedule[year-1].get('services', [])
-            
-            # Insurance
+        # Depreciation
+        if year == 1:
+            annual_depreciation = purchase_price - depreciation_schedule[year-1]['vehicle_value']
+        else:
+            annual_depreciation = depreciation_schedule[year-2]['vehicle_value'] - depreciation_schedule[year-1]['vehicle_value']
+        
+        # Maintenance
+        annual_maintenance = 0
+        maintenance_activities = []
+        if year <= len(maintenance_schedule):
+            annual_maintenance = maintenance_schedule[year-1]['total_year_cost']
+            maintenance_activities = maintenance_schedule[year-1].get('services', [])
+        
+        # Insurance
+        with timer.stage('insurance'):
             annual_insurance = self.insurance_calculator.calculate_annual_premium(
                 vehicle_value=depreciation_schedule[year-1]['vehicle_value'] if year <= len(depreciation_schedule) else purchase_price * 0.5,
                 vehicle_make=input_data['make'],
@@ -219,7 +420,8 @@ class PredictionService:
                 regional_multiplier=regional_multiplier,
                 vehicle_model=input_data['model']
             )
-            
+        
+        with timer.stage('fuel_energy'):
             # FIXED: Fuel/Energy costs - check both input_data AND vehicle_characteristics for is_electric
             is_electric = input_data.get('is_electric') or vehicle_characteristics.get('is_electric', False)
 
@@ -227,36 +429,23 @@ class PredictionService:
             driving_style = input_data.get('driving_style', 'normal')
             terrain = input_data.get('terrain', 'flat')
 
-            # Driving style efficiency multipliers
-            driving_style_multipliers = {
-                'gentle': 1.15,     # 15% better efficiency
-                'normal': 1.0,      # Baseline
-                'aggressive': 0.85  # 15% worse efficiency
-            }
-
-            # Terrain efficiency multipliers
-            terrain_multipliers = {
-                'flat': 1.05,       # 5% better efficiency
-                'hilly': 0.95       # 5% worse efficiency
-            }
-
-            # Calculate combined multiplier
-            style_multiplier = driving_style_multipliers.get(driving_style, 1.0)
-            terrain_multiplier = terrain_multipliers.get(terrain, 1.0)
-            combined_multiplier = style_multiplier * terrain_multiplier
-
             if is_electric:
+                # Driving style and terrain efficiency multipliers
+                style_multiplier = self.ev_calculator.driving_style_multipliers.get(driving_style, 1.0)
+                terrain_multiplier = self.ev_calculator.terrain_multipliers.get(terrain, 1.0)
+                combined_multiplier = style_multiplier * terrain_multiplier
+
                 # Get EV efficiency in kWh per 100 miles
                 ev_efficiency = self.ev_calculator.estimate_ev_efficiency(
                     input_data['make'],
                     input_data['model'],
                     input_data['year']
                 )
-                
+            
                 # Apply driving adjustments to EV efficiency
                 # For EVs: worse driving = MORE kWh needed, so DIVIDE by multiplier
                 adjusted_ev_efficiency = ev_efficiency / combined_multiplier
-                
+            
                 annual_fuel = self.ev_calculator.calculate_annual_electricity_cost(
                     annual_mileage=input_data['annual_mileage'],
                     vehicle_efficiency=adjusted_ev_efficiency,  # Use adjusted efficiency
@@ -274,37 +463,52 @@ class PredictionService:
                 )
 
 
-            # Financing costs
-            annual_financing = 0
-            if financing_schedule and year <= len(financing_schedule):
-                annual_financing = financing_schedule[year-1].get('annual_payment', 0)
-            
-            # Total annual cost
-            total_annual = annual_depreciation + annual_maintenance + annual_insurance + annual_fuel + annual_financing
-            
-            # Store breakdown
-            annual_breakdown.append({
-                'year': year,
-                'ownership_year': ownership_year,
-                'vehicle_age': ownership_year - input_data['year'],
-                'vehicle_model_year': input_data['year'],
-                'cumulative_mileage': current_mileage + (input_data['annual_mileage'] * year),
-                'depreciation': annual_depreciation,
-                'maintenance': annual_maintenance,
-                'maintenance_activities': maintenance_activities,
-                'insurance': annual_insurance,
-                'fuel_energy': annual_fuel,
-                'financing': annual_financing,
-                'total_annual_cost': total_annual
-            })
-            
-            # Add to totals
-            category_totals['depreciation'] += annual_depreciation
-            category_totals['maintenance'] += annual_maintenance
-            category_totals['insurance'] += annual_insurance
-            category_totals['fuel_energy'] += annual_fuel
-            category_totals['financing'] += annual_financing
+        # Financing costs
+        annual_financing = 0
+        if financing_schedule and year <= len(financing_schedule):
+            annual_financing = financing_schedule[year-1].get('annual_payment', 0)
         
+        # Total annual cost
+        total_annual = annual_depreciation + annual_maintenance + annual_insurance + annual_fuel + annual_financing
+        
+        return {
+            'year': year,
+            'ownership_year': ownership_year,
+            'vehicle_age': ownership_year - input_data['year'],
+            'vehicle_model_year': input_data['year'],
+            'cumulative_mileage': current_mileage + (input_data['annual_mileage'] * year),
+            'depreciation': annual_depreciation,
+            'maintenance': annual_maintenance,
+            'maintenance_activities': maintenance_activities,
+            'insurance': annual_insurance,
+            'fuel_energy': annual_fuel,
+            'financing': annual_financing,
+            'total_annual_cost': total_annual
+        }
+
+    def _build_purchase_results(self, input_data: Dict[str, Any],
+                                vehicle_characteristics: Dict[str, Any],
+                                annual_breakdown: List[Dict[str, Any]],
+                                depreciation_schedule: List[Dict[str, Any]],
+                                maintenance_schedule: List[Dict[str, Any]],
+                                financing_schedule: Optional[List[Dict[str, Any]]],
+                                timer: StageTimer = NULL_STAGE_TIMER) -> Dict[str, Any]:
+        """Totals, summary metrics and affordability for a purchase's annual breakdown"""
+        purchase_price = input_data.get('price', input_data.get('trim_msrp', 30000))
+        analysis_years = len(annual_breakdown)
+        current_mileage = input_data.get('current_mileage', 0)
+
+        category_totals = {
+            'depreciation': 0,
+            'maintenance': 0,
+            'insurance': 0,
+            'fuel_energy': 0,
+            'financing': 0
+        }
+        for breakdown in annual_breakdown:
+            for category in category_totals:
+                category_totals[category] += breakdown[category]
+
         # Calculate final metrics
         total_tco = sum(category_totals.values())
         out_of_pocket_total = (
@@ -323,35 +527,38 @@ class PredictionService:
         final_vehicle_value = depreciation_schedule[-1]['vehicle_value'] if depreciation_schedule else purchase_price * 0.5
         
         # Calculate affordability
-        affordability = self._calculate_affordability(
-            annual_cost=average_annual_out_of_pocket,
-            gross_income=input_data.get('gross_income', 60000),
-            transaction_type='purchase'
-        )
+        with timer.stage('affordability'):
+            affordability = self._calculate_affordability(
+                annual_cost=average_annual_out_of_pocket,
+                gross_income=input_data.get('gross_income', 60000),
+                transaction_type='purchase'
+            )
         
-        return {
-            'summary': {
-                'total_tco': total_tco,
-                'total_ownership_cost': out_of_pocket_total,
-                'average_annual_cost': average_annual_out_of_pocket,
-                'cost_per_mile': cost_per_mile,
-                'final_vehicle_value': final_vehicle_value,
-                'total_depreciation': category_totals['depreciation']
-            },
-            'annual_breakdown': annual_breakdown,
-            'category_totals': category_totals,
-            'depreciation_schedule': depreciation_schedule,
-            'maintenance_schedule': maintenance_schedule,
-            'financing_schedule': financing_schedule,
-            'vehicle_characteristics': vehicle_characteristics,
-            'affordability': affordability,
-            'analysis_parameters': {
-                'analysis_years': analysis_years,
-                'annual_mileage': input_data['annual_mileage'],
-                'starting_mileage': current_mileage,
-                'purchase_price': purchase_price
+        with timer.stage('result_reshaping'):
+            results = {
+                'summary': {
+                    'total_tco': total_tco,
+                    'total_ownership_cost': out_of_pocket_total,
+                    'average_annual_cost': average_annual_out_of_pocket,
+                    'cost_per_mile': cost_per_mile,
+                    'final_vehicle_value': final_vehicle_value,
+                    'total_depreciation': category_totals['depreciation']
+                },
+                'annual_breakdown': annual_breakdown,
+                'category_totals': category_totals,
+                'depreciation_schedule': depreciation_schedule,
+                'maintenance_schedule': maintenance_schedule,
+                'financing_schedule': financing_schedule,
+                'vehicle_characteristics': vehicle_characteristics,
+                'affordability': affordability,
+                'analysis_parameters': {
+                    'analysis_years': analysis_years,
+                    'annual_mileage': input_data['annual_mileage'],
+                    'starting_mileage': current_mileage,
+                    'purchase_price': purchase_price
+                }
             }
-        }
+        return results
 
     def _adjust_maintenance_schedule(self, base_schedule: List[Dict[str, Any]], 
                                 vehicle_make: str, shop_type: str, 
@@ -480,7 +687,9 @@ class PredictionService:
 
     def _calculate_lease_tco(self, input_data: Dict[str, Any],
                             vehicle_characteristics: Dict[str, Any],
-                            regional_multiplier: float) -> Dict[str, Any]:
+                            regional_multiplier: float,
+                            batch_cache: Dict[str, Dict] = None,
+                            timer: StageTimer = NULL_STAGE_TIMER) -> Dict[str, Any]:
         """Calculate TCO for lease scenario - FIXED: All required defaults added"""
         
         # FIXED: Provide safe defaults for all fields
@@ -503,34 +712,22 @@ class PredictionService:
         }
         
         # Calculate lease maintenance schedule with safe defaults
-        lease_maintenance_schedule = self.maintenance_calculator.get_maintenance_schedule(
-            annual_mileage=annual_mileage_limit,
-            years=lease_term,
-            starting_mileage=0,
-            vehicle_make=input_data.get('make', 'Unknown'),
-            driving_style=driving_style,
-            vehicle_model=input_data.get('model', 'Unknown')
-        )
+        with timer.stage('maintenance'):
+            lease_maintenance_schedule = self._get_cached_maintenance_schedule(
+                annual_mileage=annual_mileage_limit,
+                years=lease_term,
+                starting_mileage=0,
+                vehicle_make=input_data.get('make', 'Unknown'),
+                driving_style=driving_style,
+                vehicle_model=input_data.get('model', 'Unknown'),
+                batch_cache=batch_cache
+            )
         
-        annual_breakdown = []
         
-        for year in range(1, lease_term + 1):
-            ownership_year = 2025 + (year - 1)
-            current_mileage = annual_mileage_limit * year
-            
-            # Lease payments
-            annual_lease_payment = monthly_payment * 12
-            
-            # Maintenance
-            if year <= len(lease_maintenance_schedule):
-                annual_maintenance = lease_maintenance_schedule[year-1]['total_year_cost']
-                maintenance_activities = lease_maintenance_schedule[year-1]['services']
-            else:
-                annual_maintenance = 0
-                maintenance_activities = []
-            
-            # Insurance - with safe defaults
-            vehicle_value = input_data.get('trim_msrp', input_data.get('purchase_price', 40000))
+        # Vehicle value, rated mileage and efficiency are fixed for the lease, so
+        # insurance and fuel/energy are the same every year
+        vehicle_value = input_data.get('trim_msrp', input_data.get('purchase_price', 40000))
+        with timer.stage('insurance'):
             annual_insurance = self.insurance_calculator.calculate_annual_premium(
                 vehicle_value=vehicle_value,
                 vehicle_make=input_data.get('make', 'Unknown'),
@@ -542,63 +739,62 @@ class PredictionService:
                 num_vehicles=input_data.get('num_household_vehicles', 1),
                 regional_multiplier=regional_multiplier
             )
-            
-            # ============================================================================
-            # FIX FOR prediction_service.py
-            # Add driving style and terrain adjustments to EV calculations
-            # ============================================================================
-
-            # Find this section in _calculate_purchase_tco method (around line 200-250):
-
-            is_electric = input_data.get('is_electric') or vehicle_characteristics.get('is_electric', False)
-
-            # Get driving parameters
-            driving_style = input_data.get('driving_style', 'normal')
-            terrain = input_data.get('terrain', 'flat')
-
-            # Driving style efficiency multipliers
-            driving_style_multipliers = {
-                'gentle': 1.15,     # 15% better efficiency
-                'normal': 1.0,      # Baseline
-                'aggressive': 0.85  # 15% worse efficiency
-            }
-
-            # Terrain efficiency multipliers
-            terrain_multipliers = {
-                'flat': 1.05,       # 5% better efficiency
-                'hilly': 0.95       # 5% worse efficiency
-            }
-
-            # Calculate combined multiplier
-            style_multiplier = driving_style_multipliers.get(driving_style, 1.0)
-            terrain_multiplier = terrain_multipliers.get(terrain, 1.0)
-            combined_multiplier = style_multiplier * terrain_multiplier
-
+        
+        is_electric = input_data.get('is_electric') or vehicle_characteristics.get('is_electric', False)
+        
+        with timer.stage('fuel_energy'):
             if is_electric:
+                # Driving style and terrain efficiency multipliers, as for purchases
+                combined_multiplier = (self.ev_calculator.driving_style_multipliers.get(driving_style, 1.0) *
+                                       self.ev_calculator.terrain_multipliers.get(terrain, 1.0))
+                
+                # For EVs: worse driving = MORE kWh needed, so DIVIDE by multiplier
+                adjusted_ev_efficiency = self.ev_calculator.estimate_ev_efficiency(
+                    input_data.get('make', 'Unknown'),
+                    input_data.get('model', 'Unknown'),
+                    input_data.get('year', 2024)
+                ) / combined_multiplier
+                
                 annual_fuel = self.ev_calculator.calculate_annual_electricity_cost(
-                    annual_mileage=annual_mileage_limit,  # âœ… Use lease mileage limit
+                    annual_mileage=annual_mileage_limit,  # Use lease mileage limit
                     vehicle_efficiency=adjusted_ev_efficiency,
                     electricity_rate=input_data.get('electricity_rate', 0.12),
                     charging_preference=input_data.get('charging_preference', 'mixed')
                 )
             else:
                 annual_fuel = self.fuel_calculator.calculate_annual_fuel_cost(
-                    annual_mileage=annual_mileage_limit,  # âœ… Use lease mileage limit
+                    annual_mileage=annual_mileage_limit,  # Use lease mileage limit
                     mpg=vehicle_characteristics.get('mpg', 25),
-                    fuel_price=input_data.get('fuel_price', 3.50),
+                    fuel_price=fuel_price,
                     driving_style=driving_style,
                     terrain=terrain
                 )
-
-
+        
+        annual_breakdown = []
+        
+        for year in range(1, lease_term + 1):
+            ownership_year = 2025 + (year - 1)
+            current_mileage = annual_mileage_limit * year
+            
+            # Lease payments
+            annual_lease_payment = monthly_payment * 12
+            
+            # Maintenance
+            if year <= len(lease_maintenance_schedule):
+                annual_maintenance = lease_maintenance_schedule[year-1]['total_year_cost']
+                maintenance_activities = lease_maintenance_schedule[year-1]['services']
+            else:
+                annual_maintenance = 0
+                maintenance_activities = []
             
             # Calculate fees/penalties
-            annual_fees = self._calculate_lease_fees_and_penalties(
-                actual_mileage=input_data.get('annual_mileage', annual_mileage_limit),
-                allowed_mileage=annual_mileage_limit,
-                lease_year=year,
-                vehicle_value=vehicle_value
-            )
+            with timer.stage('lease_fees'):
+                annual_fees = self._calculate_lease_fees_and_penalties(
+                    actual_mileage=input_data.get('annual_mileage', annual_mileage_limit),
+                    allowed_mileage=annual_mileage_limit,
+                    lease_year=year,
+                    vehicle_value=vehicle_value
+                )
             
             # Total annual cost
             total_annual = annual_lease_payment + annual_maintenance + annual_insurance + annual_fuel + annual_fees
@@ -635,33 +831,36 @@ class PredictionService:
         cost_per_mile = total_lease_cost / total_miles if total_miles > 0 else 0
         
         # Affordability calculation with safe defaults
-        affordability = self._calculate_affordability(
-            annual_cost=average_annual_cost,
-            gross_income=input_data.get('gross_income', 60000),
-            transaction_type='lease'
-        )
+        with timer.stage('affordability'):
+            affordability = self._calculate_affordability(
+                annual_cost=average_annual_cost,
+                gross_income=input_data.get('gross_income', 60000),
+                transaction_type='lease'
+            )
         
-        return {
-            'summary': {
-                'total_lease_cost': total_lease_cost,
-                'average_annual_cost': average_annual_cost,
-                'average_monthly_cost': average_monthly_cost,
-                'cost_per_mile': cost_per_mile,
-                'down_payment': down_payment
-            },
-            'annual_breakdown': annual_breakdown,
-            'category_totals': category_totals,
-            'maintenance_schedule': lease_maintenance_schedule,
-            'vehicle_characteristics': vehicle_characteristics,
-            'affordability': affordability,
-            'analysis_parameters': {
-                'lease_term': lease_term,
-                'monthly_payment': monthly_payment,
-                'annual_mileage_limit': annual_mileage_limit,
-                'driving_style': driving_style,
-                'terrain': terrain
+        with timer.stage('result_reshaping'):
+            results = {
+                'summary': {
+                    'total_lease_cost': total_lease_cost,
+                    'average_annual_cost': average_annual_cost,
+                    'average_monthly_cost': average_monthly_cost,
+                    'cost_per_mile': cost_per_mile,
+                    'down_payment': down_payment
+                },
+                'annual_breakdown': annual_breakdown,
+                'category_totals': category_totals,
+                'maintenance_schedule': lease_maintenance_schedule,
+                'vehicle_characteristics': vehicle_characteristics,
+                'affordability': affordability,
+                'analysis_parameters': {
+                    'lease_term': lease_term,
+                    'monthly_payment': monthly_payment,
+                    'annual_mileage_limit': annual_mileage_limit,
+                    'driving_style': driving_style,
+                    'terrain': terrain
+                }
             }
-        }
+        return results
 
     def _adjust_lease_maintenance_schedule(self, base_schedule: List[Dict[str, Any]], 
                                             vehicle_make: str, regional_multiplier: float) -> List[Dict[str, Any]]:
@@ -740,9 +939,8 @@ class PredictionService:
         """Calculate lease overage fees and penalties"""
         
         mileage_overage = max(0, actual_mileage - allowed_mileage)
-        overage_fee_per_mile = 0.25
         
-        annual_fees = mileage_overage * overage_fee_per_mile
+        annual_fees = mileage_overage * LEASE_OVERAGE_FEE_PER_MILE
         
         return annual_fees
 
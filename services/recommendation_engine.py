@@ -5,6 +5,8 @@ Generates intelligent recommendations and pros/cons analysis for vehicles
 
 from typing import Dict, Any, List, Tuple
 import math
+import numpy as np
+import pandas as pd
 
 class RecommendationEngine:
     """Engine for generating automated vehicle recommendations"""
@@ -38,6 +40,14 @@ class RecommendationEngine:
             'Jeep': 3.0
         }
         
+        # Pareto objectives and their direction ('min' = lower is better)
+        self.pareto_objectives = {
+            'annual_cost': 'min',
+            'cost_per_mile': 'min',
+            'affordability_score': 'min',  # Percentage of income
+            'reliability': 'max'           # Brand reliability (1-5 scale)
+        }
+        
         # Market segment characteristics
         self.segment_characteristics = {
             'compact': {'fuel_efficient': True, 'affordable': True, 'spacious': False, 'luxury': False},
@@ -133,6 +143,103 @@ class RecommendationEngine:
         
         return min(100, max(0, overall_score))
     
+    def score_vehicles_vectorized(self, metrics_df: pd.DataFrame, weight_matrix: Any = None) -> np.ndarray:
+        """
+        Score every (vehicle, weighting) pair in one pass
+        metrics_df has one row per vehicle with the comparison metric columns;
+        weight_matrix has one row per weighting with columns in scoring_weights order
+        (a DataFrame with factor-named columns or a list of weight dicts also works).
+        Returns an (n_vehicles, n_weightings) array matching _calculate_overall_score.
+        """
+        
+        factor_scores = self._calculate_factor_scores_vectorized(metrics_df)
+        weights = self._get_weight_matrix(weight_matrix)
+        
+        scores = np.clip(factor_scores @ weights.T, 0, 100)
+        
+        # Failed calculations score zero, as in generate_vehicle_recommendations
+        if 'calculation_successful' in metrics_df.columns:
+            successful = metrics_df['calculation_successful'].fillna(True).astype(bool).to_numpy()
+            scores[~successful] = 0
+        
+        return scores
+    
+    def sweep_weight_profiles(self, metrics_df: pd.DataFrame, weight_matrix: Any) -> Dict[str, Any]:
+        """Show how vehicle rankings shift across many priority profiles"""
+        
+        scores = self.score_vehicles_vectorized(metrics_df, weight_matrix)
+        n_vehicles, n_profiles = scores.shape
+        
+        # Rank 1 = highest score; stable sort keeps input order on ties
+        order = np.argsort(-scores, axis=0, kind='stable')
+        ranks = np.empty_like(order)
+        ranks[order, np.arange(n_profiles)] = np.arange(1, n_vehicles + 1)[:, None]
+        
+        if 'vehicle_name' in metrics_df.columns:
+            vehicle_names = metrics_df['vehicle_name'].astype(str).tolist()
+        else:
+            vehicle_names = [str(index) for index in metrics_df.index]
+        
+        win_counts = np.bincount(order[0], minlength=n_vehicles) if n_vehicles else np.zeros(0, dtype=int)
+        
+        return {
+            'scores': scores,
+            'ranks': ranks,
+            'top_vehicle_by_profile': [vehicle_names[i] for i in order[0]] if n_vehicles else [],
+            'rank_summary': pd.DataFrame({
+                'vehicle_name': vehicle_names,
+                'best_rank': ranks.min(axis=1) if n_profiles else 0,
+                'worst_rank': ranks.max(axis=1) if n_profiles else 0,
+                'mean_rank': ranks.mean(axis=1) if n_profiles else 0,
+                'profiles_won': win_counts,
+                'mean_score': scores.mean(axis=1) if n_profiles else 0
+            })
+        }
+    
+    def _calculate_factor_scores_vectorized(self, metrics_df: pd.DataFrame) -> np.ndarray:
+        """Columnar version of the per-factor scores in _calculate_overall_score"""
+        
+        n_vehicles = len(metrics_df)
+        
+        def column(name: str, default: Any) -> pd.Series:
+            if name in metrics_df.columns:
+                return metrics_df[name].fillna(default)
+            return pd.Series([default] * n_vehicles, index=metrics_df.index)
+        
+        annual_cost = column('annual_cost', 0).to_numpy(dtype=float)
+        affordability_percentage = column('affordability_score', 20).to_numpy(dtype=float)
+        cost_per_mile = column('cost_per_mile', 1.0).to_numpy(dtype=float)
+        purchase_price = column('purchase_price', 30000).to_numpy(dtype=float)
+        is_lease = column('transaction_type', '').astype(str).str.lower().to_numpy() == 'lease'
+        reliability = column('make', '').map(lambda make: self.brand_reliability.get(make, 3.5)).to_numpy(dtype=float)
+        
+        factor_scores = {
+            'cost': np.where(annual_cost > 0, np.maximum(0, 100 - ((annual_cost - 5000) / 150)), 0),
+            'affordability': np.maximum(0, 100 - ((affordability_percentage - 10) * 6.67)),
+            'reliability': (reliability / 5.0) * 100,
+            'efficiency': np.maximum(0, 100 - ((cost_per_mile - 0.30) * 250)),
+            'features': np.where(is_lease, 80, np.minimum(100, np.maximum(40, 40 + ((purchase_price - 20000) / 500))))
+        }
+        
+        return np.column_stack([factor_scores[factor] for factor in self.scoring_weights])
+    
+    def _get_weight_matrix(self, weight_matrix: Any = None) -> np.ndarray:
+        """Normalize weight input to an (n_weightings, n_factors) array"""
+        
+        factors = list(self.scoring_weights.keys())
+        
+        if weight_matrix is None:
+            return np.array([[self.scoring_weights[f] for f in factors]])
+        if isinstance(weight_matrix, pd.DataFrame):
+            return weight_matrix.reindex(columns=factors).fillna(0).to_numpy(dtype=float)
+        if isinstance(weight_matrix, list) and weight_matrix and isinstance(weight_matrix[0], dict):
+            return np.array([[w.get(f, 0) for f in factors] for w in weight_matrix], dtype=float)
+        
+        weights = np.atleast_2d(np.asarray(weight_matrix, dtype=float))
+        if weights.shape[1] != len(factors):
+            raise ValueError(f"Weight matrix needs {len(factors)} columns ({', '.join(factors)}), got {weights.shape[1]}")
+        return weights
+    
     def _generate_pros_cons(self, vehicle: Dict[str, Any]) -> Dict[str, Any]:
         """Generate pros and cons for a specific vehicle"""
         
@@ -441,6 +548,87 @@ class RecommendationEngine:
         
         return criteria
     
+    def compute_pareto_front(self, vehicles: List[Dict[str, Any]], 
+                           objectives: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the non-dominated vehicles across the Pareto objectives
+        A vehicle is dropped only if another is at least as good on every objective
+        and strictly better on one. Two objectives use an O(n log n) sort-and-sweep,
+        more use a sort-filter skyline. Returned in order of the first objective.
+        """
+        
+        objectives = objectives or list(self.pareto_objectives.keys())
+        unknown = [o for o in objectives if o not in self.pareto_objectives]
+        if unknown:
+            raise ValueError(f"Unknown Pareto objectives: {', '.join(unknown)}")
+        
+        valid_vehicles = [v for v in vehicles if v.get('calculation_successful', True)]
+        if not valid_vehicles:
+            return []
+        
+        points = self._get_objective_matrix(valid_vehicles, objectives)
+        
+        # Lexicographic order is monotone: a dominating point always sorts first
+        order = np.lexsort(points.T[::-1])
+        
+        if points.shape[1] == 1:
+            best = points[order[0], 0]
+            front_indices = [i for i in order if points[i, 0] == best]
+        elif points.shape[1] == 2:
+            front_indices = self._pareto_sweep_2d(points, order)
+        else:
+            front_indices = self._pareto_skyline(points, order)
+        
+        return [valid_vehicles[i] for i in front_indices]
+    
+    def _get_objective_matrix(self, vehicles: List[Dict[str, Any]], objectives: List[str]) -> np.ndarray:
+        """Build an (n_vehicles, n_objectives) matrix where lower is always better"""
+        
+        columns = []
+        for objective in objectives:
+            if objective == 'reliability':
+                values = [self.brand_reliability.get(v.get('make', ''), 3.5) for v in vehicles]
+            else:
+                values = [v.get(objective, 0) for v in vehicles]
+            
+            column = np.asarray(values, dtype=float)
+            columns.append(-column if self.pareto_objectives[objective] == 'max' else column)
+        
+        return np.column_stack(columns)
+    
+    def _pareto_sweep_2d(self, points: np.ndarray, order: np.ndarray) -> List[int]:
+        """Two-objective front: after sorting by the first objective, keep each new second-objective best"""
+        
+        front_indices = []
+        best_point = None
+        
+        for i in order:
+            point = points[i]
+            if best_point is None or point[1] < best_point[1] or np.array_equal(point, best_point):
+                front_indices.append(int(i))
+                best_point = point
+        
+        return front_indices
+    
+    def _pareto_skyline(self, points: np.ndarray, order: np.ndarray) -> List[int]:
+        """Higher-dimension front: sort-filter skyline, each point checked only against the current front"""
+        
+        front_indices = []
+        front = np.empty((0, points.shape[1]))
+        
+        for i in order:
+            point = points[i]
+            if len(front):
+                dominated = np.all(front <= point, axis=1) & np.any(front < point, axis=1)
+                if dominated.any():
+                    continue
+            
+            # Sorted input means no later point can dominate an accepted one
+            front_indices.append(int(i))
+            front = np.vstack([front, point])
+        
+        return front_indices
+    
     def _get_scoring_breakdown(self, vehicle_scores: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Get detailed scoring breakdown for transparency"""
         
@@ -524,6 +712,18 @@ def test_recommendation_engine():
     for insight in recommendations.get('key_insights', [])[:3]:
         print(f"• {insight}")
     
+    print(f"\nWeight Sweep (default, cost-focused, reliability-focused):")
+    sweep = engine.sweep_weight_profiles(pd.DataFrame(vehicles), [
+        engine.scoring_weights,
+        {'cost': 0.7, 'affordability': 0.1, 'reliability': 0.1, 'efficiency': 0.1},
+        {'cost': 0.1, 'affordability': 0.1, 'reliability': 0.7, 'efficiency': 0.1}
+    ])
+    print(f"  Winners: {', '.join(sweep['top_vehicle_by_profile'])}")
+    
+    print(f"\nPareto Front (cost, cost/mile, affordability, reliability):")
+    for vehicle in engine.compute_pareto_front(vehicles):
+        print(f"  • {vehicle['vehicle_name']}")
+    
     print(f"\nBest by Criteria:")
     best_criteria = recommendations.get('best_by_criteria', {})
     for criterion, vehicle in best_criteria.items():
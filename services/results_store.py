@@ -0,0 +1,99 @@
+"""
+Shared Results Store
+Content-addressed store that keeps one copy of each distinct TCO result for the
+whole process; sessions hold the content hash plus a few summary metrics
+"""
+
+from typing import Dict, Any, Optional
+from collections import OrderedDict
+import threading
+
+from services.tco_cache import compute_results_hash
+
+class ResultsStore:
+    """Bounded LRU of TCO results keyed on their content hash"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'deduplicated': 0, 'evictions': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, results_ref: str) -> bool:
+        return results_ref in self._entries
+
+    def put(self, results: Dict[str, Any]) -> str:
+        """Store results (once per distinct content) and return their reference"""
+
+        results_ref = compute_results_hash(results)
+
+        with self._lock:
+            if results_ref in self._entries:
+                # Identical results from another session or vehicle share the stored copy
+                self._entries.move_to_end(results_ref)
+                self.stats['deduplicated'] += 1
+            else:
+                self._entries[results_ref] = results
+                self.stats['stored'] += 1
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats['evictions'] += 1
+
+        return results_ref
+
+    def get(self, results_ref: str) -> Optional[Dict[str, Any]]:
+        """
+        Get stored results, or None if the reference was evicted
+        The returned dict is shared between sessions and must not be modified.
+        """
+
+        with self._lock:
+            results = self._entries.get(results_ref)
+            if results is None:
+                self.stats['misses'] += 1
+            else:
+                self._entries.move_to_end(results_ref)
+                self.stats['hits'] += 1
+        return results
+
+    def clear(self):
+        """Drop all stored results"""
+
+        with self._lock:
+            self._entries.clear()
+
+def summarize_results(vehicle_data: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+    """Headline metrics kept in session state next to a results reference"""
+
+    summary = results.get('summary', {})
+    is_lease = str(vehicle_data.get('transaction_type', '')).lower() == 'lease'
+
+    return {
+        'total_cost': summary.get('total_lease_cost' if is_lease else 'total_ownership_cost', 0),
+        'average_annual_cost': summary.get('average_annual_cost', 0),
+        'cost_per_mile': summary.get('cost_per_mile', 0),
+        'is_affordable': results.get('affordability', {}).get('is_affordable', False)
+    }
+
+# Test function
+def test_results_store():
+    """Test that identical results are stored once"""
+    store = ResultsStore(max_entries=4)
+
+    results = {'summary': {'total_ownership_cost': 41000, 'average_annual_cost': 8200, 'cost_per_mile': 0.68}}
+    first_ref = store.put(results)
+    second_ref = store.put({'summary': dict(results['summary'])})
+
+    print("=== RESULTS STORE TEST ===")
+    print(f"Reference: {first_ref[:16]}..., same content shares it: {first_ref == second_ref}")
+    print(f"Stored copies: {len(store)}")
+    print(f"Summary: {summarize_results({'transaction_type': 'Purchase'}, store.get(first_ref))}")
+    print(f"Stats: {store.stats}")
+
+if __name__ == "__main__":
+    test_results_store()
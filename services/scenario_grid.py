@@ -0,0 +1,124 @@
+"""
+Scenario Grid
+"What if" matrices for one vehicle: evaluates purchase TCO over the Cartesian
+product of analysis years, annual mileage, loan terms and down payments in one
+array pass, sharing characteristics, depreciation curve and service plan
+"""
+
+from typing import Dict, Any, List, Iterable
+import numpy as np
+import pandas as pd
+
+from services.prediction_service import PredictionService
+from services.vehicle_cost_profile import VehicleCostProfile, PURCHASE_CATEGORIES
+
+DEFAULT_GRID_YEARS = list(range(1, 11))
+DEFAULT_GRID_MILEAGE = list(range(5000, 30001, 2500))
+
+# Grid dimensions, in DataFrame column and array axis order
+GRID_DIMENSIONS = ['analysis_years', 'annual_mileage', 'loan_term', 'down_payment']
+
+class ScenarioGrid:
+    """Purchase TCO over a grid of analysis years, mileage, loan terms and down payments for one vehicle"""
+
+    def __init__(self, input_data: Dict[str, Any], prediction_service: PredictionService = None):
+        if input_data.get('transaction_type', 'purchase').lower() == 'lease':
+            raise ValueError("Scenario grids cover purchase scenarios")
+
+        self.prediction_service = prediction_service or PredictionService()
+        self.input_data = input_data
+        self.profile = VehicleCostProfile(input_data, self.prediction_service)
+
+    def evaluate(self, analysis_years: Iterable[int] = None, annual_mileage: Iterable[float] = None,
+                 loan_terms: Iterable[int] = None, down_payments: Iterable[float] = None) -> pd.DataFrame:
+        """
+        One row per grid cell with the summary metrics and category totals
+        Omitted dimensions hold the input's value. The loan is the purchase price
+        minus the down payment, so a down payment of the full price is a cash purchase.
+        """
+        base = self.profile.base_inputs
+        purchase_price = base['purchase_price']
+
+        axes = {
+            'analysis_years': np.asarray(DEFAULT_GRID_YEARS if analysis_years is None else list(analysis_years), dtype=int),
+            'annual_mileage': np.asarray(DEFAULT_GRID_MILEAGE if annual_mileage is None else list(annual_mileage), dtype=float),
+            'loan_term': np.asarray([base['loan_term']] if loan_terms is None else list(loan_terms), dtype=float),
+            'down_payment': np.asarray(
+                [purchase_price - base['loan_amount']] if down_payments is None else list(down_payments), dtype=float
+            )
+        }
+        if (axes['analysis_years'] < 1).any():
+            raise ValueError("analysis_years must be at least 1")
+
+        # Axis i of the grid is dimension i; costs only vary with mileage, term and down payment
+        years, mileage, loan_term, down_payment = np.ix_(*axes.values())
+        loan_amount = np.maximum(purchase_price - down_payment, 0)
+
+        annual_costs = self.profile.evaluate(
+            years=int(axes['analysis_years'].max()), annual_mileage=mileage[0],
+            loan_term=loan_term[0], loan_amount=loan_amount[0]
+        )
+        summary = self.profile.summarize(annual_costs, years=years, annual_mileage=mileage[0])
+
+        shape = tuple(len(values) for values in axes.values())
+        columns = {name: np.broadcast_to(grid_axis, shape).ravel()
+                   for name, grid_axis in zip(GRID_DIMENSIONS, (years, mileage, loan_term, down_payment))}
+        columns['loan_amount'] = np.broadcast_to(loan_amount, shape).ravel()
+        columns['monthly_payment'] = np.broadcast_to(annual_costs['financing'][..., 0] / 12, shape).ravel()
+
+        for metric in ('total_tco', 'total_ownership_cost', 'average_annual_cost', 'cost_per_mile', 'final_vehicle_value'):
+            columns[metric] = np.broadcast_to(summary[metric], shape).ravel()
+        for category in PURCHASE_CATEGORIES:
+            columns[category] = np.broadcast_to(summary['category_totals'][category], shape).ravel()
+
+        # Affordability as in PredictionService._calculate_affordability
+        gross_income = base['gross_income']
+        percentage_of_income = columns['average_annual_cost'] / gross_income * 100 if gross_income > 0 else np.zeros(columns['total_tco'].shape)
+        columns['percentage_of_income'] = percentage_of_income
+        columns['affordability_rating'] = np.select(
+            [percentage_of_income <= 10, percentage_of_income <= 15, percentage_of_income <= 20],
+            ['Excellent', 'Good', 'Fair'], 'Stretched'
+        )
+
+        grid = pd.DataFrame(columns)
+        grid['analysis_years'] = grid['analysis_years'].astype(int)
+        return grid
+
+    @staticmethod
+    def pivot(grid: pd.DataFrame, index: str = 'annual_mileage', columns: str = 'analysis_years',
+              value: str = 'total_tco', **fixed: Any) -> pd.DataFrame:
+        """
+        Two-dimensional slice of an evaluated grid for display
+        Other dimensions are fixed by keyword (e.g. loan_term=5), or at their first value.
+        """
+        selection = grid
+        for dimension in GRID_DIMENSIONS:
+            if dimension in (index, columns):
+                continue
+            selected_value = fixed.get(dimension, selection[dimension].iloc[0])
+            selection = selection[selection[dimension] == selected_value]
+        return selection.pivot(index=index, columns=columns, values=value)
+
+# Test function
+def test_scenario_grid():
+    """Test scenario grid evaluation"""
+    import time
+
+    input_data = {
+        'make': 'Toyota', 'model': 'Camry', 'year': 2024, 'trim': 'LE', 'price': 28000,
+        'transaction_type': 'purchase', 'annual_mileage': 12000, 'analysis_years': 5,
+        'state': 'CA', 'zip_code': '90210', 'fuel_price': 4.50,
+        'loan_amount': 22000, 'interest_rate': 6.5, 'loan_term': 5
+    }
+
+    started = time.perf_counter()
+    scenario_grid = ScenarioGrid(input_data)
+    grid = scenario_grid.evaluate(loan_terms=[3, 4, 5, 6], down_payments=[0, 3000, 6000, 10000])
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print("=== SCENARIO GRID TEST ===")
+    print(f"{len(grid)} cells in {elapsed_ms:.1f} ms")
+    print(ScenarioGrid.pivot(grid, loan_term=5, down_payment=6000).round(0).iloc[:, :5])
+
+if __name__ == "__main__":
+    test_scenario_grid()
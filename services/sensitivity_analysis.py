@@ -0,0 +1,173 @@
+"""
+Sensitivity Analysis
+Tornado-chart data for a purchase TCO: moves each cost driver down and up by a
+configurable delta and reports the change in TCO, evaluating every perturbation
+on one shared VehicleCostProfile
+"""
+
+from typing import Dict, Any, List
+import copy
+import numpy as np
+
+from services.prediction_service import PredictionService
+from services.vehicle_cost_profile import VehicleCostProfile
+
+# Low/high perturbation per driver: 'relative' (fraction of the input value),
+# 'absolute' (same units as the input) or explicit 'values' [low, high].
+# 'min'/'max' bound the perturbed numeric values.
+DEFAULT_PERTURBATIONS = {
+    'fuel_price': {'relative': 0.20},
+    'electricity_rate': {'relative': 0.20},
+    'annual_mileage': {'relative': 0.25, 'min': 0},
+    'interest_rate': {'absolute': 1.0, 'min': 0},
+    'driver_age': {'absolute': 10, 'min': 16, 'max': 80},
+    'analysis_years': {'absolute': 2, 'min': 1},
+    'coverage_type': {'values': ['basic', 'premium']},
+    'charging_preference': {'values': ['home_primary', 'public_heavy']}
+}
+
+# Drivers evaluated together as arrays in one profile pass
+ARRAY_DRIVERS = ['fuel_price', 'electricity_rate', 'annual_mileage', 'interest_rate']
+
+SENSITIVITY_METRICS = ['total_tco', 'total_ownership_cost', 'average_annual_cost', 'cost_per_mile']
+
+class SensitivityAnalyzer:
+    """One-at-a-time driver sensitivity of purchase TCO"""
+
+    def __init__(self, prediction_service: PredictionService = None):
+        self.prediction_service = prediction_service or PredictionService()
+
+    def analyze(self, input_data: Dict[str, Any], perturbations: Dict[str, Any] = None,
+                metric: str = 'total_tco') -> Dict[str, Any]:
+        """
+        Impact of each driver's low and high value on `metric`, largest swing first
+        perturbations overrides DEFAULT_PERTURBATIONS per driver; None drops a driver.
+        Drivers the purchase calculation does not price for this vehicle (e.g. charging
+        preference on a gas vehicle) report zero impact. Shop type is not a driver:
+        purchase maintenance is priced from the service schedule alone.
+        """
+        if input_data.get('transaction_type', 'purchase').lower() == 'lease':
+            raise ValueError("Sensitivity analysis covers purchase scenarios")
+        if metric not in SENSITIVITY_METRICS:
+            raise ValueError(f"Unknown metric '{metric}' (expected one of: {', '.join(SENSITIVITY_METRICS)})")
+
+        profile = VehicleCostProfile(input_data, self.prediction_service)
+        base_inputs = profile.base_inputs
+        resolved = self._resolve_perturbations(perturbations)
+
+        variants = {
+            driver: get_perturbed_values(spec, base_inputs.get(driver))
+            for driver, spec in resolved.items()
+        }
+
+        base_value = float(profile.summarize(profile.evaluate())[metric])
+        values = self._evaluate_variants(profile, variants)
+
+        drivers = []
+        for driver, (low_input, high_input) in variants.items():
+            low_value, high_value = (float(value[metric]) for value in values[driver])
+            drivers.append({
+                'driver': driver,
+                'base_input': base_inputs.get(driver),
+                'low_input': low_input,
+                'high_input': high_input,
+                'low_value': low_value,
+                'high_value': high_value,
+                'low_impact': low_value - base_value,
+                'high_impact': high_value - base_value,
+                'swing': abs(high_value - low_value)
+            })
+
+        # Tornado order: widest bar on top
+        drivers.sort(key=lambda entry: -entry['swing'])
+
+        return {
+            'metric': metric,
+            'base_value': base_value,
+            'drivers': drivers
+        }
+
+    def _resolve_perturbations(self, perturbations: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Defaults with per-driver overrides applied"""
+
+        resolved = copy.deepcopy(DEFAULT_PERTURBATIONS)
+        for driver, spec in (perturbations or {}).items():
+            if driver not in resolved:
+                raise ValueError(f"Unknown driver '{driver}' (expected one of: {', '.join(resolved)})")
+            if spec is None:
+                del resolved[driver]
+            else:
+                resolved[driver] = spec
+        return resolved
+
+    def _evaluate_variants(self, profile: VehicleCostProfile,
+                           variants: Dict[str, List[Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Summaries for the low and high value of every driver"""
+
+        base = profile.base_inputs
+        values = {}
+
+        # Numeric engine inputs: one array pass, each row moving a single driver
+        array_drivers = [driver for driver in ARRAY_DRIVERS if driver in variants]
+        if array_drivers:
+            rows = len(array_drivers) * 2
+            arrays = {driver: np.full(rows, float(base[driver])) for driver in array_drivers}
+            for index, driver in enumerate(array_drivers):
+                arrays[driver][index * 2:index * 2 + 2] = variants[driver]
+            summary = profile.summarize(profile.evaluate(**arrays), annual_mileage=arrays.get('annual_mileage'))
+            for index, driver in enumerate(array_drivers):
+                values[driver] = [{metric: summary[metric][index * 2 + side] for metric in SENSITIVITY_METRICS}
+                                  for side in (0, 1)]
+
+        # Horizon: evaluate the longest one once and read both horizons from it
+        if 'analysis_years' in variants:
+            horizons = np.array([int(value) for value in variants['analysis_years']])
+            summary = profile.summarize(profile.evaluate(years=int(horizons.max())), years=horizons)
+            values['analysis_years'] = [{metric: summary[metric][side] for metric in SENSITIVITY_METRICS} for side in (0, 1)]
+
+        # Rating and charging choices are scalar profile inputs
+        for driver in ('driver_age', 'coverage_type', 'charging_preference'):
+            if driver in variants:
+                values[driver] = [profile.summarize(profile.evaluate(**{driver: value})) for value in variants[driver]]
+
+        return values
+
+def get_perturbed_values(spec: Dict[str, Any], base_value: Any) -> List[Any]:
+    """[low, high] for one driver"""
+
+    if 'values' in spec:
+        low, high = spec['values']
+        return [low, high]
+
+    if 'relative' in spec:
+        delta = base_value * spec['relative']
+    else:
+        delta = spec.get('absolute', 0)
+
+    bounds = (spec.get('min', -np.inf), spec.get('max', np.inf))
+    low, high = (min(max(value, bounds[0]), bounds[1]) for value in (base_value - delta, base_value + delta))
+    if isinstance(base_value, int) and not isinstance(delta, float):
+        return [int(low), int(high)]
+    return [float(low), float(high)]
+
+# Test function
+def test_sensitivity_analysis():
+    """Test tornado-chart sensitivity"""
+    analyzer = SensitivityAnalyzer()
+    input_data = {
+        'make': 'Toyota', 'model': 'Camry', 'year': 2024, 'trim': 'LE', 'price': 28000,
+        'transaction_type': 'purchase', 'annual_mileage': 12000, 'analysis_years': 5,
+        'state': 'CA', 'zip_code': '90210', 'fuel_price': 4.50, 'driver_age': 35,
+        'loan_amount': 22000, 'interest_rate': 6.5, 'loan_term': 5
+    }
+
+    results = analyzer.analyze(input_data)
+
+    print("=== SENSITIVITY ANALYSIS TEST ===")
+    print(f"Base TCO: ${results['base_value']:,.0f}")
+    for entry in results['drivers']:
+        print(f"  {entry['driver']:20} {entry['low_input']!s:>14} -> {entry['low_impact']:+10,.0f}   "
+              f"{entry['high_input']!s:>14} -> {entry['high_impact']:+10,.0f}")
+
+if __name__ == "__main__":
+    test_sensitivity_analysis()
@@ -0,0 +1,75 @@
+"""
+Shared Service Registry
+Builds the prediction and comparison services once per process and hands out
+read-only views of them, so callers stop rebuilding every model table per request
+"""
+
+from typing import Any, Callable, Dict
+import threading
+
+from services.tco_cache import CachedPredictionService, TCOResultCache
+from services.comparison_service import ComparisonService
+from services.results_store import ResultsStore
+
+class ReadOnlyService:
+    """
+    Read-only view of a shared service: methods work, attribute assignment is refused
+    The guard is shallow: objects reached through the view (models and their tables,
+    e.g. depreciation_model.brand_multipliers) are the shared instances and must not be mutated
+    """
+
+    def __init__(self, service: Any):
+        object.__setattr__(self, '_service', service)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(object.__getattribute__(self, '_service'), name)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"Shared {type(self._service).__name__} is read-only; cannot set '{name}'")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"Shared {type(self._service).__name__} is read-only; cannot delete '{name}'")
+
+    def __repr__(self) -> str:
+        return f"ReadOnlyService({self._service!r})"
+
+_registry_lock = threading.Lock()
+_shared_services: Dict[str, Any] = {}
+_shared_views: Dict[str, ReadOnlyService] = {}
+
+def _get_or_create(name: str, factory: Callable[[], Any]) -> ReadOnlyService:
+    """Create a shared service on first use; later calls return the same instance"""
+
+    view = _shared_views.get(name)
+    if view is None:
+        with _registry_lock:
+            view = _shared_views.get(name)
+            if view is None:
+                _shared_services[name] = factory()
+                view = ReadOnlyService(_shared_services[name])
+                _shared_views[name] = view
+    return view
+
+def get_tco_cache() -> TCOResultCache:
+    """Get the process-wide TCO result cache"""
+    return get_prediction_service().cache
+
+def get_prediction_service() -> ReadOnlyService:
+    """Get the shared (cached) PredictionService"""
+    return _get_or_create('prediction', lambda: CachedPredictionService(TCOResultCache(max_entries=512)))
+
+def get_comparison_service() -> ReadOnlyService:
+    """Get the shared ComparisonService, backed by the shared PredictionService"""
+    get_prediction_service()
+    return _get_or_create('comparison', lambda: ComparisonService(prediction_service=_shared_services['prediction']))
+
+def get_results_store() -> ReadOnlyService:
+    """Get the shared store of TCO results referenced from session state"""
+    return _get_or_create('results_store', lambda: ResultsStore(max_entries=2048))
+
+def reset_shared_services():
+    """Drop the shared instances (used after model table changes and in tests)"""
+
+    with _registry_lock:
+        _shared_services.clear()
+        _shared_views.clear()
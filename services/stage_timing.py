@@ -0,0 +1,180 @@
+"""
+Stage Timing
+Opt-in wall-time and call-count instrumentation for the stages of a TCO calculation
+"""
+
+from typing import Dict, Any, Callable, Optional
+from collections import defaultdict
+from contextlib import nullcontext
+import threading
+import time
+
+# Stages recorded by PredictionService, in calculation order
+TCO_STAGES = [
+    'vehicle_characteristics',
+    'regional_multiplier',
+    'depreciation',
+    'maintenance',
+    'financing',
+    'insurance',
+    'fuel_energy',
+    'lease_fees',
+    'affordability',
+    'result_reshaping'
+]
+
+# sink(stage_timings, context) receives one calculation's timings; context has
+# make, model, year, transaction_type and is_electric
+MetricsSink = Callable[[Dict[str, Dict[str, float]], Dict[str, Any]], None]
+
+class _StageContext:
+    """Times one `with timer.stage(name):` block"""
+
+    __slots__ = ('timer', 'name', 'started')
+
+    def __init__(self, timer: 'StageTimer', name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.timer.record(self.name, time.perf_counter() - self.started)
+        return False
+
+class StageTimer:
+    """Accumulates wall time and call counts per stage for one calculation"""
+
+    enabled = True
+
+    def __init__(self):
+        self.timings = {}
+        self.started = time.perf_counter()
+
+    def stage(self, name: str) -> _StageContext:
+        """Context manager timing one call of a stage"""
+        return _StageContext(self, name)
+
+    def record(self, name: str, seconds: float):
+        """Add one call of a stage"""
+
+        entry = self.timings.get(name)
+        if entry is None:
+            self.timings[name] = {'calls': 1, 'total_ms': seconds * 1000}
+        else:
+            entry['calls'] += 1
+            entry['total_ms'] += seconds * 1000
+
+    def get_timings(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage calls and total_ms in calculation order, plus untimed 'other' and wall-time 'total'"""
+
+        names = [name for name in TCO_STAGES if name in self.timings]
+        names += [name for name in self.timings if name not in TCO_STAGES]
+        ordered = {
+            name: {'calls': self.timings[name]['calls'], 'total_ms': round(self.timings[name]['total_ms'], 4)}
+            for name in names
+        }
+
+        # Wall time since the timer was created; 'other' is the part no stage covered
+        total_ms = (time.perf_counter() - self.started) * 1000
+        ordered['other'] = {'calls': 1, 'total_ms': round(max(total_ms - sum(entry['total_ms'] for entry in ordered.values()), 0), 4)}
+        ordered['total'] = {'calls': 1, 'total_ms': round(total_ms, 4)}
+        return ordered
+
+class NullStageTimer:
+    """Timer used when instrumentation is off; every stage is a shared no-op context"""
+
+    enabled = False
+
+    _null_context = nullcontext()
+
+    def stage(self, name: str):
+        return self._null_context
+
+    def record(self, name: str, seconds: float):
+        pass
+
+NULL_STAGE_TIMER = NullStageTimer()
+
+class StageTimingAggregator:
+    """
+    Metrics sink that aggregates stage timings by vehicle type
+    (e.g. 'purchase/gas', 'lease/electric') to show which model dominates latency
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = defaultdict(lambda: defaultdict(lambda: {'calls': 0, 'total_ms': 0.0}))
+        self._calculations = defaultdict(int)
+
+    def __call__(self, stage_timings: Dict[str, Dict[str, float]], context: Dict[str, Any]):
+        vehicle_type = get_vehicle_type(context)
+        with self._lock:
+            self._calculations[vehicle_type] += 1
+            for name, entry in stage_timings.items():
+                totals = self._totals[vehicle_type][name]
+                totals['calls'] += entry['calls']
+                totals['total_ms'] += entry['total_ms']
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per vehicle type: calculations, and per stage calls, total, mean per calculation and share"""
+
+        with self._lock:
+            report = {}
+            for vehicle_type, stages in self._totals.items():
+                calculations = self._calculations[vehicle_type]
+                total_ms = stages['total']['total_ms'] if 'total' in stages else 0
+                report[vehicle_type] = {
+                    'calculations': calculations,
+                    'stages': {
+                        name: {
+                            'calls': entry['calls'],
+                            'total_ms': round(entry['total_ms'], 3),
+                            'mean_ms_per_calculation': round(entry['total_ms'] / calculations, 4),
+                            'share': round(entry['total_ms'] / total_ms, 4) if total_ms else 0
+                        }
+                        for name, entry in sorted(stages.items(), key=lambda item: -item[1]['total_ms'])
+                        if name != 'total'
+                    },
+                    'mean_total_ms': round(total_ms / calculations, 4) if calculations else 0
+                }
+            return report
+
+    def get_dominant_stages(self) -> Dict[str, Optional[str]]:
+        """Slowest stage for each vehicle type"""
+        return {vehicle_type: next(iter(entry['stages']), None) for vehicle_type, entry in self.report().items()}
+
+    def reset(self):
+        """Drop aggregated timings"""
+
+        with self._lock:
+            self._totals.clear()
+            self._calculations.clear()
+
+def get_vehicle_type(context: Dict[str, Any]) -> str:
+    """Aggregation key for a calculation, e.g. 'purchase/electric'"""
+
+    transaction_type = str(context.get('transaction_type') or 'purchase').lower()
+    return f"{transaction_type}/{'electric' if context.get('is_electric') else 'gas'}"
+
+# Test function
+def test_stage_timing():
+    """Test stage timing and aggregation"""
+    timer = StageTimer()
+    for _ in range(5):
+        with timer.stage('insurance'):
+            time.sleep(0.001)
+    with timer.stage('depreciation'):
+        time.sleep(0.002)
+
+    aggregator = StageTimingAggregator()
+    aggregator(timer.get_timings(), {'transaction_type': 'purchase', 'is_electric': False})
+
+    print("=== STAGE TIMING TEST ===")
+    print(f"Timings: {timer.get_timings()}")
+    print(f"Dominant stages: {aggregator.get_dominant_stages()}")
+
+if __name__ == "__main__":
+    test_stage_timing()
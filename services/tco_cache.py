@@ -0,0 +1,247 @@
+"""
+TCO Result Cache
+Content-addressed cache for TCO results keyed on the canonical calculation inputs
+Bounded in-memory LRU with optional SQLite backing so results survive restarts
+"""
+
+from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from datetime import datetime
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+
+from services.prediction_service import PredictionService
+
+# Bump whenever a model change alters results, so stale cache entries are ignored
+TCO_ENGINE_VERSION = 1
+
+# Inputs read by both calculation paths
+COMMON_TCO_FIELDS = [
+    'make', 'model', 'year', 'trim', 'zip_code', 'state', 'transaction_type',
+    'is_electric', 'electricity_rate', 'charging_preference', 'fuel_price',
+    'driving_style', 'terrain', 'num_household_vehicles', 'gross_income', 'trim_msrp'
+]
+
+# Inputs read only by the purchase path
+PURCHASE_TCO_FIELDS = [
+    'price', 'analysis_years', 'current_mileage', 'annual_mileage',
+    'financing_enabled', 'financing_option', 'payment_method', 'financing_type',
+    'loan_amount', 'interest_rate', 'loan_term',
+    'driver_age', 'coverage_type'
+]
+
+# Inputs read only by the lease path
+LEASE_TCO_FIELDS = [
+    'lease_term', 'analysis_years', 'monthly_payment', 'down_payment',
+    'annual_mileage_limit', 'annual_mileage', 'purchase_price', 'user_age'
+]
+
+def _normalize_value(value: Any) -> Any:
+    """Normalize a value so equivalent inputs hash the same"""
+
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        # 12000 and 12000.0 give identical results
+        return int(value) if float(value).is_integer() else float(value)
+    if hasattr(value, 'item') and callable(value.item):
+        # NumPy scalars from DataFrame rows
+        return _normalize_value(value.item())
+    if isinstance(value, str):
+        return value.strip()
+    return str(value)
+
+def canonicalize_tco_inputs(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce calculator input to the fields the engine actually reads, normalized"""
+
+    transaction_type = str(input_data.get('transaction_type', 'purchase')).strip().lower()
+    fields = COMMON_TCO_FIELDS + (LEASE_TCO_FIELDS if transaction_type == 'lease' else PURCHASE_TCO_FIELDS)
+
+    canonical = {field: _normalize_value(input_data[field]) for field in fields if field in input_data}
+    canonical['transaction_type'] = 'lease' if transaction_type == 'lease' else 'purchase'
+
+    # Depreciation ages vehicles against the current calendar year
+    canonical['_valuation_year'] = datetime.now().year
+    canonical['_engine_version'] = TCO_ENGINE_VERSION
+
+    return canonical
+
+def compute_tco_cache_key(input_data: Dict[str, Any]) -> str:
+    """Stable hash of the canonical calculation inputs"""
+
+    canonical = canonicalize_tco_inputs(input_data)
+    payload = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def compute_results_hash(results: Any) -> str:
+    """Stable hash of a results structure, used to key derived views (charts, tables)"""
+
+    payload = json.dumps(results, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class TCOResultCache:
+    """Thread-safe bounded LRU of pickled TCO results with optional SQLite backing"""
+
+    def __init__(self, max_entries: int = 512, disk_path: str = None, max_disk_entries: int = 20000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.disk_path = disk_path
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+        if disk_path:
+            self._connection = sqlite3.connect(disk_path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS tco_results "
+                "(cache_key TEXT PRIMARY KEY, payload BLOB NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Get a fresh copy of cached results, or None"""
+
+        with self._lock:
+            payload = self._entries.get(cache_key)
+            if payload is not None:
+                self._entries.move_to_end(cache_key)
+                self.stats['hits'] += 1
+            elif self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT payload FROM tco_results WHERE cache_key = ?", (cache_key,)
+                ).fetchone()
+                if row is not None:
+                    payload = row[0]
+                    self._store_in_memory(cache_key, payload)
+                    self.stats['disk_hits'] += 1
+
+            if payload is None:
+                self.stats['misses'] += 1
+                return None
+
+        # Unpickling per hit hands every caller its own copy to mutate
+        return pickle.loads(payload)
+
+    def put(self, cache_key: str, results: Dict[str, Any]):
+        """Store results under a cache key"""
+
+        payload = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._store_in_memory(cache_key, payload)
+
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO tco_results (cache_key, payload, stored_at) VALUES (?, ?, ?)",
+                    (cache_key, payload, time.time())
+                )
+                self._prune_disk()
+                self._connection.commit()
+
+    def clear(self, include_disk: bool = False):
+        """Drop cached results from memory (and optionally disk)"""
+
+        with self._lock:
+            self._entries.clear()
+            if include_disk and self._connection is not None:
+                self._connection.execute("DELETE FROM tco_results")
+                self._connection.commit()
+
+    def close(self):
+        """Close the on-disk store"""
+
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _store_in_memory(self, cache_key: str, payload: bytes):
+        """Insert into the LRU and evict the oldest entries past the bound (lock held)"""
+
+        self._entries[cache_key] = payload
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _prune_disk(self):
+        """Keep the on-disk store within max_disk_entries (lock held)"""
+
+        count = self._connection.execute("SELECT COUNT(*) FROM tco_results").fetchone()[0]
+        if count > self.max_disk_entries:
+            self._connection.execute(
+                "DELETE FROM tco_results WHERE cache_key IN "
+                "(SELECT cache_key FROM tco_results ORDER BY stored_at ASC LIMIT ?)",
+                (count - self.max_disk_entries,)
+            )
+
+class CachedPredictionService(PredictionService):
+    """PredictionService that answers repeated configurations from a TCOResultCache"""
+
+    def __init__(self, cache: TCOResultCache = None):
+        super().__init__()
+        self.cache = cache if cache is not None else TCOResultCache()
+
+    def calculate_total_cost_of_ownership(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Calculate TCO, reusing results for inputs seen before"""
+
+        cache_key = compute_tco_cache_key(input_data)
+        results = self.cache.get(cache_key)
+        if results is None:
+            results = super().calculate_total_cost_of_ownership(input_data)
+            self.cache.put(cache_key, results)
+        return results
+
+    def calculate_batch_tco(self, input_batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Calculate a batch, only running the engine for uncached inputs"""
+
+        cache_keys = [compute_tco_cache_key(input_data) for input_data in input_batch]
+        batch_results = [self.cache.get(cache_key) for cache_key in cache_keys]
+
+        missing = [i for i, results in enumerate(batch_results) if results is None]
+        if missing:
+            computed = super().calculate_batch_tco([input_batch[i] for i in missing])
+            for i, results in zip(missing, computed):
+                batch_results[i] = results
+                if 'error' not in results:
+                    self.cache.put(cache_keys[i], results)
+
+        return batch_results
+
+# Test function
+def test_tco_cache():
+    """Test the TCO result cache"""
+    service = CachedPredictionService(TCOResultCache(max_entries=16))
+
+    vehicle = {
+        'make': 'Toyota', 'model': 'Camry', 'year': 2024, 'trim': 'LE', 'price': 28000,
+        'transaction_type': 'purchase', 'annual_mileage': 12000, 'analysis_years': 5,
+        'state': 'CA', 'zip_code': '90210', 'gross_income': 80000
+    }
+
+    start = time.perf_counter()
+    service.calculate_total_cost_of_ownership(vehicle)
+    first_run = time.perf_counter() - start
+
+    # Same configuration with irrelevant UI fields and a float mileage hits the cache
+    start = time.perf_counter()
+    service.calculate_total_cost_of_ownership(dict(vehicle, annual_mileage=12000.0, is_valid=True))
+    second_run = time.perf_counter() - start
+
+    print("=== TCO CACHE TEST ===")
+    print(f"Cache key: {compute_tco_cache_key(vehicle)[:16]}...")
+    print(f"First run: {first_run * 1000:.1f} ms, cached run: {second_run * 1000:.2f} ms")
+    print(f"Stats: {service.cache.stats}")
+
+if __name__ == "__main__":
+    test_tco_cache()
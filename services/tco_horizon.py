@@ -0,0 +1,171 @@
+"""
+Purchase TCO Horizon
+Resumable purchase TCO state: keeps the depreciation schedule, maintenance
+schedule, loan rows and annual breakdown of a calculation so the analysis
+horizon can be extended or shortened without recomputing earlier years
+"""
+
+from typing import Dict, Any, List
+
+from services.prediction_service import PredictionService
+from utils.zip_code_utils import get_regional_cost_multiplier
+
+class PurchaseTCOState:
+    """Purchase TCO that can move between analysis horizons incrementally"""
+
+    def __init__(self, input_data: Dict[str, Any], prediction_service: PredictionService = None,
+                 vehicle_characteristics: Dict[str, Any] = None, regional_multiplier: float = None,
+                 years: int = None):
+        if input_data.get('transaction_type', 'purchase').lower() == 'lease':
+            raise ValueError("Horizon states cover purchase scenarios")
+
+        self.prediction_service = prediction_service or PredictionService()
+        self.input_data = dict(input_data)
+        if vehicle_characteristics is None:
+            vehicle_characteristics = self.prediction_service._get_cached_characteristics(input_data)
+        if regional_multiplier is None:
+            regional_multiplier = get_regional_cost_multiplier(input_data.get('zip_code', ''), input_data.get('state', ''))
+        self.vehicle_characteristics = vehicle_characteristics
+        self.regional_multiplier = regional_multiplier
+
+        self.purchase_price = input_data.get('price', input_data.get('trim_msrp', 30000))
+        self.current_mileage = input_data.get('current_mileage', 0)
+
+        # Loan rows do not depend on the horizon: build them once for the whole term
+        self.full_financing_schedule = self.prediction_service._get_purchase_financing_schedule(
+            input_data, self.purchase_price, max(int(input_data.get('loan_term', 5)), 1)
+        )
+
+        self.depreciation_schedule = []
+        self.maintenance_schedule = []
+        self.annual_breakdown = []
+
+        self.extend(input_data.get('analysis_years', 5) if years is None else years)
+
+    @property
+    def years(self) -> int:
+        """Current analysis horizon"""
+        return len(self.annual_breakdown)
+
+    def extend(self, years: int = 1) -> 'PurchaseTCOState':
+        """Add `years` ownership years after the current horizon"""
+
+        if years < 0:
+            raise ValueError("Cannot extend by a negative number of years")
+        if years == 0:
+            return self
+
+        first_year = self.years + 1
+        service = self.prediction_service
+        input_data = self.input_data
+
+        self.depreciation_schedule.extend(service.depreciation_model.calculate_depreciation_schedule(
+            self.purchase_price,
+            input_data['make'],
+            input_data['model'],
+            input_data['year'],
+            input_data['annual_mileage'],
+            years,
+            first_year=first_year
+        ))
+        self.maintenance_schedule.extend(service.maintenance_calculator.get_maintenance_schedule(
+            annual_mileage=input_data['annual_mileage'],
+            years=years,
+            starting_mileage=self.current_mileage,
+            vehicle_make=input_data['make'],
+            driving_style=input_data.get('driving_style', 'normal'),
+            vehicle_model=input_data['model'],
+            first_year=first_year
+        ))
+
+        for year in range(first_year, first_year + years):
+            self.annual_breakdown.append(service._calculate_purchase_year(
+                input_data, self.vehicle_characteristics, self.regional_multiplier, year,
+                self.depreciation_schedule, self.maintenance_schedule, self.full_financing_schedule
+            ))
+        return self
+
+    def truncate(self, years: int) -> 'PurchaseTCOState':
+        """Shorten the horizon to `years`, keeping the earlier years as computed"""
+
+        if years < 1:
+            raise ValueError("analysis_years must be at least 1")
+        del self.depreciation_schedule[years:]
+        del self.maintenance_schedule[years:]
+        del self.annual_breakdown[years:]
+        return self
+
+    def set_horizon(self, years: int) -> 'PurchaseTCOState':
+        """Extend or truncate to exactly `years`"""
+
+        if years > self.years:
+            return self.extend(years - self.years)
+        return self.truncate(years)
+
+    def get_financing_schedule(self) -> List[Dict[str, Any]]:
+        """Loan rows within the current horizon (None for a cash purchase)"""
+
+        if self.full_financing_schedule is None:
+            return None
+        return self.full_financing_schedule[:self.years]
+
+    def get_results(self) -> Dict[str, Any]:
+        """Results as PredictionService.calculate_total_cost_of_ownership returns them for this horizon"""
+
+        input_data = dict(self.input_data, analysis_years=self.years)
+        return self.prediction_service._build_purchase_results(
+            input_data, self.vehicle_characteristics, list(self.annual_breakdown),
+            list(self.depreciation_schedule), list(self.maintenance_schedule), self.get_financing_schedule()
+        )
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Position at the end of the current horizon"""
+
+        financing_schedule = self.get_financing_schedule()
+        loan_balance = financing_schedule[-1]['remaining_balance'] if financing_schedule else 0
+
+        services_performed = {}
+        for year_schedule in self.maintenance_schedule:
+            for service in year_schedule.get('services', []):
+                name = service['service']
+                services_performed[name] = services_performed.get(name, 0) + service.get('frequency', 1)
+
+        category_totals = dict.fromkeys(['depreciation', 'maintenance', 'insurance', 'fuel_energy', 'financing'], 0)
+        for breakdown in self.annual_breakdown:
+            for category in category_totals:
+                category_totals[category] += breakdown[category]
+
+        return {
+            'years': self.years,
+            'vehicle_value': self.depreciation_schedule[-1]['vehicle_value'] if self.depreciation_schedule else self.purchase_price,
+            'cumulative_mileage': self.current_mileage + self.input_data['annual_mileage'] * self.years,
+            'loan_balance': loan_balance,
+            'services_performed': services_performed,
+            'category_totals': category_totals
+        }
+
+# Test function
+def test_tco_horizon():
+    """Test incremental horizon changes"""
+    import time
+
+    service = PredictionService()
+    input_data = {
+        'make': 'Toyota', 'model': 'Camry', 'year': 2024, 'trim': 'LE', 'price': 28000,
+        'transaction_type': 'purchase', 'annual_mileage': 12000, 'analysis_years': 5,
+        'state': 'CA', 'zip_code': '90210', 'fuel_price': 4.50,
+        'loan_amount': 22000, 'interest_rate': 6.5, 'loan_term': 5
+    }
+
+    state = PurchaseTCOState(input_data, service)
+    print("=== TCO HORIZON TEST ===")
+    for years in (5, 10, 3, 15, 7):
+        started = time.perf_counter()
+        results = state.set_horizon(years).get_results()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        snapshot = state.get_snapshot()
+        print(f"{years:2} years: TCO ${results['summary']['total_tco']:,.0f} in {elapsed_ms:.2f} ms; "
+              f"value ${snapshot['vehicle_value']:,.0f}, loan ${snapshot['loan_balance']:,.0f}")
+
+if __name__ == "__main__":
+    test_tco_horizon()
@@ -0,0 +1,361 @@
+"""
+Vehicle Cost Profile
+Precomputes everything about one vehicle and driver profile that does not change
+between what-if evaluations (characteristics, depreciation curve, service plan,
+rating factors) and evaluates the purchase TCO categories over NumPy arrays of
+inputs, reproducing PredictionService._calculate_purchase_tco
+"""
+
+from typing import Dict, Any
+from datetime import datetime
+import numpy as np
+
+from services.prediction_service import PredictionService
+from utils.zip_code_utils import get_regional_cost_multiplier
+
+# Purchase TCO categories, in PredictionService order
+PURCHASE_CATEGORIES = ['depreciation', 'maintenance', 'insurance', 'fuel_energy', 'financing']
+
+# Categories paid out of pocket (everything except depreciation)
+OUT_OF_POCKET_CATEGORIES = ['maintenance', 'insurance', 'fuel_energy', 'financing']
+
+class VehicleCostProfile:
+    """Invariant cost inputs for one vehicle and driver, evaluated over arrays of what-if inputs"""
+
+    def __init__(self, input_data: Dict[str, Any], prediction_service: PredictionService = None,
+                 vehicle_characteristics: Dict[str, Any] = None, regional_multiplier: float = None):
+        self.prediction_service = prediction_service or PredictionService()
+        self.input_data = input_data
+
+        if vehicle_characteristics is None:
+            vehicle_characteristics = self.prediction_service._get_cached_characteristics(input_data)
+        if regional_multiplier is None:
+            regional_multiplier = get_regional_cost_multiplier(input_data.get('zip_code', ''), input_data.get('state', ''))
+        self.vehicle_characteristics = vehicle_characteristics
+        self.regional_multiplier = regional_multiplier
+
+        self.make = input_data['make']
+        self.model = input_data['model']
+        self.year = input_data['year']
+        self.base_inputs = get_base_inputs(input_data)
+
+        self._prepare_depreciation()
+        self._prepare_maintenance()
+        self._prepare_insurance()
+        self._prepare_fuel()
+
+    def _prepare_depreciation(self):
+        """Segment, brand retention and cap; cumulative rates are filled in on demand"""
+
+        model = self.prediction_service.depreciation_model
+        self.segment = model._classify_vehicle_segment(self.make, self.model)
+        self.depreciation_brand_multiplier = model._apply_model_specific_adjustments(
+            self.make, self.model, model.brand_multipliers.get(self.make, 1.0)
+        )
+        self.depreciation_cap = model.max_depreciation.get(self.segment, 0.85)
+        self.vehicle_age_at_start = datetime.now().year - self.year
+        self._cumulative_rates = np.zeros(0)
+
+    def _prepare_maintenance(self):
+        """Applicable services with their intervals, costs and wear thresholds"""
+
+        calculator = self.prediction_service.maintenance_calculator
+        services = calculator.get_applicable_services(self.make, self.model)
+
+        self.services = services
+        self.service_intervals = np.array([calculator.get_service_interval(s, self.make) for s in services], dtype=float)
+        self.service_costs = np.array([calculator.service_costs.get(s, 50) for s in services], dtype=float)
+        self.service_wear_thresholds = np.array([calculator.wear_thresholds.get(s, 0) for s in services], dtype=float)
+        self.service_age_replaced = np.array([s == 'battery_replacement' for s in services])
+
+    def _prepare_insurance(self):
+        """Rating factors that do not depend on the driver or the yearly vehicle value"""
+
+        calculator = self.prediction_service.insurance_calculator
+        self.insurance_base_premium = calculator.state_base_rates.get(self.input_data['state'], 1300)
+        self.insurance_age_adjustment = max(0.7, 1.0 - ((2024 - self.year) * 0.03))
+        self.insurance_brand_multiplier = calculator._get_brand_multiplier(self.make)
+
+        self._value_bracket_bounds = [(low, high) for low, high, _ in calculator.vehicle_value_brackets]
+        self._value_bracket_multipliers = [multiplier for _, _, multiplier in calculator.vehicle_value_brackets]
+        self._mileage_bracket_bounds = list(calculator.mileage_multipliers.keys())
+        self._mileage_bracket_multipliers = list(calculator.mileage_multipliers.values())
+
+    def _prepare_fuel(self):
+        """Adjusted MPG, or kWh per 100 miles for EVs"""
+
+        self.is_electric = bool(self.input_data.get('is_electric') or self.vehicle_characteristics.get('is_electric', False))
+        driving_style = self.base_inputs['driving_style']
+        terrain = self.base_inputs['terrain']
+
+        if self.is_electric:
+            calculator = self.prediction_service.ev_calculator
+            combined_multiplier = (calculator.driving_style_multipliers.get(driving_style, 1.0) *
+                                   calculator.terrain_multipliers.get(terrain, 1.0))
+            self.ev_efficiency = calculator.estimate_ev_efficiency(self.make, self.model, self.year) / combined_multiplier
+            self._electricity_cost_per_mile = {}
+        else:
+            calculator = self.prediction_service.fuel_calculator
+            self.mpg = self.vehicle_characteristics.get('mpg', 25)
+            adjusted_mpg = self.mpg * calculator.driving_style_multipliers.get(driving_style, 1.0)
+            adjusted_mpg *= calculator.terrain_multipliers.get(terrain, 1.0)
+            self.adjusted_mpg = adjusted_mpg
+
+    def get_cumulative_rates(self, years: int) -> np.ndarray:
+        """Cumulative depreciation rate from MSRP at the end of each ownership year"""
+
+        if len(self._cumulative_rates) < years:
+            model = self.prediction_service.depreciation_model
+            self._cumulative_rates = np.array([
+                model._get_cumulative_depreciation_rate(self.vehicle_age_at_start + year, self.segment)
+                for year in range(1, years + 1)
+            ])
+        return self._cumulative_rates[:years]
+
+    def get_mileage_multiplier(self, annual_mileage: Any) -> np.ndarray:
+        """Depreciation mileage impact for each annual mileage"""
+
+        model = self.prediction_service.depreciation_model
+        return np.interp(annual_mileage, model.mileage_impact_miles, model.mileage_impact_multipliers)
+
+    def get_electricity_cost_per_mile(self, charging_preference: str) -> float:
+        """Charging cost per mile at an electricity rate of $1/kWh"""
+
+        if charging_preference not in self._electricity_cost_per_mile:
+            self._electricity_cost_per_mile[charging_preference] = self.prediction_service.ev_calculator.calculate_annual_electricity_cost(
+                annual_mileage=100, vehicle_efficiency=self.ev_efficiency,
+                electricity_rate=1.0, charging_preference=charging_preference
+            ) / 100
+        return self._electricity_cost_per_mile[charging_preference]
+
+    def evaluate(self, years: int = None, annual_mileage: Any = None, purchase_price: Any = None,
+                 current_mileage: Any = None, fuel_price: Any = None, electricity_rate: Any = None,
+                 interest_rate: Any = None, loan_amount: Any = None, loan_term: Any = None,
+                 depreciation_multiplier: Any = 1.0, driver_age: float = None, coverage_type: str = None,
+                 charging_preference: str = None) -> Dict[str, np.ndarray]:
+        """
+        Per-year purchase costs for every combination of the array inputs
+        Array inputs broadcast against each other; omitted ones take the profile's
+        input values. Returns arrays shaped (*broadcast shape, years) for each
+        category and 'vehicle_value'. depreciation_multiplier scales the depreciation
+        rate before the segment cap.
+        """
+        base = self.base_inputs
+        years = years or base['analysis_years']
+
+        def as_array(value, default):
+            return np.asarray(default if value is None else value, dtype=float)
+
+        annual_mileage = as_array(annual_mileage, base['annual_mileage'])
+        purchase_price = as_array(purchase_price, base['purchase_price'])
+        current_mileage = as_array(current_mileage, base['current_mileage'])
+        fuel_price = as_array(fuel_price, base['fuel_price'])
+        electricity_rate = as_array(electricity_rate, base['electricity_rate'])
+        interest_rate = as_array(interest_rate, base['interest_rate'])
+        loan_amount = as_array(loan_amount, base['loan_amount'])
+        loan_term = as_array(loan_term, base['loan_term'])
+        depreciation_multiplier = as_array(depreciation_multiplier, 1.0)
+
+        shape = np.broadcast_shapes(
+            annual_mileage.shape, purchase_price.shape, current_mileage.shape, fuel_price.shape,
+            electricity_rate.shape, interest_rate.shape, loan_amount.shape, loan_term.shape,
+            depreciation_multiplier.shape
+        ) + (years,)
+        year_numbers = np.arange(1, years + 1)
+
+        # Depreciation: value at the end of each year from the capped cumulative rate
+        adjusted_rates = (self.get_cumulative_rates(years) * self.depreciation_brand_multiplier
+                          * self.get_mileage_multiplier(annual_mileage)[..., None] * depreciation_multiplier[..., None])
+        vehicle_value = purchase_price[..., None] * (1 - np.minimum(adjusted_rates, self.depreciation_cap))
+        previous_value = np.concatenate(
+            [np.broadcast_to(purchase_price[..., None], vehicle_value.shape[:-1] + (1,)), vehicle_value[..., :-1]], axis=-1
+        )
+        depreciation = previous_value - vehicle_value
+
+        maintenance = self.evaluate_maintenance(annual_mileage, years, current_mileage)
+        insurance = self.evaluate_insurance(vehicle_value, annual_mileage, driver_age, coverage_type)
+
+        # Fuel/energy is the same every year
+        annual_fuel = self.evaluate_fuel(annual_mileage, fuel_price, electricity_rate, charging_preference)
+
+        # Financing: level annual payments for the loan term (no schedule without a positive rate)
+        monthly_rate = interest_rate / 100 / 12
+        total_months = loan_term * 12
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = (1 + monthly_rate) ** total_months
+            monthly_payment = np.where(monthly_rate > 0, loan_amount * (monthly_rate * growth) / (growth - 1), 0.0)
+        financed = (loan_amount > 0) & (interest_rate > 0)
+        financing = np.where(
+            financed[..., None] & (year_numbers <= loan_term[..., None]), (monthly_payment * 12)[..., None], 0.0
+        )
+
+        return {
+            'depreciation': np.broadcast_to(depreciation, shape),
+            'maintenance': np.broadcast_to(maintenance, shape),
+            'insurance': np.broadcast_to(insurance, shape),
+            'fuel_energy': np.broadcast_to(annual_fuel[..., None], shape),
+            'financing': np.broadcast_to(financing, shape),
+            'vehicle_value': np.broadcast_to(vehicle_value, shape)
+        }
+
+    def evaluate_fuel(self, annual_mileage: Any, fuel_price: Any = None, electricity_rate: Any = None,
+                      charging_preference: str = None) -> np.ndarray:
+        """Annual fuel or charging cost, as FuelCostCalculator / EVCostCalculator"""
+
+        base = self.base_inputs
+        annual_mileage = np.asarray(annual_mileage, dtype=float)
+
+        if self.is_electric:
+            electricity_rate = np.asarray(base['electricity_rate'] if electricity_rate is None else electricity_rate, dtype=float)
+            cost_per_mile = self.get_electricity_cost_per_mile(charging_preference or base['charging_preference'])
+            return np.where(annual_mileage > 0, annual_mileage * cost_per_mile * electricity_rate, 0.0)
+        if self.mpg <= 0:
+            return np.zeros_like(annual_mileage)
+        fuel_price = np.asarray(base['fuel_price'] if fuel_price is None else fuel_price, dtype=float)
+        return np.where(annual_mileage > 0, annual_mileage / self.adjusted_mpg * fuel_price, 0.0)
+
+    def evaluate_maintenance(self, annual_mileage: Any, years: int, current_mileage: Any = 0) -> np.ndarray:
+        """Scheduled maintenance cost per year, as MaintenanceCalculator.get_maintenance_schedule"""
+
+        annual_mileage = np.asarray(annual_mileage, dtype=float)
+        current_mileage = np.asarray(current_mileage, dtype=float)
+        year_numbers = np.arange(0, years + 1)
+
+        # Odometer at the end of each year (index 0 = start) and services due by then
+        odometer = current_mileage[..., None] + annual_mileage[..., None] * year_numbers
+        services_due = np.floor(odometer[..., None] / self.service_intervals)
+        services_this_year = np.diff(services_due, axis=-2)
+
+        # Wear components are only replaced past their mileage (or, for batteries, age) threshold
+        needed = ((odometer[..., 1:, None] >= self.service_wear_thresholds)
+                  | (self.service_age_replaced & (year_numbers[1:, None] >= 4)))
+        return (services_this_year * needed) @ self.service_costs
+
+    def evaluate_insurance(self, vehicle_value: np.ndarray, annual_mileage: Any,
+                           driver_age: float = None, coverage_type: str = None) -> np.ndarray:
+        """Annual premium on each year's vehicle value, as AdvancedInsuranceCalculator.calculate_annual_premium"""
+
+        calculator = self.prediction_service.insurance_calculator
+        base = self.base_inputs
+        annual_mileage = np.asarray(annual_mileage, dtype=float)
+
+        age_multiplier = calculator._get_age_multiplier(base['driver_age'] if driver_age is None else driver_age)
+        coverage_multiplier = calculator.coverage_multipliers.get(coverage_type or base['coverage_type'], 1.0)
+        num_vehicles = base['num_household_vehicles']
+        multi_vehicle_discount = calculator.multi_vehicle_discounts.get(
+            min(num_vehicles, 5), calculator.multi_vehicle_discounts[5]
+        )
+
+        value_multiplier = np.select(
+            [(low <= vehicle_value) & (vehicle_value < high) for low, high in self._value_bracket_bounds],
+            self._value_bracket_multipliers, 1.0
+        )
+        mileage_multiplier = np.select(
+            [(low <= annual_mileage) & (annual_mileage < high) for low, high in self._mileage_bracket_bounds],
+            self._mileage_bracket_multipliers, 1.35
+        )
+
+        return (
+            self.insurance_base_premium *
+            age_multiplier *
+            coverage_multiplier *
+            value_multiplier *
+            self.insurance_age_adjustment *
+            self.insurance_brand_multiplier *
+            mileage_multiplier[..., None] *
+            multi_vehicle_discount *
+            self.regional_multiplier
+        )
+
+    def summarize(self, annual_costs: Dict[str, np.ndarray], years: Any = None,
+                  annual_mileage: Any = None) -> Dict[str, np.ndarray]:
+        """
+        Summary metrics at a horizon (default: every evaluated year is included)
+        years may be an array broadcasting against the cost arrays' leading shape.
+        """
+        base = self.base_inputs
+        evaluated_years = annual_costs['depreciation'].shape[-1]
+        years = np.asarray(evaluated_years if years is None else years)
+        annual_mileage = np.asarray(base['annual_mileage'] if annual_mileage is None else annual_mileage, dtype=float)
+        leading_shape = np.broadcast_shapes(annual_costs['depreciation'].shape[:-1], years.shape)
+        horizon_index = np.broadcast_to((years - 1)[..., None], leading_shape + (1,))
+
+        def value_at_horizon(values):
+            values = np.broadcast_to(values, leading_shape + values.shape[-1:])
+            return np.take_along_axis(values, horizon_index, axis=-1)[..., 0]
+
+        category_totals = {
+            category: value_at_horizon(np.cumsum(annual_costs[category], axis=-1)) for category in PURCHASE_CATEGORIES
+        }
+        total_tco = sum(category_totals[category] for category in PURCHASE_CATEGORIES)
+        out_of_pocket_total = sum(category_totals[category] for category in OUT_OF_POCKET_CATEGORIES)
+        total_miles = annual_mileage * years
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cost_per_mile = np.where(total_miles > 0, out_of_pocket_total / total_miles, 0.0)
+
+        return {
+            'total_tco': total_tco,
+            'total_ownership_cost': out_of_pocket_total,
+            'average_annual_cost': out_of_pocket_total / years,
+            'cost_per_mile': cost_per_mile,
+            'final_vehicle_value': value_at_horizon(annual_costs['vehicle_value']),
+            'category_totals': category_totals
+        }
+
+def get_base_inputs(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Engine inputs with the defaults _calculate_purchase_tco applies"""
+
+    purchase_price = input_data.get('price', input_data.get('trim_msrp', 30000))
+    is_financed = (
+        input_data.get('financing_enabled', False) or
+        input_data.get('financing_option') == 'finance' or
+        input_data.get('payment_method') == 'loan' or
+        input_data.get('financing_type') == 'loan' or
+        input_data.get('loan_amount', 0) > 0
+    )
+
+    return {
+        'purchase_price': purchase_price,
+        'analysis_years': input_data.get('analysis_years', 5),
+        'annual_mileage': input_data['annual_mileage'],
+        'current_mileage': input_data.get('current_mileage', 0),
+        'loan_amount': input_data.get('loan_amount', purchase_price * 0.8) if is_financed else 0,
+        'interest_rate': input_data.get('interest_rate', 5.0),
+        'loan_term': input_data.get('loan_term', 5),
+        'driver_age': input_data.get('driver_age', 35),
+        'coverage_type': input_data.get('coverage_type', 'comprehensive'),
+        'num_household_vehicles': input_data.get('num_household_vehicles', 2),
+        'fuel_price': input_data.get('fuel_price', 3.50),
+        'electricity_rate': input_data.get('electricity_rate', 0.12),
+        'charging_preference': input_data.get('charging_preference', 'mixed'),
+        'driving_style': input_data.get('driving_style', 'normal'),
+        'terrain': input_data.get('terrain', 'flat'),
+        'gross_income': input_data.get('gross_income', 60000)
+    }
+
+# Test function
+def test_vehicle_cost_profile():
+    """Check the vectorized profile against the engine"""
+    service = PredictionService()
+    input_data = {
+        'make': 'Toyota', 'model': 'Camry', 'year': 2024, 'trim': 'LE', 'price': 28000,
+        'transaction_type': 'purchase', 'annual_mileage': 12000, 'analysis_years': 5,
+        'state': 'CA', 'zip_code': '90210', 'fuel_price': 4.50,
+        'loan_amount': 22000, 'interest_rate': 6.5, 'loan_term': 5
+    }
+
+    profile = VehicleCostProfile(input_data, service)
+    summary = profile.summarize(profile.evaluate())
+    engine = service.calculate_total_cost_of_ownership(input_data)
+
+    print("=== VEHICLE COST PROFILE TEST ===")
+    print(f"Engine TCO: ${engine['summary']['total_tco']:,.2f}")
+    print(f"Profile TCO: ${float(summary['total_tco']):,.2f}")
+
+    sweep = profile.summarize(profile.evaluate(annual_mileage=[8000, 12000, 20000]),
+                              annual_mileage=[8000, 12000, 20000])
+    print(f"TCO at 8k/12k/20k miles: {', '.join(f'${value:,.0f}' for value in sweep['total_tco'])}")
+
+if __name__ == "__main__":
+    test_vehicle_cost_profile()
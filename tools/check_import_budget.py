@@ -0,0 +1,164 @@
+"""
+Import Budget Check
+Imports each calculation-core module in a fresh interpreter and fails if it pulls
+in a UI package (Streamlit, Plotly) or takes longer than its import-time budget
+
+Usage:
+    python tools/check_import_budget.py
+    python tools/check_import_budget.py --budget-ms 500 --json
+"""
+
+from typing import Dict, Any, List, Tuple
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that backend processes (batch runner, API server) may import
+CORE_MODULES = [
+    'models.depreciation.enhanced_depreciation',
+    'models.maintenance.maintenance_utils',
+    'models.insurance.advanced_insurance',
+    'models.fuel.fuel_utils',
+    'models.fuel.electric_vehicle_utils',
+    'data.vehicle_database',
+    'data.vehicle_mpg_database',
+    'utils.zip_code_utils',
+    'utils.used_vehicle_estimator',
+    'utils.log_config',
+    'services.financial_analysis',
+    'services.prediction_service',
+    'services.recommendation_engine',
+    'services.comparison_service',
+    'services.catalog_search_service',
+    'services.incremental_comparison',
+    'services.tco_cache',
+    'services.results_store',
+    'services.stage_timing',
+    'services.vehicle_cost_profile',
+    'services.tco_simulation',
+    'services.sensitivity_analysis',
+    'services.scenario_grid',
+    'services.holding_period',
+    'services.tco_horizon',
+    'services.lease_engine',
+    'services.lease_buy_crossover',
+    'services.service_registry',
+    'batch_runner',
+    'api_server'
+]
+
+# Packages the core must never import
+FORBIDDEN_PACKAGES = ['streamlit', 'plotly']
+
+# Default cumulative import budget per module (fresh interpreter, milliseconds)
+DEFAULT_BUDGET_MS = 1000
+
+# Per-module overrides for modules with known heavy but legitimate dependencies
+MODULE_BUDGETS_MS = {}
+
+def parse_importtime(stderr: str) -> List[Tuple[int, int, str]]:
+    """Parse `python -X importtime` output into (cumulative_us, depth, module) rows"""
+
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((int(cumulative.strip()), depth, name.strip()))
+    return rows
+
+def find_import_chain(rows: List[Tuple[int, int, str]], index: int) -> List[str]:
+    """Chain of importers leading to rows[index], outermost first"""
+
+    # importtime lists children before their parent, one indent level deeper
+    chain = [rows[index][2]]
+    depth = rows[index][1]
+    for _, row_depth, name in rows[index + 1:]:
+        if row_depth < depth:
+            chain.append(name)
+            depth = row_depth
+            if depth == 0:
+                break
+    return list(reversed(chain))
+
+def measure_module(module: str) -> Dict[str, Any]:
+    """Import one module in a fresh interpreter and report time and forbidden imports"""
+
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    rows = parse_importtime(completed.stderr)
+
+    if completed.returncode != 0:
+        return {'module': module, 'error': completed.stderr.strip().splitlines()[-1] if completed.stderr else 'import failed'}
+
+    cumulative_us = next((cumulative for cumulative, depth, name in rows if name == module and depth == 0), 0)
+
+    forbidden = []
+    for index, (_, _, name) in enumerate(rows):
+        if name.split('.')[0] in FORBIDDEN_PACKAGES and '.' not in name:
+            forbidden.append(' -> '.join(find_import_chain(rows, index)))
+
+    return {
+        'module': module,
+        'import_ms': cumulative_us / 1000,
+        'forbidden_imports': forbidden
+    }
+
+def check_import_budget(modules: List[str] = None, budget_ms: float = DEFAULT_BUDGET_MS) -> Dict[str, Any]:
+    """Measure every core module and collect budget violations"""
+
+    report = {'budget_ms': budget_ms, 'modules': [], 'violations': []}
+
+    for module in modules or CORE_MODULES:
+        result = measure_module(module)
+        module_budget = MODULE_BUDGETS_MS.get(module, budget_ms)
+        result['budget_ms'] = module_budget
+        report['modules'].append(result)
+
+        if 'error' in result:
+            report['violations'].append(f"{module}: import failed ({result['error']})")
+            continue
+        for chain in result['forbidden_imports']:
+            report['violations'].append(f"{module}: imports UI package via {chain}")
+        if result['import_ms'] > module_budget:
+            report['violations'].append(
+                f"{module}: import took {result['import_ms']:.0f} ms (budget {module_budget:.0f} ms)"
+            )
+
+    return report
+
+def main(argv: List[str] = None) -> int:
+    """Command-line entry point; exits 1 when any module is over budget"""
+
+    parser = argparse.ArgumentParser(description="Check that the calculation core imports fast and without UI packages")
+    parser.add_argument('modules', nargs='*', help="Modules to check (default: the calculation core)")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help="Per-module import budget in ms")
+    parser.add_argument('--json', action='store_true', help="Print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    report = check_import_budget(args.modules or None, args.budget_ms)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for result in report['modules']:
+            if 'error' in result:
+                print(f"  FAIL  {result['module']}: {result['error']}")
+                continue
+            status = 'ok' if not result['forbidden_imports'] and result['import_ms'] <= result['budget_ms'] else 'FAIL'
+            print(f"  {status:4}  {result['import_ms']:8.1f} ms  {result['module']}")
+        for violation in report['violations']:
+            print(f"Violation: {violation}")
+        print(f"{len(report['modules'])} modules checked, {len(report['violations'])} violations")
+
+    return 1 if report['violations'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+Import Profiler
+Imports the app's entry point in fresh interpreters and reports, per module, the
+wall time and resident memory its import added, flagging project modules that
+do heavy work at import time
+
+Usage:
+    python tools/profile_imports.py                  # main.py -> ui.* -> services.* -> data.*
+    python tools/profile_imports.py services.prediction_service --repeat 5
+    python tools/profile_imports.py --json --history benchmarks/results/import_history.json
+"""
+
+from typing import Dict, Any, List
+from collections import defaultdict
+from datetime import datetime, timezone
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Project modules whose own import work exceeds either limit are flagged
+DEFAULT_HEAVY_MS = 10.0
+DEFAULT_HEAVY_RSS_KB = 2048
+
+# Runs in the child interpreter before anything else is imported. Every loader
+# instance gets a timing exec_module; built-in/frozen (class) loaders are skipped.
+CHILD_SCRIPT = r'''
+import importlib, json, os, sys, time
+
+def rss_kb():
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == 'darwin' else peak
+
+records, stack = [], []
+
+def wrap_loader(name, loader):
+    original = loader.exec_module
+
+    def exec_module(module):
+        started, rss_before = time.perf_counter(), rss_kb()
+        stack.append([0.0, 0])
+        try:
+            original(module)
+        finally:
+            child_ms, child_rss = stack.pop()
+            inclusive_ms = (time.perf_counter() - started) * 1000
+            rss_delta = rss_kb() - rss_before
+            records.append({
+                'module': name, 'file': getattr(module, '__file__', None),
+                'parent_depth': len(stack), 'inclusive_ms': inclusive_ms,
+                'self_ms': inclusive_ms - child_ms, 'rss_kb': rss_delta, 'self_rss_kb': rss_delta - child_rss
+            })
+            if stack:
+                stack[-1][0] += inclusive_ms
+                stack[-1][1] += rss_delta
+
+    loader.exec_module = exec_module
+
+class ProfilingFinder:
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                loader = spec.loader
+                if loader is not None and not isinstance(loader, type) and hasattr(loader, 'exec_module'):
+                    wrap_loader(name, loader)
+                return spec
+        return None
+
+output_path, entries = sys.argv[1], sys.argv[2:]
+sys.path.insert(0, os.getcwd())
+rss_start = rss_kb()
+sys.meta_path.insert(0, ProfilingFinder())
+started = time.perf_counter()
+for entry in entries:
+    importlib.import_module(entry)
+total_ms = (time.perf_counter() - started) * 1000
+
+with open(output_path, 'w') as handle:
+    json.dump({'records': records, 'total_ms': total_ms, 'rss_start_kb': rss_start, 'rss_end_kb': rss_kb()}, handle)
+'''
+
+def profile_once(entries: List[str]) -> Dict[str, Any]:
+    """Import the entries in one fresh interpreter and return its raw measurements"""
+
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as handle:
+        output_path = handle.name
+    try:
+        completed = subprocess.run(
+            [sys.executable, '-c', CHILD_SCRIPT, output_path] + entries,
+            cwd=PROJECT_ROOT, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else 'import failed')
+        with open(output_path, 'r', encoding='utf-8') as handle:
+            return json.load(handle)
+    finally:
+        os.unlink(output_path)
+
+def is_project_module(record: Dict[str, Any]) -> bool:
+    """Whether a module's file lives in this repository"""
+
+    module_file = record.get('file')
+    return bool(module_file) and os.path.abspath(module_file).startswith(PROJECT_ROOT + os.sep)
+
+def has_stale_bytecode(module_file: str) -> bool:
+    """Whether a source module has no up-to-date .pyc, so every cold start recompiles it"""
+
+    if not module_file or not module_file.endswith('.py'):
+        return False
+    try:
+        cached = importlib.util.cache_from_source(module_file)
+        return not os.path.exists(cached) or os.path.getmtime(cached) < os.path.getmtime(module_file)
+    except (NotImplementedError, OSError, ValueError):
+        return False
+
+def profile_imports(entries: List[str], repeat: int = 3, heavy_ms: float = DEFAULT_HEAVY_MS,
+                    heavy_rss_kb: int = DEFAULT_HEAVY_RSS_KB) -> Dict[str, Any]:
+    """Median per-module import time and memory over `repeat` fresh interpreters"""
+
+    runs = [profile_once(entries) for _ in range(repeat)]
+
+    samples = defaultdict(lambda: defaultdict(list))
+    files = {}
+    for run in runs:
+        for record in run['records']:
+            files[record['module']] = record['file']
+            for field in ('inclusive_ms', 'self_ms', 'rss_kb', 'self_rss_kb'):
+                samples[record['module']][field].append(record[field])
+
+    modules = []
+    for module, fields in samples.items():
+        entry = {'module': module, 'file': files[module]}
+        entry.update({field: round(statistics.median(values), 3) for field, values in fields.items()})
+        entry['project'] = is_project_module(entry)
+        modules.append(entry)
+    modules.sort(key=lambda entry: -entry['self_ms'])
+
+    # Third-party and stdlib cost grouped by top-level package
+    packages = defaultdict(lambda: {'self_ms': 0.0, 'self_rss_kb': 0, 'modules': 0})
+    for entry in modules:
+        if not entry['project']:
+            package = packages[entry['module'].split('.')[0]]
+            package['self_ms'] += entry['self_ms']
+            package['self_rss_kb'] += entry['self_rss_kb']
+            package['modules'] += 1
+
+    flagged = [
+        entry for entry in modules
+        if entry['project'] and (entry['self_ms'] >= heavy_ms or entry['self_rss_kb'] >= heavy_rss_kb)
+    ]
+
+    return {
+        'entries': entries,
+        'repeat': repeat,
+        'total_ms': round(statistics.median(run['total_ms'] for run in runs), 3),
+        'rss_start_mb': round(statistics.median(run['rss_start_kb'] for run in runs) / 1024, 2),
+        'rss_end_mb': round(statistics.median(run['rss_end_kb'] for run in runs) / 1024, 2),
+        'project_self_ms': round(sum(entry['self_ms'] for entry in modules if entry['project']), 3),
+        'modules': modules,
+        'packages': dict(sorted(
+            ((name, {key: round(value, 3) for key, value in package.items()}) for name, package in packages.items()),
+            key=lambda item: -item[1]['self_ms']
+        )),
+        'flagged': [entry['module'] for entry in flagged],
+        'stale_bytecode': [entry['module'] for entry in modules if entry['project'] and has_stale_bytecode(entry['file'])],
+        'thresholds': {'heavy_ms': heavy_ms, 'heavy_rss_kb': heavy_rss_kb}
+    }
+
+def append_history(path: str, report: Dict[str, Any]):
+    """Track the headline numbers across runs"""
+
+    from tools.run_benchmarks import get_environment, load_history, save_history
+
+    history = load_history(path)
+    history.append({
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': get_environment(),
+        'entries': report['entries'],
+        'total_ms': report['total_ms'],
+        'project_self_ms': report['project_self_ms'],
+        'rss_end_mb': report['rss_end_mb'],
+        'flagged': report['flagged'],
+        'stale_bytecode': report['stale_bytecode']
+    })
+    save_history(path, history)
+
+def print_report(report: Dict[str, Any], top: int):
+    """Human-readable breakdown"""
+
+    print(f"Import of {', '.join(report['entries'])} (median of {report['repeat']} fresh interpreters)")
+    print(f"  Total import time: {report['total_ms']:.1f} ms "
+          f"(project modules' own work: {report['project_self_ms']:.1f} ms)")
+    print(f"  Resident memory: {report['rss_start_mb']:.1f} MB -> {report['rss_end_mb']:.1f} MB")
+
+    print(f"\nProject modules by own import time (top {top}):")
+    print(f"  {'self ms':>9} {'incl ms':>9} {'self KB':>9}  module")
+    for entry in [entry for entry in report['modules'] if entry['project']][:top]:
+        flag = '  <- heavy import-time work' if entry['module'] in report['flagged'] else ''
+        if entry['module'] in report['stale_bytecode']:
+            flag += ' (recompiled from source: stale .pyc)'
+        print(f"  {entry['self_ms']:9.2f} {entry['inclusive_ms']:9.2f} {int(entry['self_rss_kb']):9d}  {entry['module']}{flag}")
+
+    print(f"\nDependencies by own import time (top {top}):")
+    print(f"  {'self ms':>9} {'self KB':>9} {'modules':>8}  package")
+    for name, package in list(report['packages'].items())[:top]:
+        print(f"  {package['self_ms']:9.2f} {int(package['self_rss_kb']):9d} {package['modules']:8d}  {name}")
+
+    print(f"\n{len(report['flagged'])} project modules flagged "
+          f"(>= {report['thresholds']['heavy_ms']:g} ms or >= {report['thresholds']['heavy_rss_kb']} KB of their own)")
+    if report['stale_bytecode']:
+        print(f"{len(report['stale_bytecode'])} project modules have no up-to-date bytecode and are compiled on "
+              f"every cold start; ship images with `python -m compileall .` run after the last code change")
+
+def main(argv: List[str] = None) -> int:
+    """Command-line entry point"""
+
+    parser = argparse.ArgumentParser(description="Per-module import time and memory for the app's import graph")
+    parser.add_argument('entries', nargs='*', default=['main'], help="Modules to import (default: main)")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters to take the median over (default: 3)")
+    parser.add_argument('--top', type=int, default=15, help="Rows per table (default: 15)")
+    parser.add_argument('--heavy-ms', type=float, default=DEFAULT_HEAVY_MS, help="Own import time flagged as heavy")
+    parser.add_argument('--heavy-rss-kb', type=int, default=DEFAULT_HEAVY_RSS_KB, help="Own memory flagged as heavy")
+    parser.add_argument('--history', help="Append the headline numbers to this JSON history file")
+    parser.add_argument('--json', action='store_true', help="Print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    report = profile_imports(args.entries, args.repeat, args.heavy_ms, args.heavy_rss_kb)
+    if args.history:
+        append_history(args.history, report)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.top)
+    return 0
+
+if __name__ == "__main__":
+    # Allow `from tools.run_benchmarks import ...` when run as a script
+    sys.path.insert(0, PROJECT_ROOT)
+    sys.exit(main())
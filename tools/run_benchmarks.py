@@ -0,0 +1,258 @@
+"""
+Benchmark Runner
+Runs the asv-style suite in benchmarks/benchmarks.py offline (stdlib only),
+appends the run to a JSON history and flags regressions against the previous
+run on the same machine
+
+Usage:
+    python tools/run_benchmarks.py
+    python tools/run_benchmarks.py --filter Comparison --quick
+    python tools/run_benchmarks.py --fail-on-regression --threshold 1.25
+"""
+
+from typing import Dict, Any, List, Callable, Optional, Tuple
+from datetime import datetime, timezone
+import argparse
+import importlib.util
+import inspect
+import itertools
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import timeit
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_FILE = os.path.join(PROJECT_ROOT, 'benchmarks', 'benchmarks.py')
+DEFAULT_HISTORY_PATH = os.path.join(PROJECT_ROOT, 'benchmarks', 'results', 'history.json')
+
+# A benchmark this much slower (median) than the previous run is a regression
+DEFAULT_REGRESSION_THRESHOLD = 1.2
+
+def load_benchmark_module(path: str = BENCHMARK_FILE):
+    """Import the benchmark definitions from their file"""
+
+    spec = importlib.util.spec_from_file_location('tco_benchmarks', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def discover_benchmarks(module) -> List[Tuple[str, Callable[[], Callable], Optional[str]]]:
+    """
+    List (name, make_callable, raw_code) for every benchmark in the module
+    make_callable runs setup and returns the timed zero-argument callable;
+    timeraw_* benchmarks have raw_code instead.
+    """
+    benchmarks = []
+
+    for class_name, suite in inspect.getmembers(module, inspect.isclass):
+        if suite.__module__ != module.__name__:
+            continue
+        params = getattr(suite, 'params', None)
+        combinations = list(itertools.product(*params)) if params else [()]
+
+        for method_name in sorted(name for name in vars(suite) if name.startswith('time_')):
+            for combination in combinations:
+                label = f"{class_name}.{method_name}"
+                if combination:
+                    label += f"({', '.join(str(value) for value in combination)})"
+                benchmarks.append((label, _make_suite_callable(suite, method_name, combination), None))
+
+    for function_name, function in inspect.getmembers(module, inspect.isfunction):
+        if function_name.startswith('timeraw_') and function.__module__ == module.__name__:
+            benchmarks.append((function_name, None, function()))
+
+    return benchmarks
+
+def _make_suite_callable(suite, method_name: str, combination: tuple) -> Callable[[], Callable]:
+    """Deferred setup for one suite method and parameter combination"""
+
+    def make_callable():
+        instance = suite()
+        if hasattr(instance, 'setup'):
+            instance.setup(*combination)
+        method = getattr(instance, method_name)
+        return lambda: method(*combination)
+
+    return make_callable
+
+def time_callable(function: Callable, repeats: int, min_time: float) -> Dict[str, Any]:
+    """Time a callable: calibrate calls per sample to min_time, then take `repeats` samples"""
+
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    samples = [elapsed / number for elapsed in timer.repeat(repeat=repeats, number=number)]
+    return _summarize_samples(samples, number)
+
+def time_raw_code(code: str, repeats: int) -> Dict[str, Any]:
+    """Time code in a fresh interpreter per sample (cold imports)"""
+
+    script = (
+        "import time\n"
+        "_started = time.perf_counter()\n"
+        f"exec({code!r})\n"
+        "print(time.perf_counter() - _started)\n"
+    )
+    samples = []
+    for _ in range(repeats):
+        completed = subprocess.run([sys.executable, '-c', script], cwd=PROJECT_ROOT,
+                                   capture_output=True, text=True, check=True)
+        samples.append(float(completed.stdout.strip().splitlines()[-1]))
+    return _summarize_samples(samples, 1)
+
+def _summarize_samples(samples: List[float], number: int) -> Dict[str, Any]:
+    """Per-call statistics in milliseconds"""
+
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 5),
+        'min_ms': round(min(samples) * 1000, 5),
+        'stdev_ms': round(statistics.stdev(samples) * 1000, 5) if len(samples) > 1 else 0.0,
+        'repeats': len(samples),
+        'number': number
+    }
+
+def get_environment() -> Dict[str, Any]:
+    """Machine and code version the run was taken on"""
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'machine': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'commit': commit
+    }
+
+def run_benchmarks(name_filter: str = None, repeats: int = 7, min_time: float = 0.2,
+                   raw_repeats: int = 5, mode: str = 'full') -> Dict[str, Any]:
+    """Run every (matching) benchmark and return the run record"""
+
+    module = load_benchmark_module()
+    pattern = re.compile(name_filter) if name_filter else None
+
+    run = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'mode': mode,
+        'environment': get_environment(),
+        'results': {}
+    }
+
+    for name, make_callable, raw_code in discover_benchmarks(module):
+        if pattern and not pattern.search(name):
+            continue
+        try:
+            if raw_code is not None:
+                run['results'][name] = time_raw_code(raw_code, raw_repeats)
+            else:
+                run['results'][name] = time_callable(make_callable(), repeats, min_time)
+        except Exception as e:
+            run['results'][name] = {'error': str(e)}
+        print(f"  {name:55} {_format_result(run['results'][name])}", file=sys.stderr)
+
+    return run
+
+def _format_result(result: Dict[str, Any]) -> str:
+    """One-line result for progress output"""
+
+    if 'error' in result:
+        return f"ERROR {result['error']}"
+    return f"{result['median_ms']:10.4f} ms  (min {result['min_ms']:.4f}, ±{result['stdev_ms']:.4f})"
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    """Previous runs, oldest first"""
+
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as handle:
+        return json.load(handle)
+
+def save_history(path: str, history: List[Dict[str, Any]]):
+    """Write the run history"""
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(history, handle, indent=1)
+
+def compare_runs(previous: Dict[str, Any], current: Dict[str, Any],
+                 threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """Median ratio per benchmark present in both runs; ratio > threshold is a regression"""
+
+    comparisons = []
+    for name, result in current['results'].items():
+        before = previous['results'].get(name)
+        if not before or 'error' in before or 'error' in result or not before['median_ms']:
+            continue
+        ratio = result['median_ms'] / before['median_ms']
+        comparisons.append({
+            'name': name,
+            'before_ms': before['median_ms'],
+            'after_ms': result['median_ms'],
+            'ratio': round(ratio, 3),
+            'regression': ratio > threshold
+        })
+    return comparisons
+
+def find_previous_run(history: List[Dict[str, Any]], current: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Latest run from the same machine and mode (timings do not compare across either)"""
+
+    for run in reversed(history):
+        if (run['environment'].get('machine') == current['environment']['machine']
+                and run.get('mode') == current['mode']):
+            return run
+    return None
+
+def main(argv: List[str] = None) -> int:
+    """Command-line entry point; exits 1 on regressions when --fail-on-regression is set"""
+
+    parser = argparse.ArgumentParser(description="Run the TCO benchmark suite and track results over time")
+    parser.add_argument('--filter', help="Only run benchmarks whose name matches this regex")
+    parser.add_argument('--quick', action='store_true', help="Fewer, shorter samples (for smoke runs)")
+    parser.add_argument('--history', default=DEFAULT_HISTORY_PATH, help="JSON history file")
+    parser.add_argument('--no-save', action='store_true', help="Do not append this run to the history")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="Median slowdown ratio counted as a regression (default: 1.2)")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit 1 when any benchmark regressed")
+    parser.add_argument('--json', action='store_true', help="Print the run and comparison as JSON")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        run = run_benchmarks(args.filter, repeats=3, min_time=0.05, raw_repeats=2, mode='quick')
+    else:
+        run = run_benchmarks(args.filter)
+
+    history = load_history(args.history)
+    previous = find_previous_run(history, run)
+    comparisons = compare_runs(previous, run, args.threshold) if previous else []
+    regressions = [comparison for comparison in comparisons if comparison['regression']]
+
+    if not args.no_save:
+        history.append(run)
+        save_history(args.history, history)
+
+    if args.json:
+        print(json.dumps({'run': run, 'comparison': comparisons}, indent=2))
+    else:
+        if previous:
+            print(f"Compared with {previous['timestamp']} (commit {previous['environment'].get('commit')}):")
+            for comparison in comparisons:
+                flag = 'REGRESSION' if comparison['regression'] else ''
+                print(f"  {comparison['name']:55} {comparison['before_ms']:10.4f} -> "
+                      f"{comparison['after_ms']:10.4f} ms  x{comparison['ratio']:.2f} {flag}")
+        else:
+            print(f"No previous {run['mode']} run on this machine to compare with")
+        print(f"{len(run['results'])} benchmarks, {len(regressions)} regressions"
+              f"{'' if args.no_save else f', saved to {args.history}'}")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
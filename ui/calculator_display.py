@@ -10,11 +10,15 @@ Enhanced Calculator Display with ALL Requested Features + Detailed Maintenance B
 """
 
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
 from typing import Dict, Any, List
 import pandas as pd
 
+from services.tco_cache import compute_results_hash
+from ui.figure_factory import get_figure_factory
+from utils.log_config import get_logger
+
+logger = get_logger(__name__)
+
 # Import with fallback handling
 try:
     from ui.input_forms import collect_all_form_data, display_all_forms_visible
@@ -1044,6 +1048,21 @@ def display_calculator():
     
     st.markdown("---")
     
+    # Inputs and results are separate fragments: editing a field only reruns the
+    # forms, and switching result tabs only reruns the results
+    display_calculator_inputs()
+    
+    # Display results if calculation is complete (uses existing function)
+    if st.session_state.get('calculation_complete', False) and 'current_results' in st.session_state:
+        st.markdown("---")
+        st.markdown("---")
+        
+        display_calculator_results()
+
+@st.fragment
+def display_calculator_inputs():
+    """Input forms, calculate button and add-to-comparison, rerun as one fragment"""
+    
     # Collect all form data - SINGLE CALL ONLY
     from ui.input_forms import display_all_forms_visible
     all_data, is_valid, validation_message = display_all_forms_visible()
@@ -1058,17 +1077,20 @@ def display_calculator():
             if st.button("🚀 Calculate Total Cost of Ownership", type="primary", use_container_width=True):
                 with st.spinner("🔄 Calculating comprehensive TCO analysis..."):
                     try:
-                        # Initialize prediction service
-                        from services.prediction_service import PredictionService
-                        prediction_service = PredictionService()
+                        # Shared prediction service (built once per process)
+                        from ui.shared_services import get_shared_prediction_service
+                        prediction_service = get_shared_prediction_service()
                         
                         # Calculate TCO using existing service
                         results = prediction_service.calculate_total_cost_of_ownership(all_data)
                         
                         # Store in session state
                         st.session_state.current_results = results
+                        st.session_state.current_results_hash = compute_results_hash(results)
                         st.session_state.current_vehicle = all_data
                         st.session_state.calculation_complete = True
+                        st.session_state.pop('tco_horizon_state', None)
+                        st.session_state.pop('analysis_horizon_slider', None)
                         
                         st.success("✅ Calculation complete! Results displayed below.")
                         st.rerun()
@@ -1091,52 +1113,31 @@ def display_calculator():
                 
                 if st.button("➕ Add to Comparison", type="secondary", use_container_width=True, key="add_to_comparison_main"):
                     try:
-                        # Initialize comparison list if needed
-                        if 'comparison_vehicles' not in st.session_state:
-                            st.session_state.comparison_vehicles = []
+                        # Stores the results once in the shared results store; the
+                        # comparison list keeps a reference and summary metrics
+                        from utils.session_manager import add_vehicle_to_comparison
                         
                         # Use the calculated vehicle data from session state
-                        vehicle_data_to_add = st.session_state.current_vehicle.copy()
-                        
-                        # Check for duplicates
-                        make = vehicle_data_to_add.get('make', '')
-                        model = vehicle_data_to_add.get('model', '')
-                        year = vehicle_data_to_add.get('year', '')
-                        trim = vehicle_data_to_add.get('trim', '')
-                        transaction_type = vehicle_data_to_add.get('transaction_type', '')
-                        
-                        vehicle_exists = any(
-                            existing.get('make') == make and 
-                            existing.get('model') == model and 
-                            existing.get('year') == year and 
-                            existing.get('trim') == trim and
-                            existing.get('transaction_type') == transaction_type
-                            for existing in st.session_state.comparison_vehicles
+                        vehicle_data_to_add = st.session_state.current_vehicle
+                        success, message = add_vehicle_to_comparison(
+                            vehicle_data_to_add, st.session_state.current_results
                         )
                         
-                        if not vehicle_exists:
-                            # Check maximum limit
-                            max_vehicles = 5
-                            if len(st.session_state.comparison_vehicles) >= max_vehicles:
-                                st.error(f"❌ Maximum of {max_vehicles} vehicles allowed in comparison.")
-                            else:
-                                # Add vehicle to comparison (with results)
-                                vehicle_entry = {
-                                    'data': vehicle_data_to_add,
-                                    'results': st.session_state.current_results,
-                                    'name': f"{year} {make} {model} {trim}"
-                                }
-                                st.session_state.comparison_vehicles.append(vehicle_entry)
-                                vehicle_count = len(st.session_state.comparison_vehicles)
-                                
-                                st.success(f"✅ Added {year} {make} {model} {trim} to comparison!")
-                                st.balloons()
-                                st.info(f"📊 Comparison list now has {vehicle_count} vehicle(s). Go to 'Multi-Vehicle Comparison' to compare.")
-                                
-                                # Show quick link to comparison
-                                st.markdown("👉 **Go to Multi-Vehicle Comparison in the sidebar to see your comparison**")
+                        if success:
+                            year = vehicle_data_to_add.get('year', '')
+                            make = vehicle_data_to_add.get('make', '')
+                            model = vehicle_data_to_add.get('model', '')
+                            trim = vehicle_data_to_add.get('trim', '')
+                            vehicle_count = len(st.session_state.comparison_vehicles)
+                            
+                            st.success(f"✅ Added {year} {make} {model} {trim} to comparison!")
+                            st.balloons()
+                            st.info(f"📊 Comparison list now has {vehicle_count} vehicle(s). Go to 'Multi-Vehicle Comparison' to compare.")
+                            
+                            # Show quick link to comparison
+                            st.markdown("👉 **Go to Multi-Vehicle Comparison in the sidebar to see your comparison**")
                         else:
-                            st.warning("⚠️ This exact vehicle configuration is already in your comparison list!")
+                            st.warning(f"⚠️ {message}")
                             
                     except Exception as e:
                         st.error(f"❌ Error adding to comparison: {str(e)}")
@@ -1146,14 +1147,47 @@ def display_calculator():
         else:
             st.warning(f"⚠️ {validation_message}")
             st.info("💡 Please complete all required fields above to proceed with calculation")
+
+@st.fragment
+def display_calculator_results():
+    """Result tabs for the current calculation, rerun as one fragment"""
     
-    # Display results if calculation is complete (uses existing function)
-    if st.session_state.get('calculation_complete', False) and 'current_results' in st.session_state:
-        st.markdown("---")
-        st.markdown("---")
-        
-        # Use existing results display function
-        display_detailed_results_with_maintenance()
+    display_analysis_horizon_control()
+    
+    # Use existing results display function
+    display_detailed_results_with_maintenance()
+
+def display_analysis_horizon_control():
+    """Analysis-years slider that moves the current purchase calculation to a new horizon incrementally"""
+    
+    vehicle_data = st.session_state.get('current_vehicle') or {}
+    if str(vehicle_data.get('transaction_type', 'Purchase')).lower() == 'lease':
+        return
+    
+    current_years = int(vehicle_data.get('analysis_years', 5))
+    horizon = st.slider(
+        "Analysis horizon (years)", min_value=1, max_value=15, value=current_years,
+        key='analysis_horizon_slider',
+        help="Extends or shortens the analysis from the years already calculated"
+    )
+    if horizon == current_years:
+        return
+    
+    try:
+        # Built on the first horizon change, then reused until the next calculation
+        horizon_state = st.session_state.get('tco_horizon_state')
+        if horizon_state is None:
+            from ui.shared_services import get_shared_prediction_service
+            horizon_state = get_shared_prediction_service().create_purchase_horizon(vehicle_data)
+            st.session_state.tco_horizon_state = horizon_state
+        results = horizon_state.set_horizon(horizon).get_results()
+    except Exception as e:
+        st.error(f"❌ Could not change the analysis horizon: {str(e)}")
+        return
+    
+    st.session_state.current_results = results
+    st.session_state.current_results_hash = compute_results_hash(results)
+    st.session_state.current_vehicle = dict(vehicle_data, analysis_years=horizon)
 
 def display_enhanced_basic_calculator():
     """Enhanced calculator with simplified form but missing some advanced services"""
@@ -1283,8 +1317,8 @@ def calculate_enhanced_tco(make: str, model: str, year: int, price: float, annua
         }
         
         # FIXED: USE PredictionService TO ACTUALLY CALCULATE THE RESULTS
-        from services.prediction_service import PredictionService
-        prediction_service = PredictionService()
+        from ui.shared_services import get_shared_prediction_service
+        prediction_service = get_shared_prediction_service()
         # Calculate full TCO with enhanced features
         raw_results = prediction_service.calculate_total_cost_of_ownership(enhanced_form_data)  
      
@@ -1353,13 +1387,17 @@ def display_full_featured_calculator():
         if st.button("🧮 Calculate Enhanced TCO", type="primary", use_container_width=True):
             try:
                 with st.spinner('🔄 Calculating comprehensive TCO analysis...'):
-                    prediction_service = PredictionService()
+                    from ui.shared_services import get_shared_prediction_service
+                    prediction_service = get_shared_prediction_service()
                     results = prediction_service.calculate_total_cost_of_ownership(form_data)
                     
                     # Store results in session state
                     st.session_state.current_results = results
+                    st.session_state.current_results_hash = compute_results_hash(results)
                     st.session_state.current_vehicle = form_data
                     st.session_state.calculation_complete = True
+                    st.session_state.pop('tco_horizon_state', None)
+                    st.session_state.pop('analysis_horizon_slider', None)
                     
                     st.success("✅ Calculation Complete! Results displayed below.")
                     st.rerun()
@@ -1382,52 +1420,31 @@ def display_full_featured_calculator():
                 
                 if st.button("➕ Add to Comparison", type="secondary", use_container_width=True, key="add_to_comparison_main"):
                     try:
-                        # Initialize comparison list if needed
-                        if 'comparison_vehicles' not in st.session_state:
-                            st.session_state.comparison_vehicles = []
+                        # Stores the results once in the shared results store; the
+                        # comparison list keeps a reference and summary metrics
+                        from utils.session_manager import add_vehicle_to_comparison
                         
                         # Use the calculated vehicle data from session state
-                        vehicle_data_to_add = st.session_state.current_vehicle.copy()
-                        
-                        # Check for duplicates
-                        make = vehicle_data_to_add.get('make', '')
-                        model = vehicle_data_to_add.get('model', '')
-                        year = vehicle_data_to_add.get('year', '')
-                        trim = vehicle_data_to_add.get('trim', '')
-                        transaction_type = vehicle_data_to_add.get('transaction_type', '')
-                        
-                        vehicle_exists = any(
-                            existing.get('make') == make and 
-                            existing.get('model') == model and 
-                            existing.get('year') == year and 
-                            existing.get('trim') == trim and
-                            existing.get('transaction_type') == transaction_type
-                            for existing in st.session_state.comparison_vehicles
+                        vehicle_data_to_add = st.session_state.current_vehicle
+                        success, message = add_vehicle_to_comparison(
+                            vehicle_data_to_add, st.session_state.current_results
                         )
                         
-                        if not vehicle_exists:
-                            # Check maximum limit
-                            max_vehicles = 5
-                            if len(st.session_state.comparison_vehicles) >= max_vehicles:
-                                st.error(f"❌ Maximum of {max_vehicles} vehicles allowed in comparison.")
-                            else:
-                                # Add vehicle to comparison (with results)
-                                vehicle_entry = {
-                                    'data': vehicle_data_to_add,
-                                    'results': st.session_state.current_results,
-                                    'name': f"{year} {make} {model} {trim}"
-                                }
-                                st.session_state.comparison_vehicles.append(vehicle_entry)
-                                vehicle_count = len(st.session_state.comparison_vehicles)
-                                
-                                st.success(f"✅ Added {year} {make} {model} {trim} to comparison!")
-                                st.balloons()
-                                st.info(f"📊 Comparison list now has {vehicle_count} vehicle(s). Go to 'Multi-Vehicle Comparison' to compare.")
-                                
-                                # Show quick link to comparison
-                                st.markdown("👉 **Go to Multi-Vehicle Comparison in the sidebar to see your comparison**")
+                        if success:
+                            year = vehicle_data_to_add.get('year', '')
+                            make = vehicle_data_to_add.get('make', '')
+                            model = vehicle_data_to_add.get('model', '')
+                            trim = vehicle_data_to_add.get('trim', '')
+                            vehicle_count = len(st.session_state.comparison_vehicles)
+                            
+                            st.success(f"✅ Added {year} {make} {model} {trim} to comparison!")
+                            st.balloons()
+                            st.info(f"📊 Comparison list now has {vehicle_count} vehicle(s). Go to 'Multi-Vehicle Comparison' to compare.")
+                            
+                            # Show quick link to comparison
+                            st.markdown("👉 **Go to Multi-Vehicle Comparison in the sidebar to see your comparison**")
                         else:
-                            st.warning("⚠️ This exact vehicle configuration is already in your comparison list!")
+                            st.warning(f"⚠️ {message}")
                             
                     except Exception as e:
                         st.error(f"❌ Error adding to comparison: {str(e)}")
@@ -1605,62 +1622,35 @@ def display_summary_tab(results: Dict[str, Any], vehicle_data: Dict[str, Any]):
                     f"${category_totals[category]:,.0f}"
                 )
 
+def get_results_hash(results: Dict[str, Any]) -> str:
+    """Content hash of a results dict, reusing the one stored with the current calculation"""
+    
+    if results is st.session_state.get('current_results') and st.session_state.get('current_results_hash'):
+        return st.session_state.current_results_hash
+    return compute_results_hash(results)
+
 def display_visualizations(results: Dict[str, Any], vehicle_data: Dict[str, Any]):
     """Display charts and visualizations"""
     
     st.subheader("📊 Cost Visualizations")
     
+    # Figures are built once per results hash and shared across reruns and sessions
+    results_hash = get_results_hash(results)
+    figure_factory = get_figure_factory()
+    
     # Annual costs over time
     breakdown_data = results.get('annual_breakdown', [])
     if breakdown_data:
-        df = pd.DataFrame(breakdown_data)
-        
-        # Line chart of annual costs
-        fig_line = go.Figure()
-        
-        cost_categories = [col for col in df.columns if col not in ['ownership_year', 'year_of_ownership', 'vehicle_age', 'vehicle_model_year', 'total_mileage', 'total_annual_operating_cost', 'total_annual_cost_with_depreciation']]
-        colors = px.colors.qualitative.Set3
-        
-        for i, category in enumerate(cost_categories):
-            if category in df.columns:
-                fig_line.add_trace(go.Scatter(
-                x=df['ownership_year'] if 'ownership_year' in df.columns else list(range(1, len(df)+1)),
-                y=df[category],
-                mode='lines+markers',
-                name=category.replace('_', ' ').title(),
-                line=dict(color=colors[i % len(colors)], width=2),
-                marker=dict(size=6)
-                ))
-        
-        fig_line.update_layout(
-            title="Annual Costs by Category",
-            xaxis_title="Calendar Year",
-            yaxis_title="Annual Cost ($)",
-            height=400,
-            hovermode='x unified'
-        )
-        
-        # FIXED: Add unique suffix using timestamp or counter to prevent duplicate keys
-        import time
-        unique_suffix = str(int(time.time() * 1000))  # millisecond timestamp
-        st.plotly_chart(fig_line, use_container_width=True, key=f"viz_line_chart_{unique_suffix}")
+        fig_line = figure_factory.get_figure_spec(results_hash, 'annual_costs', breakdown_data)
+        st.plotly_chart(fig_line, use_container_width=True,
+                        key=figure_factory.get_chart_key(results_hash, 'annual_costs'))
         
         # Pie chart of total costs by category
         category_totals = results.get('category_totals', {})
         if category_totals:
-            fig_pie = go.Figure(data=[go.Pie(
-                labels=[cat.replace('_', ' ').title() for cat in category_totals.keys()],
-                values=list(category_totals.values()),
-                hole=0.3
-            )])
-            
-            fig_pie.update_layout(
-                title="Total Cost Distribution",
-                height=400
-            )
-            
-            # FIXED: Add unique suffix to pie chart key as well
-            st.plotly_chart(fig_pie, use_container_width=True, key=f"viz_pie_chart_{unique_suffix}")
+            fig_pie = figure_factory.get_figure_spec(results_hash, 'cost_distribution', category_totals)
+            st.plotly_chart(fig_pie, use_container_width=True,
+                            key=figure_factory.get_chart_key(results_hash, 'cost_distribution'))
 
 def display_cost_breakdown(results: Dict[str, Any], vehicle_data: Dict[str, Any]):
     """Display detailed cost breakdown - OPERATING COSTS ONLY with 15-year maximum bound"""
@@ -1682,20 +1672,16 @@ def display_cost_breakdown(results: Dict[str, Any], vehicle_data: Dict[str, Any]
         # Limit the breakdown data to the bounded window
         bounded_breakdown = annual_breakdown[:max_years]
         
-        st.write(f"Debug: Starting mileage = {current_mileage:,}, Annual mileage = {annual_mileage:,}")
-        st.write(f"Debug: Analysis period bounded to {max_years} years (max 15)")
+        logger.debug("Starting mileage = %s, Annual mileage = %s", current_mileage, annual_mileage)
+        logger.debug("Analysis period bounded to %s years (max 15)", max_years)
         
         # Create detailed breakdown table
         breakdown_data = []
         
         for year_index, year_data in enumerate(bounded_breakdown):
-        # ADD THIS DEBUG
-            if year_index == 0:  # Only print for first year
-                print(f"\n=== DISPLAY DEBUG - First Year Data ===")
-                print(f"year_data keys: {year_data.keys()}")
-                print(f"fuel_energy value: {year_data.get('fuel_energy')}")
-                print(f"annual_energy value: {year_data.get('annual_energy')}")
-                print(f"===================================\n")
+            if year_index == 0:
+                logger.debug("First year breakdown fuel_energy=%s annual_energy=%s keys=%s",
+                             year_data.get('fuel_energy'), year_data.get('annual_energy'), list(year_data))
 
             year_of_ownership = year_index + 1
             
@@ -5,10 +5,12 @@ Handles the display of vehicle comparisons, rankings, and recommendations
 
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 from typing import Dict, Any, List
 
+from services.tco_cache import compute_results_hash
+from ui.figure_factory import get_figure_factory
+from utils.session_manager import get_entry_results
+
 def display_comparison():
     """Display the multi-vehicle comparison interface"""
     
@@ -105,7 +107,7 @@ def display_comparison_summary():
                 # New format
                 vehicle = vehicle_entry['data']
                 vehicle_name = vehicle_entry.get('name', '')
-                has_results = 'results' in vehicle_entry
+                has_results = 'results' in vehicle_entry or 'results_ref' in vehicle_entry
             else:
                 # Old format (plain dict)
                 vehicle = vehicle_entry
@@ -141,14 +143,14 @@ def display_comparison_results():
     
     vehicle_entries = st.session_state.comparison_vehicles
     
-    # Import comparison service
+    # Shared comparison service (built once per process)
     try:
-        from services.comparison_service import ComparisonService
+        from ui.shared_services import get_shared_comparison_service
     except ImportError:
         st.error("Comparison service not available. Please ensure all required modules are installed.")
         return
     
-    comparison_service = ComparisonService()
+    comparison_service = get_shared_comparison_service()
     
     # Extract vehicle data for comparison - handle both formats
     vehicles_with_results = []
@@ -158,7 +160,7 @@ def display_comparison_results():
         if isinstance(vehicle_entry, dict) and 'data' in vehicle_entry:
             # New format - has embedded results
             vehicle_data = vehicle_entry['data']
-            vehicle_results = vehicle_entry.get('results')
+            vehicle_results = get_entry_results(vehicle_entry)
             
             if vehicle_results:
                 # Use pre-calculated results
@@ -179,8 +181,8 @@ def display_comparison_results():
         try:
             # If we have pre-calculated results, use them efficiently
             if vehicles_with_results:
-                # Create custom comparison using existing results
-                comparison_results = create_comparison_from_cached_results(
+                # Update the running comparison with only the vehicles that changed
+                comparison_results = get_incremental_comparison_results(
                     vehicles_with_results, 
                     comparison_service
                 )
@@ -205,10 +207,34 @@ def display_comparison_results():
                     st.write(f"Vehicle {i+1}:")
                     st.write(f"  - Type: {type(entry)}")
                     st.write(f"  - Has 'data': {'data' in entry if isinstance(entry, dict) else False}")
-                    st.write(f"  - Has 'results': {'results' in entry if isinstance(entry, dict) else False}")
+                    st.write(f"  - Has 'results': {('results' in entry or 'results_ref' in entry) if isinstance(entry, dict) else False}")
                 import traceback
                 st.code(traceback.format_exc())
 
+def get_incremental_comparison_results(vehicles_with_results: List[Dict[str, Any]], 
+                                      comparison_service) -> Dict[str, Any]:
+    """
+    Get comparison results from the session's incremental comparison state
+    Added, removed or recalculated vehicles are applied one at a time instead of
+    rebuilding rankings and statistics for the whole list on every rerun
+    """
+    from services.incremental_comparison import IncrementalComparisonState
+    
+    if 'comparison_state' not in st.session_state:
+        st.session_state.comparison_state = IncrementalComparisonState(comparison_service)
+    
+    entries = []
+    for item in vehicles_with_results:
+        vehicle_data = item['vehicle']
+        vehicle_id = (
+            vehicle_data.get('make'), vehicle_data.get('model'), vehicle_data.get('year'),
+            vehicle_data.get('trim'), vehicle_data.get('transaction_type')
+        )
+        entries.append((vehicle_id, vehicle_data, item['results']))
+    
+    st.session_state.comparison_state.sync(entries)
+    return st.session_state.comparison_state.get_comparison_results()
+
 def create_comparison_from_cached_results(vehicles_with_results: List[Dict[str, Any]], 
                                          comparison_service) -> Dict[str, Any]:
     """
@@ -256,9 +282,10 @@ def create_comparison_from_cached_results(vehicles_with_results: List[Dict[str,
 # NEW HELPER FUNCTION - Add this to comparison_display.py
 # ============================================================================
 
+@st.fragment
 def display_comparison_tabs(comparison_results: Dict[str, Any], 
                            recommendations: Dict[str, Any]):
-    """Display comparison results in organized tabs"""
+    """Display comparison results in organized tabs (a fragment, so tab widgets rerun only this section)"""
     
     # Action buttons
     col1, col2, col3 = st.columns(3)
@@ -381,9 +408,8 @@ def display_cost_comparison_table(comparison_results: Dict[str, Any]):
             # This suggests annual_cost is actually total_cost, fix it
             annual_cost = total_cost / analysis_years
         
-        # Calculate income percentage from raw results
-        raw_results = vehicle.get('raw_results', {})
-        affordability = raw_results.get('affordability', {})
+        # Calculate income percentage from the affordability results
+        affordability = vehicle.get('affordability', {})
         income_percentage = affordability.get('percentage_of_income', 0)
         
         # If not available, try to calculate from affordability score
@@ -463,30 +489,23 @@ def display_cost_comparison_table(comparison_results: Dict[str, Any]):
     with col3:
         st.markdown("**By Income Impact:**")
         # Sort by income percentage (lowest first = most affordable)
-        vehicles_with_income = [v for v in vehicles if v.get('raw_results', {}).get('affordability', {}).get('percentage_of_income', 0) > 0]
+        vehicles_with_income = [v for v in vehicles if v.get('affordability', {}).get('percentage_of_income', 0) > 0]
         if vehicles_with_income:
             sorted_by_income = sorted(vehicles_with_income, 
-                                    key=lambda x: x.get('raw_results', {}).get('affordability', {}).get('percentage_of_income', 100))
+                                    key=lambda x: x.get('affordability', {}).get('percentage_of_income', 100))
             for i, vehicle in enumerate(sorted_by_income[:3]):
                 emoji = ["🥇", "🥈", "🥉"][i]
-                income_pct = vehicle.get('raw_results', {}).get('affordability', {}).get('percentage_of_income', 0)
+                income_pct = vehicle.get('affordability', {}).get('percentage_of_income', 0)
                 st.markdown(f"{emoji} {vehicle['vehicle_name']}: {income_pct:.1f}%")
         else:
             st.info("Income data not available for ranking")
 
-def display_comparison_visualizations(comparison_results: Dict[str, Any]):
-    """Display comparison charts and visualizations - using line graphs with overlaid data points"""
-    
-    st.subheader("📈 Visual Analysis")
-    
-    vehicles = comparison_results.get('vehicles', [])
-    if not vehicles:
-        st.warning("No data available for visualization.")
-        return
+def get_plot_vehicles(comparison_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Reduce comparison vehicles to the fields the charts plot"""
     
     # Fix annual costs in vehicles data
-    fixed_vehicles = []
-    for vehicle in vehicles:
+    plot_vehicles = []
+    for vehicle in comparison_results.get('vehicles', []):
         annual_cost = vehicle.get('annual_cost', 0)
         total_cost = vehicle.get('total_cost', 0)
         analysis_years = vehicle.get('analysis_years', 5)
@@ -494,143 +513,45 @@ def display_comparison_visualizations(comparison_results: Dict[str, Any]):
         if analysis_years > 0 and annual_cost > total_cost * 0.8:
             annual_cost = total_cost / analysis_years
         
-        fixed_vehicles.append({
-            **vehicle,
-            'fixed_annual_cost': annual_cost
+        plot_vehicles.append({
+            'vehicle_name': vehicle['vehicle_name'],
+            'transaction_type': vehicle['transaction_type'],
+            'total_cost': total_cost,
+            'fixed_annual_cost': annual_cost,
+            'cost_categories': vehicle.get('cost_categories', {})
         })
     
-    # Prepare data for plotting
-    vehicle_names = [v['vehicle_name'] for v in fixed_vehicles]
-    total_costs = [v['total_cost'] for v in fixed_vehicles]
-    annual_costs = [v['fixed_annual_cost'] for v in fixed_vehicles]
-    transaction_types = [v['transaction_type'] for v in fixed_vehicles]
-    
-    # Color mapping for different vehicles
-    colors = px.colors.qualitative.Set1[:len(fixed_vehicles)]
-    
-    # Total cost comparison - OVERLAID BAR CHART
-    fig_total = go.Figure()
-    
-    # Create a simple category axis with cost values overlaid
-    categories = ['Total Cost Comparison']
-    
-    for i, vehicle in enumerate(fixed_vehicles):
-        fig_total.add_trace(go.Bar(
-            x=categories,
-            y=[vehicle['total_cost']],
-            name=vehicle['vehicle_name'],
-            marker_color=colors[i],
-            text=f"${vehicle['total_cost']:,.0f}",
-            textposition='auto',
-            width=0.6  # Make bars narrower so they overlap better
-        ))
-    
-    fig_total.update_layout(
-        title="Total Cost Comparison - All Vehicles",
-        xaxis_title="",
-        yaxis_title="Total Cost ($)",
-        height=400,
-        barmode='group',  # Group bars side by side
-        showlegend=True
-    )
+    return plot_vehicles
+
+def display_comparison_visualizations(comparison_results: Dict[str, Any]):
+    """Display comparison charts and visualizations - using line graphs with overlaid data points"""
     
-    st.plotly_chart(fig_total, use_container_width=True)
-    
-    # Annual cost comparison - OVERLAID BAR CHART
-    fig_annual = go.Figure()
-    
-    for i, vehicle in enumerate(fixed_vehicles):
-        fig_annual.add_trace(go.Bar(
-            x=categories,
-            y=[vehicle['fixed_annual_cost']],
-            name=vehicle['vehicle_name'],
-            marker_color=colors[i],
-            text=f"${vehicle['fixed_annual_cost']:,.0f}",
-            textposition='auto',
-            width=0.6
-        ))
-    
-    fig_annual.update_layout(
-        title="Annual Cost Comparison - All Vehicles",
-        xaxis_title="",
-        yaxis_title="Annual Cost ($)",
-        height=400,
-        barmode='group',
-        showlegend=True
-    )
+    st.subheader("📈 Visual Analysis")
     
-    st.plotly_chart(fig_annual, use_container_width=True)
+    plot_vehicles = get_plot_vehicles(comparison_results)
+    if not plot_vehicles:
+        st.warning("No data available for visualization.")
+        return
     
-    # Cost breakdown by category (if available) - STACKED BAR CHART
-    if len(fixed_vehicles) > 0 and fixed_vehicles[0].get('cost_categories'):
-        
-        st.markdown("#### Cost Category Breakdown")
-        
-        # Create grouped bar chart for categories
-        categories = list(fixed_vehicles[0]['cost_categories'].keys())
-        
-        fig_stack = go.Figure()
-        
-        colors_stack = px.colors.qualitative.Set3
-        
-        for i, category in enumerate(categories):
-            category_values = []
-            vehicle_labels = []
-            
-            for vehicle in fixed_vehicles:
-                category_values.append(vehicle['cost_categories'].get(category, 0))
-                vehicle_labels.append(vehicle['vehicle_name'])
-            
-            fig_stack.add_trace(go.Bar(
-                name=category.replace('_', ' ').title(),
-                x=vehicle_labels,
-                y=category_values,
-                marker_color=colors_stack[i % len(colors_stack)]
-            ))
-        
-        fig_stack.update_layout(
-            title="Cost Breakdown by Category - All Vehicles",
-            xaxis_title="Vehicle",
-            yaxis_title="Cost ($)",
-            barmode='stack',
-            height=500,
-            xaxis={'categoryorder': 'total descending'}
-        )
-        
-        st.plotly_chart(fig_stack, use_container_width=True)
+    # Figures are built once per hash of the plotted values and shared across reruns and sessions
+    plot_hash = compute_results_hash(plot_vehicles)
+    figure_factory = get_figure_factory()
     
-    # Dot plot: Cost comparison with all metrics
-    fig_dot = go.Figure()
+    chart_types = ['comparison_total_cost', 'comparison_annual_cost']
     
-    metrics = ['Total Cost', 'Annual Cost', 'Monthly Cost']
+    # Cost breakdown by category (if available) - STACKED BAR CHART
+    if plot_vehicles[0].get('cost_categories'):
+        chart_types.append('comparison_categories')
     
-    for i, vehicle in enumerate(fixed_vehicles):
-        y_values = [
-            vehicle['total_cost'],
-            vehicle['fixed_annual_cost'], 
-            vehicle['fixed_annual_cost'] / 12
-        ]
-        
-        fig_dot.add_trace(go.Scatter(
-            x=metrics,
-            y=y_values,
-            mode='markers+lines+text',
-            name=vehicle['vehicle_name'],
-            text=[f"${val:,.0f}" for val in y_values],
-            textposition="top center",
-            marker=dict(size=12, color=colors[i]),
-            line=dict(width=3, color=colors[i])
-        ))
-    
-    fig_dot.update_layout(
-        title="Multi-Metric Cost Comparison",
-        xaxis_title="Cost Metric",
-        yaxis_title="Cost ($)",
-        height=400,
-        showlegend=True
-    )
+    chart_types.append('comparison_metrics')
     
-    st.plotly_chart(fig_dot, use_container_width=True)
+    for chart_type in chart_types:
+        if chart_type == 'comparison_categories':
+            st.markdown("#### Cost Category Breakdown")
+        
+        figure = figure_factory.get_figure_spec(plot_hash, chart_type, plot_vehicles)
+        st.plotly_chart(figure, use_container_width=True,
+                        key=figure_factory.get_chart_key(plot_hash, chart_type))
 
 def display_recommendations_detailed(recommendations: Dict[str, Any]):
     """Display detailed recommendations for each vehicle"""
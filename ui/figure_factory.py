@@ -0,0 +1,252 @@
+"""
+Plotly Figure Factory
+Builds each TCO chart once per (results hash, chart type) and keeps the serialized
+figure JSON in a bounded LRU shared by every rerun and session in the process
+"""
+
+import plotly.graph_objects as go
+import plotly.express as px
+import plotly.io as pio
+import pandas as pd
+from typing import Dict, Any, List, Callable
+from collections import OrderedDict
+import json
+import threading
+
+class FigureFactory:
+    """Bounded LRU of figure JSON keyed on (results hash, chart type)"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+        # Chart type -> builder taking the chart's source data
+        self.builders: Dict[str, Callable[[Any], go.Figure]] = {
+            'annual_costs': self._build_annual_costs,
+            'cost_distribution': self._build_cost_distribution,
+            'comparison_total_cost': self._build_comparison_total_cost,
+            'comparison_annual_cost': self._build_comparison_annual_cost,
+            'comparison_categories': self._build_comparison_categories,
+            'comparison_metrics': self._build_comparison_metrics
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_figure_json(self, results_hash: str, chart_type: str, data: Any) -> str:
+        """Get the serialized figure, building it only on the first request"""
+
+        if chart_type not in self.builders:
+            raise ValueError(f"Unknown chart type: {chart_type}")
+
+        cache_key = (results_hash, chart_type)
+        with self._lock:
+            figure_json = self._entries.get(cache_key)
+            if figure_json is not None:
+                self._entries.move_to_end(cache_key)
+                self.stats['hits'] += 1
+                return figure_json
+            self.stats['misses'] += 1
+
+        # Build outside the lock; a concurrent duplicate build just stores the same JSON
+        figure_json = self.builders[chart_type](data).to_json()
+
+        with self._lock:
+            self._entries[cache_key] = figure_json
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+        return figure_json
+
+    def get_figure_spec(self, results_hash: str, chart_type: str, data: Any) -> Dict[str, Any]:
+        """Get the figure as a plain dict (what st.plotly_chart validates and sends)"""
+        return json.loads(self.get_figure_json(results_hash, chart_type, data))
+
+    def get_figure(self, results_hash: str, chart_type: str, data: Any) -> go.Figure:
+        """Get the figure as a go.Figure for callers that need to modify it"""
+        return pio.from_json(self.get_figure_json(results_hash, chart_type, data))
+
+    def get_chart_key(self, results_hash: str, chart_type: str) -> str:
+        """Stable Streamlit element key for a chart of these results"""
+        return f"{chart_type}_{results_hash[:16]}"
+
+    def clear(self):
+        """Drop all cached figures"""
+
+        with self._lock:
+            self._entries.clear()
+
+    def _build_annual_costs(self, breakdown_data: List[Dict[str, Any]]) -> go.Figure:
+        """Line chart of annual costs by category"""
+
+        df = pd.DataFrame(breakdown_data)
+
+        fig_line = go.Figure()
+
+        cost_categories = [col for col in df.columns if col not in ['ownership_year', 'year_of_ownership', 'vehicle_age', 'vehicle_model_year', 'total_mileage', 'total_annual_operating_cost', 'total_annual_cost_with_depreciation']]
+        colors = px.colors.qualitative.Set3
+
+        for i, category in enumerate(cost_categories):
+            fig_line.add_trace(go.Scatter(
+                x=df['ownership_year'] if 'ownership_year' in df.columns else list(range(1, len(df)+1)),
+                y=df[category],
+                mode='lines+markers',
+                name=category.replace('_', ' ').title(),
+                line=dict(color=colors[i % len(colors)], width=2),
+                marker=dict(size=6)
+            ))
+
+        fig_line.update_layout(
+            title="Annual Costs by Category",
+            xaxis_title="Calendar Year",
+            yaxis_title="Annual Cost ($)",
+            height=400,
+            hovermode='x unified'
+        )
+
+        return fig_line
+
+    def _build_cost_distribution(self, category_totals: Dict[str, float]) -> go.Figure:
+        """Pie chart of total costs by category"""
+
+        fig_pie = go.Figure(data=[go.Pie(
+            labels=[cat.replace('_', ' ').title() for cat in category_totals.keys()],
+            values=list(category_totals.values()),
+            hole=0.3
+        )])
+
+        fig_pie.update_layout(
+            title="Total Cost Distribution",
+            height=400
+        )
+
+        return fig_pie
+
+    def _build_comparison_total_cost(self, plot_vehicles: List[Dict[str, Any]]) -> go.Figure:
+        """Overlaid bar chart of total cost across vehicles"""
+        return self._build_comparison_bars(plot_vehicles, 'total_cost',
+                                           "Total Cost Comparison - All Vehicles", "Total Cost ($)")
+
+    def _build_comparison_annual_cost(self, plot_vehicles: List[Dict[str, Any]]) -> go.Figure:
+        """Overlaid bar chart of annual cost across vehicles"""
+        return self._build_comparison_bars(plot_vehicles, 'fixed_annual_cost',
+                                           "Annual Cost Comparison - All Vehicles", "Annual Cost ($)")
+
+    def _build_comparison_bars(self, plot_vehicles: List[Dict[str, Any]], metric: str,
+                               title: str, yaxis_title: str) -> go.Figure:
+        """Overlaid bar chart of one cost metric across vehicles"""
+
+        # Color mapping for different vehicles
+        colors = px.colors.qualitative.Set1[:len(plot_vehicles)]
+
+        fig = go.Figure()
+
+        # Create a simple category axis with cost values overlaid
+        categories = ['Total Cost Comparison']
+
+        for i, vehicle in enumerate(plot_vehicles):
+            fig.add_trace(go.Bar(
+                x=categories,
+                y=[vehicle[metric]],
+                name=vehicle['vehicle_name'],
+                marker_color=colors[i],
+                text=f"${vehicle[metric]:,.0f}",
+                textposition='auto',
+                width=0.6  # Make bars narrower so they overlap better
+            ))
+
+        fig.update_layout(
+            title=title,
+            xaxis_title="",
+            yaxis_title=yaxis_title,
+            height=400,
+            barmode='group',  # Group bars side by side
+            showlegend=True
+        )
+
+        return fig
+
+    def _build_comparison_categories(self, plot_vehicles: List[Dict[str, Any]]) -> go.Figure:
+        """Stacked bar chart of cost categories per vehicle"""
+
+        categories = list(plot_vehicles[0]['cost_categories'].keys())
+        vehicle_labels = [vehicle['vehicle_name'] for vehicle in plot_vehicles]
+
+        fig_stack = go.Figure()
+
+        colors_stack = px.colors.qualitative.Set3
+
+        for i, category in enumerate(categories):
+            fig_stack.add_trace(go.Bar(
+                name=category.replace('_', ' ').title(),
+                x=vehicle_labels,
+                y=[vehicle['cost_categories'].get(category, 0) for vehicle in plot_vehicles],
+                marker_color=colors_stack[i % len(colors_stack)]
+            ))
+
+        fig_stack.update_layout(
+            title="Cost Breakdown by Category - All Vehicles",
+            xaxis_title="Vehicle",
+            yaxis_title="Cost ($)",
+            barmode='stack',
+            height=500,
+            xaxis={'categoryorder': 'total descending'}
+        )
+
+        return fig_stack
+
+    def _build_comparison_metrics(self, plot_vehicles: List[Dict[str, Any]]) -> go.Figure:
+        """Dot plot of total, annual and monthly cost per vehicle"""
+
+        colors = px.colors.qualitative.Set1[:len(plot_vehicles)]
+
+        fig_dot = go.Figure()
+
+        metrics = ['Total Cost', 'Annual Cost', 'Monthly Cost']
+
+        for i, vehicle in enumerate(plot_vehicles):
+            y_values = [
+                vehicle['total_cost'],
+                vehicle['fixed_annual_cost'],
+                vehicle['fixed_annual_cost'] / 12
+            ]
+
+            fig_dot.add_trace(go.Scatter(
+                x=metrics,
+                y=y_values,
+                mode='markers+lines+text',
+                name=vehicle['vehicle_name'],
+                text=[f"${val:,.0f}" for val in y_values],
+                textposition="top center",
+                marker=dict(size=12, color=colors[i]),
+                line=dict(width=3, color=colors[i])
+            ))
+
+        fig_dot.update_layout(
+            title="Multi-Metric Cost Comparison",
+            xaxis_title="Cost Metric",
+            yaxis_title="Cost ($)",
+            height=400,
+            showlegend=True
+        )
+
+        return fig_dot
+
+_factory_lock = threading.Lock()
+_figure_factory = None
+
+def get_figure_factory() -> FigureFactory:
+    """Get the process-wide figure factory"""
+
+    global _figure_factory
+    if _figure_factory is None:
+        with _factory_lock:
+            if _figure_factory is None:
+                _figure_factory = FigureFactory()
+    return _figure_factory
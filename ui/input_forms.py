@@ -8,17 +8,21 @@ from ui.calculator_display import display_vehicle_mpg_info
 import re
 from typing import Dict, Any, Tuple, Optional
 from datetime import datetime
+from utils.log_config import get_logger
 try:
     from utils.used_vehicle_estimator import UsedVehicleEstimator
 except ImportError:
     # Fallback if estimator not available
     class UsedVehicleEstimator:
         def __init__(self):
-            pass
+            self.last_error = None
         def is_used_vehicle(self, year, mileage):
             return False
         def estimate_current_value(self, make, model, year, trim, mileage):
             return None
+
+logger = get_logger(__name__)
+
 # Import with error handling (keeping your existing structure)
 # Import with error handling to match your existing structure
 try:
@@ -28,7 +32,8 @@ try:
         get_trims_for_vehicle, 
         get_vehicle_trim_price,
         validate_vehicle_selection, 
-        get_available_years_for_model
+        get_available_years_for_model,
+        get_vehicle_selection_index
     )
     VEHICLE_DATABASE_AVAILABLE = True
 except ImportError:
@@ -125,12 +130,12 @@ def estimate_used_vehicle_value(make: str, model: str, year: int, current_mileag
         if year == current_year and current_mileage <= 1000:
             return None
         
-        st.write(f"Debug: {year} {make} {model}, Age = {vehicle_age}, Mileage = {current_mileage:,}")
+        logger.debug("%s %s %s, Age = %s, Mileage = %s", year, make, model, vehicle_age, current_mileage)
         
         # ENHANCED LOGIC FOR CURRENT YEAR VEHICLES WITH MILEAGE
         if vehicle_age == 0 and current_mileage > 1000:
             # CURRENT YEAR VEHICLE WITH SIGNIFICANT MILEAGE - Apply new car depreciation
-            st.write(f"Debug: Current year vehicle with {current_mileage:,} miles - applying new car mileage-based depreciation")
+            logger.debug("Current year vehicle with %s miles - applying new car mileage-based depreciation", current_mileage)
             
             # First, determine the vehicle segment to get the 1-year baseline
             model_lower = model.lower()
@@ -158,7 +163,7 @@ def estimate_used_vehicle_value(make: str, model: str, year: int, current_mileag
                 segment = 'sedan'
                 one_year_rate = 0.15  # Sedans - reduced from 0.17
             
-            st.write(f"Debug: Vehicle segment: {segment}, 1-year baseline rate: {one_year_rate:.1%}")
+            logger.debug("Vehicle segment: %s, 1-year baseline rate: %.1f%%", segment, one_year_rate * 100)
             
             # INTEGRATED Progressive depreciation - never exceed 1-year rates
             # Scale from minimal depreciation to approaching (but not exceeding) 1-year rates
@@ -185,8 +190,8 @@ def estimate_used_vehicle_value(make: str, model: str, year: int, current_mileag
                 base_depreciation = (one_year_rate * 0.75) + mileage_factor * (max_depreciation - one_year_rate * 0.75)
                 depreciation_type = "heavily used new car"
             
-            st.write(f"Debug: New car mileage category: {depreciation_type}")
-            st.write(f"Debug: Base mileage depreciation = {base_depreciation:.3f} ({base_depreciation*100:.1f}%)")
+            logger.debug("New car mileage category: %s", depreciation_type)
+            logger.debug("Base mileage depreciation = %.3f (%.1f%%)", base_depreciation, base_depreciation*100)
             
             # Apply research-validated brand-specific modifiers for new car depreciation
             brand_modifiers = {
@@ -222,19 +227,19 @@ def estimate_used_vehicle_value(make: str, model: str, year: int, current_mileag
             final_depreciation = min(final_depreciation, max_allowed_depreciation)
             final_depreciation = max(final_depreciation, 0.015)  # Min 1.5% depreciation
             
-            st.write(f"Debug: Brand multiplier ({make}): {brand_multiplier:.2f}")
-            st.write(f"Debug: Max allowed (85% of 1-year): {max_allowed_depreciation:.1%}")
-            st.write(f"Debug: Final new car depreciation: {final_depreciation:.3f} ({final_depreciation*100:.1f}%)")
+            logger.debug("Brand multiplier (%s): %.2f", make, brand_multiplier)
+            logger.debug("Max allowed (85%% of 1-year): %.1f%%", max_allowed_depreciation * 100)
+            logger.debug("Final new car depreciation: %.3f (%.1f%%)", final_depreciation, final_depreciation*100)
             
             estimated_value = trim_msrp * (1 - final_depreciation)
             
-            st.write(f"Debug: MSRP = ${trim_msrp:,}, Final value = ${estimated_value:,.0f}")
+            logger.debug("MSRP = $%s, Final value = $%.0f", trim_msrp, estimated_value)
             
             return round(estimated_value, 0)
         
         # EXISTING LOGIC FOR OLDER VEHICLES - UPDATED WITH MARKET DATA
         else:
-            st.write(f"Debug: Older vehicle ({vehicle_age} years) - using market-validated depreciation curves")
+            logger.debug("Older vehicle (%s years) - using market-validated depreciation curves", vehicle_age)
             
             # STEP 1: MARKET-VALIDATED DEPRECIATION CURVES (Updated based on 2024-2025 research)
             # KBB states most vehicles lose about 20% first year, then 60% total by year 5
@@ -312,14 +317,14 @@ def estimate_used_vehicle_value(make: str, model: str, year: int, current_mileag
             curve = realistic_curves[segment]
             base_depreciation = curve.get(vehicle_age, curve.get(15, 0.72))
             
-            st.write(f"Debug: Segment = {segment}")
-            st.write(f"Debug: Base depreciation = {base_depreciation:.3f} ({base_depreciation*100:.1f}%)")
+            logger.debug("Segment = %s", segment)
+            logger.debug("Base depreciation = %.3f (%.1f%%)", base_depreciation, base_depreciation*100)
             
             # STEP 2: MILEAGE ADJUSTMENT (12k miles/year baseline for older vehicles)
             expected_mileage = vehicle_age * 12000
             mileage_difference = current_mileage - expected_mileage
             
-            st.write(f"Debug: Expected mileage = {expected_mileage:,}, Actual = {current_mileage:,}, Difference = {mileage_difference:,}")
+            logger.debug("Expected mileage = %s, Actual = %s, Difference = %s", expected_mileage, current_mileage, mileage_difference)
             
             # Improved mileage adjustment logic
             mileage_adjustment = 0.0
@@ -327,21 +332,21 @@ def estimate_used_vehicle_value(make: str, model: str, year: int, current_mileag
             if abs(mileage_difference) <= 10000:
                 # Normal mileage range (+/- 10k from expected)
                 mileage_adjustment = mileage_difference / 200000  # Very gradual adjustment
-                st.write(f"Debug: Normal mileage range, adjustment = {mileage_adjustment:.3f}")
+                logger.debug("Normal mileage range, adjustment = %.3f", mileage_adjustment)
                 
             elif mileage_difference > 10000:
                 # Higher than expected mileage - penalty
                 excess_miles = mileage_difference - 10000
                 mileage_adjustment = 0.08 + (excess_miles / 300000)  # Reduced penalty
                 mileage_adjustment = min(mileage_adjustment, 0.20)  # Cap at 20% additional
-                st.write(f"Debug: High mileage penalty = +{mileage_adjustment:.3f}")
+                logger.debug("High mileage penalty = +%.3f", mileage_adjustment)
                 
             else:
                 # Lower than expected mileage - bonus
                 missing_miles = abs(mileage_difference) - 10000
                 mileage_adjustment = -0.04 - (missing_miles / 400000)  # Reduced bonus
                 mileage_adjustment = max(mileage_adjustment, -0.12)  # Cap at 12% reduction
-                st.write(f"Debug: Low mileage bonus = {mileage_adjustment:.3f}")
+                logger.debug("Low mileage bonus = %.3f", mileage_adjustment)
             
             # STEP 3: RESEARCH-VALIDATED BRAND ADJUSTMENT
             brand_multipliers = {
@@ -370,8 +375,8 @@ def estimate_used_vehicle_value(make: str, model: str, year: int, current_mileag
             adjusted_depreciation = base_depreciation + mileage_adjustment
             final_depreciation = adjusted_depreciation * brand_multiplier
             
-            st.write(f"Debug: After mileage adj = {adjusted_depreciation:.3f}")
-            st.write(f"Debug: After brand adj = {final_depreciation:.3f}")
+            logger.debug("After mileage adj = %.3f", adjusted_depreciation)
+            logger.debug("After brand adj = %.3f", final_depreciation)
             
             # Step 5: Apply realistic caps and floors by segment - FIXED: Age-appropriate bounds
             if vehicle_age <= 3:
@@ -445,11 +450,11 @@ def estimate_used_vehicle_value(make: str, model: str, year: int, current_mileag
             
             final_depreciation = max(floor, min(final_depreciation, cap))
             
-            st.write(f"Debug: Applied cap/floor ({floor:.3f} to {cap:.3f}) = {final_depreciation:.3f}")
+            logger.debug("Applied cap/floor (%.3f to %.3f) = %.3f", floor, cap, final_depreciation)
             
             estimated_value = trim_msrp * (1 - final_depreciation)
             
-            st.write(f"Debug: MSRP = ${trim_msrp:,}, Final value = ${estimated_value:,.0f}")
+            logger.debug("MSRP = $%s, Final value = $%.0f", trim_msrp, estimated_value)
             
             return round(estimated_value, 0)
         
@@ -531,6 +536,31 @@ def detect_electric_vehicle(make: str, model: str) -> bool:
     return False
 
 
+@st.cache_data(show_spinner=False)
+def get_make_options() -> list:
+    """Sorted makes for the selection form (cached across reruns)"""
+    if VEHICLE_DATABASE_AVAILABLE:
+        return list(get_vehicle_selection_index().keys())
+    return sorted(get_all_manufacturers())
+
+@st.cache_data(show_spinner=False)
+def get_model_options(make: str) -> list:
+    """Sorted models for a make (cached across reruns)"""
+    if VEHICLE_DATABASE_AVAILABLE:
+        return list(get_vehicle_selection_index().get(make, {}).keys())
+    return sorted(get_models_for_manufacturer(make))
+
+@st.cache_data(show_spinner=False)
+def get_trim_options(make: str, model: str, year: int) -> Dict[str, float]:
+    """Trims and prices for a vehicle, ordered by price (cached across reruns)"""
+    if VEHICLE_DATABASE_AVAILABLE:
+        model_options = get_vehicle_selection_index().get(make, {}).get(model, {})
+        trims = model_options.get('trims_by_year', {}).get(year)
+        if trims is not None:
+            return dict(trims)
+    # Years outside production fall back to the closest-year lookup
+    return get_trims_for_vehicle(make, model, year)
+
 def display_vehicle_selection_form(display_mode: str = "collect") -> Dict[str, Any]:
     """
     Display vehicle selection form with transaction type selection
@@ -553,10 +583,10 @@ def display_vehicle_selection_form(display_mode: str = "collect") -> Dict[str, A
     
     with col1:
         # Make selection with unique key
-        available_makes = get_all_manufacturers()
+        available_makes = get_make_options()
         selected_make = st.selectbox(
             "Make:",
-            [''] + sorted(available_makes),
+            [''] + available_makes,
             help="Vehicle manufacturer",
             key="vehicle_make_select"
         )
@@ -592,10 +622,10 @@ def display_vehicle_selection_form(display_mode: str = "collect") -> Dict[str, A
     with col2:
         # Model selection (dependent on make) with unique key
         if selected_make:
-            available_models = get_models_for_manufacturer(selected_make)
+            available_models = get_model_options(selected_make)
             selected_model = st.selectbox(
                 "Model:",
-                [''] + sorted(available_models),
+                [''] + available_models,
                 help="Vehicle model",
                 key="vehicle_model_select"
             )
@@ -621,7 +651,7 @@ def display_vehicle_selection_form(display_mode: str = "collect") -> Dict[str, A
         
         # Trim selection (dependent on model and year) with unique key
         if selected_make and selected_model and selected_year:
-            trims = get_trims_for_vehicle(selected_make, selected_model, int(selected_year))
+            trims = get_trim_options(selected_make, selected_model, int(selected_year))
             if trims:
                 trim_options = [''] + list(trims.keys())
                 selected_trim = st.selectbox(
@@ -719,6 +749,8 @@ def display_vehicle_selection_form(display_mode: str = "collect") -> Dict[str, A
                     if estimated_value:
                         default_price = int(estimated_value)
                         estimated_price = estimated_value
+                    elif estimator.last_error:
+                        st.warning(f"⚠️ {estimator.last_error}")
                 except Exception as e:
                     st.warning(f"⚠️ Could not estimate used vehicle value: {str(e)}")
                     estimated_price = None
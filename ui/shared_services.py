@@ -0,0 +1,19 @@
+"""
+Shared Services for the Streamlit UI
+Serves the process-wide service instances through st.cache_resource so reruns
+and button presses reuse the same models instead of rebuilding them
+"""
+
+import streamlit as st
+
+from services.service_registry import get_prediction_service, get_comparison_service
+
+@st.cache_resource(show_spinner=False)
+def get_shared_prediction_service():
+    """Get the shared PredictionService for this server process"""
+    return get_prediction_service()
+
+@st.cache_resource(show_spinner=False)
+def get_shared_comparison_service():
+    """Get the shared ComparisonService for this server process"""
+    return get_comparison_service()
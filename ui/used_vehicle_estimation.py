@@ -0,0 +1,162 @@
+"""
+Used Vehicle Estimation UI
+Streamlit helpers that surface UsedVehicleEstimator results in the vehicle forms
+"""
+
+import streamlit as st
+
+from utils.used_vehicle_estimator import UsedVehicleEstimator
+
+def integrate_used_vehicle_estimation():
+    """
+    Integration function to be called from the vehicle selection interface
+    This should be added to the vehicle selection form where price input occurs
+    """
+    
+    # Initialize the estimator
+    estimator = UsedVehicleEstimator()
+    
+    # This would be integrated into the existing vehicle selection form
+    # Example integration points:
+    
+    def on_vehicle_details_change(make, model, year, trim, current_mileage):
+        """
+        Callback function to execute when vehicle details change
+        """
+        if make and model and year and trim and current_mileage is not None:
+            
+            # Check if this is a used vehicle
+            if estimator.is_used_vehicle(year, current_mileage):
+                
+                # Estimate current value
+                estimated_value = estimator.estimate_current_value(
+                    make, model, year, trim, current_mileage
+                )
+                
+                if estimated_value:
+                    # Auto-populate the purchase price field
+                    st.session_state.estimated_price = estimated_value
+                    
+                    # Show estimation info to user
+                    st.info(f"""
+                    🔍 **Used Vehicle Detected**
+                    
+                    Estimated current market value: **${estimated_value:,.0f}**
+                    
+                    This estimate is based on:
+                    - Vehicle age: {estimator.current_year - year} years
+                    - Current mileage: {current_mileage:,} miles
+                    - {make} {model} depreciation patterns
+                    
+                    💡 *This value has been automatically entered in the purchase price field*
+                    """)
+                    
+                    # Get and display insights
+                    insights = estimator.get_depreciation_insights(
+                        make, model, year, current_mileage, estimated_value
+                    )
+                    
+                    if insights:
+                        with st.expander("📊 View Depreciation Analysis"):
+                            col1, col2 = st.columns(2)
+                            
+                            with col1:
+                                st.metric("Vehicle Age", f"{insights['vehicle_age']} years")
+                                st.write(f"**Mileage Assessment:** {insights['mileage_assessment']}")
+                            
+                            with col2:
+                                st.write(f"**Value Retention:** {insights['value_retention_rating']}")
+                                st.write(f"**Depreciation:** {insights['depreciation_assessment']}")
+                            
+                            st.write(f"**Market Position:** {insights['market_position']}")
+                
+                elif estimator.last_error:
+                    st.warning(f"⚠️ {estimator.last_error}")
+                else:
+                    st.warning("⚠️ Unable to estimate current value - vehicle data not found in database")
+            
+            else:
+                # Clear any previous estimation
+                if 'estimated_price' in st.session_state:
+                    del st.session_state.estimated_price
+    
+    return on_vehicle_details_change
+
+def enhanced_vehicle_selection_with_price_estimation():
+    """
+    Enhanced vehicle selection form that includes automatic price estimation
+    This would replace or enhance the existing vehicle selection interface
+    """
+    
+    estimator = UsedVehicleEstimator()
+    
+    st.subheader("🚗 Vehicle Selection")
+    
+    # Vehicle selection inputs (simplified example)
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        make = st.selectbox("Make", ["Tesla", "Toyota", "Honda", "Ford", "Chevrolet"])
+        year = st.selectbox("Year", list(range(2024, 2015, -1)))
+    
+    with col2:
+        model = st.selectbox("Model", ["Model 3", "Camry", "Civic", "F-150", "Silverado"])
+        trim = st.selectbox("Trim", ["Base", "Performance", "LX", "EX"])
+    
+    # Mileage input
+    current_mileage = st.number_input(
+        "Current Mileage:",
+        min_value=0,
+        max_value=300000,
+        value=0,
+        step=1000,
+        help="Current odometer reading"
+    )
+    
+    # Purchase price with auto-estimation
+    purchase_price = st.number_input(
+        "Purchase Price ($):",
+        min_value=1000,
+        max_value=200000,
+        value=st.session_state.get('estimated_price', 30000),
+        step=500,
+        help="Actual purchase price (auto-estimated for used vehicles)"
+    )
+    
+    # Check for used vehicle and estimate price
+    if make and model and year and trim and current_mileage is not None:
+        
+        if estimator.is_used_vehicle(year, current_mileage):
+            
+            estimated_value = estimator.estimate_current_value(
+                make, model, year, trim, current_mileage
+            )
+            
+            if estimated_value:
+                # Update session state for price
+                st.session_state.estimated_price = estimated_value
+                
+                # Rerun to update the input field
+                if abs(purchase_price - estimated_value) > 1000:
+                    st.rerun()
+                
+                # Show estimation details
+                st.success(f"""
+                ✅ **Used Vehicle Price Estimated**
+                
+                Current market value: **${estimated_value:,.0f}**
+                
+                You can adjust this price if you have a different offer or market data.
+                """)
+            
+            elif estimator.last_error:
+                st.warning(f"⚠️ {estimator.last_error}")
+    
+    return {
+        'make': make,
+        'model': model, 
+        'year': year,
+        'trim': trim,
+        'current_mileage': current_mileage,
+        'purchase_price': purchase_price
+    }
@@ -0,0 +1,151 @@
+"""
+Logging Configuration
+Per-module loggers under a shared "tco" namespace. Debug output is off by default
+(hot paths only pay an isEnabledFor check) and can be switched on globally with
+TCO_LOG_LEVEL or for a single calculation with debug_request()
+"""
+
+from typing import Dict, Any, List, Optional
+from contextlib import contextmanager
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+ROOT_LOGGER_NAME = 'tco'
+
+# Default level for the engine loggers; DEBUG output stays off unless asked for
+DEFAULT_LEVEL = os.environ.get('TCO_LOG_LEVEL', 'WARNING').upper()
+
+# Standard LogRecord attributes; anything else on a record came from `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# Request id of the debug_request() block active in the current thread/task
+_debug_request_id = contextvars.ContextVar('tco_debug_request_id', default=None)
+
+_debug_lock = threading.Lock()
+_active_debug_requests = 0
+_saved_level = None
+
+_root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+_root_logger.setLevel(DEFAULT_LEVEL)
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a module, e.g. get_logger(__name__) -> "tco.services.prediction_service" """
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+def get_record_fields(record: logging.LogRecord) -> Dict[str, Any]:
+    """Structured fields passed to a log call through `extra`"""
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per log record, including the `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        entry.update(get_record_fields(record))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def configure_logging(level: str = None, stream=None, structured: bool = False) -> logging.Handler:
+    """Send engine logs to a stream (stderr by default); for CLIs and the app entry point"""
+    global _saved_level
+
+    level = (level or DEFAULT_LEVEL).upper()
+
+    # The handler keeps its own level so debug_request() blocks elsewhere do not reach it
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setLevel(level)
+    if structured:
+        handler.setFormatter(StructuredFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    _root_logger.addHandler(handler)
+    with _debug_lock:
+        if _active_debug_requests:
+            _saved_level = level
+        else:
+            _root_logger.setLevel(level)
+    return handler
+
+class _RequestCaptureHandler(logging.Handler):
+    """Collects records emitted inside one debug_request() block"""
+
+    def __init__(self, request_id: str, records: List[Dict[str, Any]]):
+        super().__init__(logging.DEBUG)
+        self.request_id = request_id
+        self.records = records
+        self.started = time.time()
+
+    def emit(self, record: logging.LogRecord):
+        if _debug_request_id.get() != self.request_id:
+            return
+        entry = {
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'elapsed_ms': round((record.created - self.started) * 1000, 3)
+        }
+        entry.update(get_record_fields(record))
+        self.records.append(entry)
+
+@contextmanager
+def debug_request(request_id: Optional[str] = None):
+    """
+    Capture DEBUG logs for the calculations run inside this block
+    Yields a list that fills with structured records; other threads and tasks are unaffected.
+    """
+    global _active_debug_requests, _saved_level
+
+    if request_id is None:
+        # uuid is only needed once debugging is requested; importing it pulls in platform
+        import uuid
+        request_id = uuid.uuid4().hex
+    records = []
+    handler = _RequestCaptureHandler(request_id, records)
+    token = _debug_request_id.set(request_id)
+
+    with _debug_lock:
+        if _active_debug_requests == 0:
+            _saved_level = _root_logger.level
+            _root_logger.setLevel(logging.DEBUG)
+        _active_debug_requests += 1
+        _root_logger.addHandler(handler)
+
+    try:
+        yield records
+    finally:
+        with _debug_lock:
+            _root_logger.removeHandler(handler)
+            _active_debug_requests -= 1
+            if _active_debug_requests == 0:
+                _root_logger.setLevel(_saved_level)
+        _debug_request_id.reset(token)
+
+# Test function
+def test_log_config():
+    """Test per-request debug capture"""
+    logger = get_logger('demo')
+
+    logger.debug("Not captured: debug output is off by default")
+    with debug_request() as records:
+        logger.debug("Purchase TCO inputs for %s %s", 'Toyota', 'Camry', extra={'is_electric': False})
+    logger.debug("Not captured after the block")
+
+    print("=== LOG CONFIG TEST ===")
+    print(f"Root level: {logging.getLevelName(_root_logger.level)}")
+    for record in records:
+        print(f"Captured: {record}")
+
+if __name__ == "__main__":
+    test_log_config()
@@ -97,8 +97,10 @@ def clear_session_state():
     keys_to_clear = [
         'comparison_vehicles',
         'comparison_results', 
+        'comparison_state',
         'current_vehicle',
         'current_results',
+        'current_results_hash',
         'location_data',  # Legacy
         'calculation_complete',
         'show_comparison',
@@ -117,8 +119,10 @@ def clear_all_data():
     keys_to_clear = [
         'comparison_vehicles',
         'comparison_results', 
+        'comparison_state',
         'current_vehicle',
         'current_results',
+        'current_results_hash',
         'location_data',
         'calculation_complete',
         'show_comparison',
@@ -235,12 +239,8 @@ def add_vehicle_to_comparison(vehicle_data: Dict[str, Any], results: Dict[str, A
     if len(st.session_state.comparison_vehicles) >= max_vehicles:
         return False, f"Maximum of {max_vehicles} vehicles allowed in comparison."
     
-    # Create vehicle entry with embedded results (new format)
-    vehicle_entry = {
-        'data': vehicle_data.copy(),
-        'results': results.copy(),
-        'name': f"{year} {make} {model} {trim}"
-    }
+    # Create vehicle entry referencing the shared results store (compact format)
+    vehicle_entry = create_comparison_entry(vehicle_data, results)
     
     # Add vehicle to comparison list
     st.session_state.comparison_vehicles.append(vehicle_entry)
@@ -248,12 +248,56 @@ def add_vehicle_to_comparison(vehicle_data: Dict[str, Any], results: Dict[str, A
     # Also save to comparison_results for backward compatibility
     vehicle_key = f"{make}_{model}_{year}_{trim}_{transaction_type}"
     st.session_state.comparison_results[vehicle_key] = {
-        'vehicle_data': vehicle_data,
-        'results': results
+        'vehicle_data': vehicle_entry['data'],
+        'results_ref': vehicle_entry['results_ref'],
+        'summary': vehicle_entry['summary']
     }
     
     return True, f"Vehicle added to comparison. Total: {len(st.session_state.comparison_vehicles)}"
 
+def create_comparison_entry(vehicle_data: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Create a compact comparison entry
+    Results go to the process-wide store once per distinct content; the entry keeps
+    only the reference and headline metrics, so session size stays flat.
+    """
+    from services.service_registry import get_results_store
+    from services.results_store import summarize_results
+    
+    return {
+        'data': vehicle_data.copy(),
+        'results_ref': get_results_store().put(results),
+        'summary': summarize_results(vehicle_data, results),
+        'name': f"{vehicle_data.get('year', '')} {vehicle_data.get('make', '')} {vehicle_data.get('model', '')} {vehicle_data.get('trim', '')}"
+    }
+
+def get_entry_results(vehicle_entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Get the full results for a comparison entry (compact or embedded format)
+    Results evicted from the shared store are recalculated from the entry's inputs.
+    """
+    if 'results' in vehicle_entry:
+        return vehicle_entry['results']
+    
+    results_ref = vehicle_entry.get('results_ref')
+    if not results_ref:
+        return None
+    
+    from services.service_registry import get_results_store, get_prediction_service
+    results_store = get_results_store()
+    results = results_store.get(results_ref)
+    
+    if results is None:
+        vehicle_data = vehicle_entry.get('data', vehicle_entry.get('vehicle_data', {}))
+        try:
+            results = get_prediction_service().calculate_total_cost_of_ownership(vehicle_data)
+        except Exception:
+            return None
+        vehicle_entry['results_ref'] = results_store.put(results)
+        results = results_store.get(vehicle_entry['results_ref'])
+    
+    return results
+
 def remove_vehicle_from_comparison(index: int):
     """Remove a vehicle from comparison by index"""
     if 0 <= index < len(st.session_state.comparison_vehicles):
@@ -279,16 +323,29 @@ def is_comparison_ready():
 
 def save_calculation_results(vehicle_data: Dict[str, Any], results: Dict[str, Any]):
     """Save calculation results for a vehicle"""
+    from services.tco_cache import compute_tco_cache_key
     vehicle_key = f"{vehicle_data.get('make')}_{vehicle_data.get('model')}_{vehicle_data.get('year')}_{vehicle_data.get('trim')}_{vehicle_data.get('transaction_type')}"
+    entry = create_comparison_entry(vehicle_data, results)
     st.session_state.comparison_results[vehicle_key] = {
-        'vehicle_data': vehicle_data,
-        'results': results
+        'vehicle_data': entry['data'],
+        'results_ref': entry['results_ref'],
+        'summary': entry['summary'],
+        'input_key': compute_tco_cache_key(vehicle_data)
     }
 
 def get_calculation_results(vehicle_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Get saved calculation results for a vehicle"""
+    """Get saved calculation results for a vehicle, ignoring results from different inputs"""
+    from services.tco_cache import compute_tco_cache_key
     vehicle_key = f"{vehicle_data.get('make')}_{vehicle_data.get('model')}_{vehicle_data.get('year')}_{vehicle_data.get('trim')}_{vehicle_data.get('transaction_type')}"
-    return st.session_state.comparison_results.get(vehicle_key)
+    saved = st.session_state.comparison_results.get(vehicle_key)
+    if saved and saved.get('input_key', compute_tco_cache_key(saved['vehicle_data'])) != compute_tco_cache_key(vehicle_data):
+        return None
+    if saved and 'results' not in saved:
+        results = get_entry_results(saved)
+        if results is None:
+            return None
+        return {**saved, 'results': results}
+    return saved
 
 def update_user_preferences(preferences: Dict[str, Any]):
     """Update user preferences in session state"""
@@ -1,13 +1,16 @@
 # utils/used_vehicle_estimator.py
+"""
+Used Vehicle Value Estimator
+Pure calculation core (no Streamlit); UI helpers live in ui/used_vehicle_estimation.py
+"""
 
 from datetime import datetime
-from typing import Dict, Any, Optional
-import streamlit as st
+from typing import Dict, Any, Optional, Tuple, List, Union
 from models.depreciation.enhanced_depreciation import EnhancedDepreciationModel
 
 # Import function-based database access (not class-based)
 try:
-    from data.vehicle_database import get_trims_for_vehicle, get_vehicle_trim_price
+    from data.vehicle_database import get_trims_for_vehicle, get_vehicle_trim_price, get_vehicle_selection_index
     DATABASE_AVAILABLE = True
 except ImportError:
     DATABASE_AVAILABLE = False
@@ -15,24 +18,11 @@ except ImportError:
         return {}
     def get_vehicle_trim_price(make, model, year, trim):
         return None
-
-# utils/used_vehicle_estimator.py
-
-from datetime import datetime
-from typing import Dict, Any, Optional
-import streamlit as st
-from models.depreciation.enhanced_depreciation import EnhancedDepreciationModel
-
-# Import function-based database access (not class-based)
-try:
-    from data.vehicle_database import get_trims_for_vehicle, get_vehicle_trim_price
-    DATABASE_AVAILABLE = True
-except ImportError:
-    DATABASE_AVAILABLE = False
-    def get_trims_for_vehicle(make, model, year):
+    def get_vehicle_selection_index():
         return {}
-    def get_vehicle_trim_price(make, model, year, trim):
-        return None
+
+# Columns estimate_values_batch reads (mileage may also be named current_mileage)
+BATCH_VALUATION_COLUMNS = ['make', 'model', 'year', 'trim', 'mileage']
 
 class UsedVehicleEstimator:
     """
@@ -42,6 +32,7 @@ class UsedVehicleEstimator:
     def __init__(self):
         self.depreciation_model = EnhancedDepreciationModel()
         self.current_year = datetime.now().year
+        self.last_error = None  # Reason the last estimate_current_value call failed
     
     def is_used_vehicle(self, year: int, current_mileage: int) -> bool:
         """
@@ -79,7 +70,9 @@ class UsedVehicleEstimator:
             
         Returns:
             float: Estimated current value or None if cannot estimate
+            (the reason for an error is left in self.last_error)
         """
+        self.last_error = None
         try:
             # Get original MSRP from database
             original_msrp = self._get_original_msrp(make, model, year, trim)
@@ -117,7 +110,7 @@ class UsedVehicleEstimator:
             return round(estimated_value, 0)
             
         except Exception as e:
-            st.warning(f"Could not estimate vehicle value: {str(e)}")
+            self.last_error = f"Could not estimate vehicle value: {str(e)}"
             return None
 
     def _get_original_msrp(self, make: str, model: str, year: int, trim: str) -> Optional[float]:
@@ -134,33 +127,161 @@ class UsedVehicleEstimator:
             float: Original MSRP or None if not found
         """
         try:
-            if not DATABASE_AVAILABLE:
-                return None
-            
-            # Get all trims for this vehicle
-            trims = get_trims_for_vehicle(make, model, year)
-            
-            if not trims:
-                return None
-            
-            # Try exact trim match first
-            if trim in trims:
-                return trims[trim]
-            
-            # Try case-insensitive match
-            for available_trim, price in trims.items():
-                if available_trim.lower() == trim.lower():
-                    return price
-            
-            # If no exact match, return base trim price (typically the lowest)
-            if trims:
-                return min(trims.values())
-            
-            return None
-            
+            return self._resolve_msrp(make, model, year, trim)[0]
         except Exception as e:
             return None
     
+    def _resolve_msrp(self, make: str, model: str, year: int, trim: str) -> Tuple[Optional[float], Optional[str]]:
+        """
+        Original MSRP and how it was matched
+        
+        Returns:
+            (price, match): match is 'trim', 'trim_case_insensitive', 'lowest_trim', or
+            'catalog_default' when the make/model is not in the catalog and the
+            database's default prices were used; (None, None) if no price is available
+        """
+        if not DATABASE_AVAILABLE:
+            return None, None
+        
+        # Get all trims for this vehicle
+        trims = get_trims_for_vehicle(make, model, year)
+        
+        if not trims:
+            return None, None
+        
+        if model not in get_vehicle_selection_index().get(make, {}):
+            match = 'catalog_default'
+        else:
+            match = None
+        
+        # Try exact trim match first
+        if trim in trims:
+            return trims[trim], match or 'trim'
+        
+        # Try case-insensitive match
+        for available_trim, price in trims.items():
+            if available_trim.lower() == trim.lower():
+                return price, match or 'trim_case_insensitive'
+        
+        # If no exact match, return base trim price (typically the lowest)
+        return min(trims.values()), match or 'lowest_trim'
+    
+    def estimate_values_batch(self, vehicles: Union[List[Dict[str, Any]], 'pd.DataFrame']) -> 'pd.DataFrame':
+        """
+        Estimate current market values for a whole inventory feed
+        
+        Args:
+            vehicles: DataFrame (or list of dicts) with make, model, year, trim and
+                mileage columns
+            
+        Returns:
+            DataFrame: the input rows plus original_msrp, msrp_match, vehicle_age,
+            estimated_value and error (empty when the row was valued; the reason otherwise).
+            Values follow estimate_current_value, computed as arrays with MSRPs and
+            depreciation factors looked up once per distinct vehicle.
+        """
+        # Deferred so single-vehicle estimates do not pay for pandas at import time
+        import numpy as np
+        import pandas as pd
+        
+        results = pd.DataFrame(vehicles).copy()
+        if 'mileage' not in results.columns and 'current_mileage' in results.columns:
+            mileage_column = 'current_mileage'
+        else:
+            mileage_column = 'mileage'
+        missing = [column for column in BATCH_VALUATION_COLUMNS[:4] + [mileage_column] if column not in results.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        
+        make = results['make'].fillna('').astype(str).str.strip()
+        model = results['model'].fillna('').astype(str).str.strip()
+        trim = results['trim'].fillna('').astype(str)
+        year = pd.to_numeric(results['year'], errors='coerce').to_numpy(dtype=float)
+        mileage = pd.to_numeric(results[mileage_column], errors='coerce').to_numpy(dtype=float)
+        
+        # Row validation, first failure wins
+        error = np.full(len(results), None, dtype=object)
+        checks = [
+            ((make == '').to_numpy() | (model == '').to_numpy(), "Missing make or model"),
+            (~np.isfinite(year) | (np.mod(year, 1) != 0), "Invalid model year"),
+            (~np.isfinite(mileage) | (mileage < 0), "Invalid mileage")
+        ]
+        for failed, reason in checks:
+            error[failed & pd.isna(error)] = reason
+        valid = pd.isna(error)
+        
+        # MSRP index: one catalog lookup per distinct make/model/year/trim
+        original_msrp = np.full(len(results), np.nan)
+        msrp_match = np.full(len(results), None, dtype=object)
+        vehicle_keys = pd.MultiIndex.from_arrays([make[valid], model[valid], year[valid].astype(int), trim[valid]])
+        codes, distinct_vehicles = pd.factorize(vehicle_keys)
+        prices = np.full(len(distinct_vehicles), np.nan)
+        matches = np.full(len(distinct_vehicles), None, dtype=object)
+        lookup_errors = np.full(len(distinct_vehicles), "No MSRP found", dtype=object)
+        for position, key in enumerate(distinct_vehicles):
+            try:
+                price, match = self._resolve_msrp(*key)
+            except Exception as e:
+                lookup_errors[position] = f"Could not look up MSRP: {str(e)}"
+                continue
+            if price is not None and price > 0:
+                prices[position], matches[position], lookup_errors[position] = price, match, None
+        original_msrp[valid] = prices[codes]
+        msrp_match[valid] = matches[codes]
+        error[valid] = lookup_errors[codes]
+        valid = pd.isna(error)
+        
+        # Segment and brand retention once per distinct make/model
+        model_codes, distinct_models = pd.factorize(pd.MultiIndex.from_arrays([make, model]))
+        depreciation_model = self.depreciation_model
+        segments = [depreciation_model._classify_vehicle_segment(vehicle_make, vehicle_model)
+                    for vehicle_make, vehicle_model in distinct_models]
+        brand_multipliers = np.array([
+            depreciation_model._apply_model_specific_adjustments(
+                vehicle_make, vehicle_model, depreciation_model.brand_multipliers.get(vehicle_make, 1.0)
+            ) for vehicle_make, vehicle_model in distinct_models
+        ])
+        segment = np.array(segments, dtype=object)[model_codes]
+        brand_multiplier = brand_multipliers[model_codes]
+        cap = np.array([depreciation_model.max_depreciation.get(name, 0.85) for name in segments])[model_codes]
+        baseline_rate = np.array([depreciation_model.one_year_baseline.get(name, 0.15) for name in segments])[model_codes]
+        
+        vehicle_age = np.where(valid, self.current_year - np.nan_to_num(year), 0).astype(int)
+        msrp = np.where(valid, original_msrp, 0.0)
+        
+        # Vehicles 1+ years old: cumulative segment rate at their age, scaled by annual mileage
+        rate_codes, distinct_rates = pd.factorize(pd.MultiIndex.from_arrays([segment.astype(str), np.maximum(vehicle_age, 1)]))
+        base_rate = np.array([depreciation_model._get_cumulative_depreciation_rate(age, name)
+                              for name, age in distinct_rates])[rate_codes]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            annual_mileage = np.where(vehicle_age >= 1, mileage / np.maximum(vehicle_age, 1), 0.0)
+        mileage_multiplier = np.interp(annual_mileage, depreciation_model.mileage_impact_miles,
+                                       depreciation_model.mileage_impact_multipliers)
+        final_rate = np.minimum(base_rate * brand_multiplier * mileage_multiplier, cap)
+        aged_value = np.maximum(msrp * (1 - final_rate), msrp * 0.10)
+        
+        # Current-year vehicles past 1,000 miles: mileage tiers converging to the one-year rate
+        # (up to 1,000 miles they are valued as nearly new below)
+        current_year_rate = np.select(
+            [mileage <= 5000, mileage <= 12000, mileage <= 20000],
+            [0.05 + ((mileage - 1000) / 4000 * 0.03),
+             0.08 + ((mileage - 5000) / 7000 * (baseline_rate * 0.70 - 0.08)),
+             baseline_rate * 0.70 + ((mileage - 12000) / 8000 * (baseline_rate * 0.90 - baseline_rate * 0.70))],
+            baseline_rate * 0.90 + (np.minimum(mileage - 20000, 20000) / 20000 * (baseline_rate * 0.95 - baseline_rate * 0.90))
+        )
+        current_year_value = np.maximum(msrp * (1 - current_year_rate * brand_multiplier), msrp * 0.50)
+        
+        model_value = np.select([vehicle_age >= 1, vehicle_age == 0], [aged_value, current_year_value], msrp)
+        estimated_value = np.round(np.clip(model_value, msrp * 0.10, msrp), 0)
+        estimated_value = np.where((vehicle_age == 0) & (mileage <= 1000), msrp * 0.95, estimated_value)
+        
+        results['original_msrp'] = original_msrp
+        results['msrp_match'] = msrp_match
+        results['vehicle_age'] = np.where(valid, vehicle_age, np.nan)
+        results['estimated_value'] = np.where(valid, estimated_value, np.nan)
+        results['error'] = error
+        return results
+    
     def get_depreciation_insights(self, make: str, model: str, year: int, 
                                 current_mileage: int, estimated_value: float,
                                 original_msrp: float = None) -> Dict[str, Any]:
@@ -273,152 +394,3 @@ class UsedVehicleEstimator:
             return "Premium segment"
         else:
             return "Luxury/High-end market"
-
-def integrate_used_vehicle_estimation():
-    """
-    Integration function to be called from the vehicle selection interface
-    This should be added to the vehicle selection form where price input occurs
-    """
-    
-    # Initialize the estimator
-    estimator = UsedVehicleEstimator()
-    
-    # This would be integrated into the existing vehicle selection form
-    # Example integration points:
-    
-    def on_vehicle_details_change(make, model, year, trim, current_mileage):
-        """
-        Callback function to execute when vehicle details change
-        """
-        if make and model and year and trim and current_mileage is not None:
-            
-            # Check if this is a used vehicle
-            if estimator.is_used_vehicle(year, current_mileage):
-                
-                # Estimate current value
-                estimated_value = estimator.estimate_current_value(
-                    make, model, year, trim, current_mileage
-                )
-                
-                if estimated_value:
-                    # Auto-populate the purchase price field
-                    st.session_state.estimated_price = estimated_value
-                    
-                    # Show estimation info to user
-                    st.info(f"""
-                    🔍 **Used Vehicle Detected**
-                    
-                    Estimated current market value: **${estimated_value:,.0f}**
-                    
-                    This estimate is based on:
-                    - Vehicle age: {estimator.current_year - year} years
-                    - Current mileage: {current_mileage:,} miles
-                    - {make} {model} depreciation patterns
-                    
-                    💡 *This value has been automatically entered in the purchase price field*
-                    """)
-                    
-                    # Get and display insights
-                    insights = estimator.get_depreciation_insights(
-                        make, model, year, current_mileage, estimated_value
-                    )
-                    
-                    if insights:
-                        with st.expander("📊 View Depreciation Analysis"):
-                            col1, col2 = st.columns(2)
-                            
-                            with col1:
-                                st.metric("Vehicle Age", f"{insights['vehicle_age']} years")
-                                st.write(f"**Mileage Assessment:** {insights['mileage_assessment']}")
-                            
-                            with col2:
-                                st.write(f"**Value Retention:** {insights['value_retention_rating']}")
-                                st.write(f"**Depreciation:** {insights['depreciation_assessment']}")
-                            
-                            st.write(f"**Market Position:** {insights['market_position']}")
-                
-                else:
-                    st.warning("⚠️ Unable to estimate current value - vehicle data not found in database")
-            
-            else:
-                # Clear any previous estimation
-                if 'estimated_price' in st.session_state:
-                    del st.session_state.estimated_price
-    
-    return on_vehicle_details_change
-
-def enhanced_vehicle_selection_with_price_estimation():
-    """
-    Enhanced vehicle selection form that includes automatic price estimation
-    This would replace or enhance the existing vehicle selection interface
-    """
-    
-    estimator = UsedVehicleEstimator()
-    
-    st.subheader("🚗 Vehicle Selection")
-    
-    # Vehicle selection inputs (simplified example)
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        make = st.selectbox("Make", ["Tesla", "Toyota", "Honda", "Ford", "Chevrolet"])
-        year = st.selectbox("Year", list(range(2024, 2015, -1)))
-    
-    with col2:
-        model = st.selectbox("Model", ["Model 3", "Camry", "Civic", "F-150", "Silverado"])
-        trim = st.selectbox("Trim", ["Base", "Performance", "LX", "EX"])
-    
-    # Mileage input
-    current_mileage = st.number_input(
-        "Current Mileage:",
-        min_value=0,
-        max_value=300000,
-        value=0,
-        step=1000,
-        help="Current odometer reading"
-    )
-    
-    # Purchase price with auto-estimation
-    purchase_price = st.number_input(
-        "Purchase Price ($):",
-        min_value=1000,
-        max_value=200000,
-        value=st.session_state.get('estimated_price', 30000),
-        step=500,
-        help="Actual purchase price (auto-estimated for used vehicles)"
-    )
-    
-    # Check for used vehicle and estimate price
-    if make and model and year and trim and current_mileage is not None:
-        
-        if estimator.is_used_vehicle(year, current_mileage):
-            
-            estimated_value = estimator.estimate_current_value(
-                make, model, year, trim, current_mileage
-            )
-            
-            if estimated_value:
-                # Update session state for price
-                st.session_state.estimated_price = estimated_value
-                
-                # Rerun to update the input field
-                if abs(purchase_price - estimated_value) > 1000:
-                    st.rerun()
-                
-                # Show estimation details
-                st.success(f"""
-                ✅ **Used Vehicle Price Estimated**
-                
-                Current market value: **${estimated_value:,.0f}**
-                
-                You can adjust this price if you have a different offer or market data.
-                """)
-    
-    return {
-        'make': make,
-        'model': model, 
-        'year': year,
-        'trim': trim,
-        'current_mileage': current_mileage,
-        'purchase_price': purchase_price
-    }
\ No newline at end of file